@@ -0,0 +1,137 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from checkout.models.checkout_payment import Payment
+from checkout.models.customer_balance import CustomerBalance
+from utils.conditional import SALES, bump_version
+from utils.partitions import (
+    ARCHIVED_DEPENDENTS,
+    ARCHIVED_TABLES,
+    add_months,
+    archive_dependents,
+    archive_partition,
+    archive_references,
+    month_bounds,
+    month_start,
+    partition_month,
+    partition_name,
+    partitions,
+)
+
+CHECKOUT_TABLE = "checkout_checkoutorder"
+
+
+class Command(BaseCommand):
+    help = (
+        "Move checkout orders older than the retention window out of the "
+        "database, one month at a time, into gzipped COPY files, together with "
+        "their items, order details and payments. Their stock movements stay, "
+        "relabeled as referencing an archived checkout. Months with open dues "
+        "or with payments inside the retention window are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=settings.PARTITION_RETENTION_MONTHS,
+            help="Keep this many months before the current one.",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=settings.PARTITION_ARCHIVE_DIR,
+            help="Directory the archived partitions are written to.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the months that would be archived.",
+        )
+
+    def keep_reason(self, month, cutoff):
+        """
+        Why ``month`` cannot be archived yet, if it cannot. Locks the month's
+        checkouts, so their dues cannot change before it is archived.
+        """
+        name = connection.ops.quote_name(partition_name(CHECKOUT_TABLE, month))
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {name} IN SHARE MODE")
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {name} WHERE due_amount <> 0)"
+            )
+            if cursor.fetchone()[0]:
+                return "it has open dues"
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM checkout_payment WHERE created_at >= %s "
+                f"AND checkout_order_id IN (SELECT id FROM {name}))",
+                [month_bounds(cutoff)[0]],
+            )
+            if cursor.fetchone()[0]:
+                return "it has payments inside the retention window"
+
+    def archive(self, month, directory):
+        checkouts = partition_name(CHECKOUT_TABLE, month)
+        if checkouts in partitions(CHECKOUT_TABLE):
+            start, end = month_bounds(month)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT DISTINCT pharmacy_shop_id FROM "
+                    f"{connection.ops.quote_name(checkouts)}"
+                )
+                # The rows go with raw SQL, which the version signals miss
+                for (organization_id,) in cursor.fetchall():
+                    bump_version(SALES, organization_id)
+            CustomerBalance.objects.archive_payments(
+                Payment.objects.filter(
+                    checkout_order__created_at__gte=start,
+                    checkout_order__created_at__lt=end,
+                )
+            )
+            for table, column in ARCHIVED_DEPENDENTS.items():
+                rows = archive_dependents(table, column, checkouts, directory)
+                self.stdout.write(f"Archived {rows} rows of {table} for {checkouts}")
+            rows = archive_references("checkout", checkouts, start)
+            self.stdout.write(f"Relabeled {rows} stock movements of {checkouts}")
+        for table in ARCHIVED_TABLES:
+            name = partition_name(table, month)
+            if name not in partitions(table):
+                continue
+            rows = archive_partition(table, name, directory)
+            self.stdout.write(f"Archived {rows} rows of {name}")
+
+    def handle(self, *args, **options):
+        cutoff = add_months(
+            month_start(timezone.localdate()), -options["retention_months"]
+        )
+        months = sorted(
+            {
+                partition_month(table, name)
+                for table in ARCHIVED_TABLES
+                for name in partitions(table)
+            }
+        )
+
+        archived = 0
+        for month in months:
+            if month >= cutoff:
+                break
+            # A month's checkouts and everything hanging off them leave
+            # together or not at all
+            with transaction.atomic():
+                if partition_name(CHECKOUT_TABLE, month) in partitions(CHECKOUT_TABLE):
+                    reason = self.keep_reason(month, cutoff)
+                    if reason:
+                        self.stdout.write(
+                            self.style.WARNING(f"Keeping {month:%Y-%m}, {reason}.")
+                        )
+                        continue
+                archived += 1
+                if options["dry_run"]:
+                    self.stdout.write(f"Would archive {month:%Y-%m}")
+                    continue
+                self.archive(month, options["archive_dir"])
+
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {archived} months."))
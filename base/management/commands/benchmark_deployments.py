@@ -0,0 +1,123 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from base.synthetic import BENCHMARK_PASSWORD
+
+# Environment that gunicorn.config.py reads to pick the worker class
+DEPLOYMENTS = {
+    "wsgi": {"ASGI": "0"},
+    "asgi": {"ASGI": "1"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn with the sync WSGI workers and then with the uvicorn "
+        "ASGI workers (gunicorn.config.py), drive each with load_test and "
+        "compare throughput and tail latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="127.0.0.1:8765")
+        parser.add_argument(
+            "--workers", type=int, help="Worker processes (default: the config's)."
+        )
+        parser.add_argument(
+            "--deployments",
+            nargs="+",
+            choices=list(DEPLOYMENTS),
+            default=list(DEPLOYMENTS),
+            help="The first one is the baseline the others are compared with.",
+        )
+        parser.add_argument("--counters", type=int, default=20)
+        parser.add_argument("--duration", type=float, default=30)
+        parser.add_argument("--ramp-up", type=float, default=2)
+        parser.add_argument("--dashboard-every", type=int, default=5)
+        parser.add_argument("--email", default="benchmark-admin-0@example.com")
+        parser.add_argument("--password", default=BENCHMARK_PASSWORD)
+        parser.add_argument(
+            "--output-dir",
+            default="benchmarks",
+            help="Where load_test summaries and server logs are written.",
+        )
+
+    def start_server(self, name, options, log):
+        command = [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.config.py",
+            "--bind",
+            options["bind"],
+            "--access-logfile",
+            "/dev/null",
+        ]
+        if options["workers"]:
+            command += ["--workers", str(options["workers"])]
+        return subprocess.Popen(
+            command,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **DEPLOYMENTS[name]},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+
+    def wait_until_ready(self, server, base_url, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn exited with code {server.returncode}")
+            try:
+                requests.get(f"{base_url}/auth/profile/", timeout=5)
+                return
+            except requests.ConnectionError:
+                time.sleep(0.5)
+        raise CommandError(f"gunicorn did not answer on {base_url} in {timeout}s")
+
+    def stop_server(self, server):
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    def handle(self, *args, **options):
+        output_dir = Path(options["output_dir"])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        base_url = f"http://{options['bind']}"
+
+        baseline = None
+        for name in options["deployments"]:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name} deployment"))
+            summary = output_dir / f"load_test_{name}.json"
+            with open(output_dir / f"gunicorn_{name}.log", "w") as log:
+                server = self.start_server(name, options, log)
+                try:
+                    self.wait_until_ready(server, base_url)
+                    call_command(
+                        "load_test",
+                        base_url=base_url,
+                        email=options["email"],
+                        password=options["password"],
+                        counters=options["counters"],
+                        duration=options["duration"],
+                        ramp_up=options["ramp_up"],
+                        dashboard_every=options["dashboard_every"],
+                        output=str(summary),
+                        compare=baseline,
+                        stdout=self.stdout,
+                    )
+                finally:
+                    self.stop_server(server)
+            baseline = baseline or str(summary)
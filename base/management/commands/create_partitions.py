@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.partitions import PARTITIONED_TABLES, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly partitions of every partitioned table ahead of "
+        "time. Runs on every deploy; schedule it too, e.g. daily from cron: "
+        "'15 3 * * * cd /code && python manage.py create_partitions'. Rows "
+        "for a month without a partition go to the default partition and "
+        "are moved out once it is created, but cannot be archived until then."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.PARTITION_MONTHS_AHEAD,
+            help="Create partitions up to this many months from now.",
+        )
+        parser.add_argument(
+            "--since",
+            help="Also create partitions from this month on (YYYY-MM).",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = datetime.strptime(options["since"], "%Y-%m")
+            except ValueError:
+                raise CommandError("--since must look like YYYY-MM.")
+
+        for table, column in PARTITIONED_TABLES.items():
+            created = ensure_partitions(
+                table, column, months_ahead=options["months_ahead"], since=since
+            )
+            for name in created:
+                self.stdout.write(f"Created {name}")
+        self.stdout.write(self.style.SUCCESS("Partitions are up to date."))
@@ -0,0 +1,320 @@
+import json
+import random
+import re
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from base.synthetic import BENCHMARK_PASSWORD
+
+SERVER_DB_TIME = re.compile(r"db;dur=([\d.]+)")
+
+
+class Recorder:
+    """Thread-safe latency, error and server DB time samples per step"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.db_times = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, step, elapsed_ms, response):
+        with self.lock:
+            self.latencies[step].append(elapsed_ms)
+            if response is None or response.status_code >= 400:
+                self.errors[step] += 1
+            elif match := SERVER_DB_TIME.search(
+                response.headers.get("Server-Timing", "")
+            ):
+                self.db_times[step].append(float(match.group(1)))
+
+    def summary(self, duration):
+        def pct(values, p):
+            return values[max(0, round(p / 100 * len(values)) - 1)]
+
+        steps = {}
+        for step, values in self.latencies.items():
+            values = sorted(values)
+            db_times = self.db_times[step]
+            steps[step] = {
+                "requests": len(values),
+                "errors": self.errors[step],
+                "rps": round(len(values) / duration, 1),
+                "p50_ms": round(pct(values, 50), 1),
+                "p95_ms": round(pct(values, 95), 1),
+                "p99_ms": round(pct(values, 99), 1),
+                "max_ms": round(values[-1], 1),
+                "server_db_ms": (
+                    round(statistics.median(db_times), 1) if db_times else None
+                ),
+            }
+        total = sum(step["requests"] for step in steps.values())
+        return {
+            "duration_s": round(duration, 1),
+            "requests": total,
+            "rps": round(total / duration, 1),
+            "error_rate": round(
+                sum(step["errors"] for step in steps.values()) / max(total, 1), 4
+            ),
+            "steps": steps,
+        }
+
+
+class Counter:
+    """
+    One POS counter running the sales loop against the API:
+    search medicine -> fetch batches and stock level -> look up customer ->
+    checkout -> print receipt -> alerts, plus a dashboard refresh every few
+    sales.
+    """
+
+    def __init__(self, base_url, token, profile, search_terms, recorder, options):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        self.profile = profile
+        self.search_terms = search_terms
+        self.recorder = recorder
+        self.options = options
+        self.random = random.Random()
+
+    def call(self, step, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.base_url + path, timeout=self.options["timeout"], **kwargs
+            )
+        except requests.RequestException:
+            response = None
+        self.recorder.add(step, (time.perf_counter() - started) * 1000, response)
+        if response is not None and response.status_code < 400:
+            return response.json()
+        return None
+
+    def think(self):
+        if self.options["think_time"]:
+            time.sleep(self.random.uniform(0, 2 * self.options["think_time"]))
+
+    def sale(self, iteration):
+        term = self.random.choice(self.search_terms)
+        found = self.call("search", "get", "/inventory/stockpiles/", params={"q": term})
+        results = (found or {}).get("results") or []
+        if not results:
+            return
+        inventory = self.random.choice(results)
+        self.think()
+
+        batches = self.call(
+            "batches",
+            "get",
+            "/products/batch/",
+            params={"inventory_id": inventory["id"]},
+        )
+        in_stock = [batch for batch in batches or [] if batch["quantity"] > 0]
+        if not in_stock:
+            return
+        batch = in_stock[0]
+        price = float(batch["selling_price"])
+        self.call("quantity", "get", f"/inventory/quantity/{inventory['id']}/")
+        self.think()
+
+        self.call(
+            "customer_search",
+            "get",
+            "/checkout/customers/search/",
+            params={"q": f"01{self.random.randint(3000, 9999)}"},
+        )
+
+        checkout = self.call(
+            "checkout",
+            "post",
+            "/checkout/Checkout/",
+            json={
+                "pharmacy_shop": self.profile["organization"],
+                "employee": self.profile["id"],
+                "items": [
+                    {
+                        "selectedBatchId": batch["id"],
+                        "selectedUnitItem": 1,
+                        "selectedUnitQuantity": 1,
+                        "selling_price": price,
+                        "per_piece_price": price,
+                    }
+                ],
+                "amount": {
+                    "finalAmount": price,
+                    "cashReceived": price,
+                    "changeAmount": 0,
+                },
+            },
+        )
+        if checkout:
+            self.call("receipt", "get", f"/checkout/Checkout/{checkout['id']}/")
+        self.call("alerts_summary", "get", "/inventory/alerts/summary/")
+
+        if iteration % self.options["dashboard_every"] == 0:
+            self.call(
+                "alerts_expiry",
+                "get",
+                "/inventory/alerts/",
+                params={"alert_type": "expiry"},
+            )
+            self.call(
+                "dashboard_sales",
+                "get",
+                "/checkout/dashboard/sales-profit/",
+                params={"filter_by": "today"},
+            )
+            self.call("dashboard_dues", "get", "/checkout/dashboard/dues-report/")
+        self.think()
+
+    def run(self, deadline):
+        iteration = 0
+        while time.monotonic() < deadline:
+            iteration += 1
+            self.sale(iteration)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the POS sales loop (search, batches, checkout, receipt, alerts, "
+        "dashboards) from many concurrent counters against a running server "
+        "and report throughput, tail latency and error rates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--email", default="benchmark-admin-0@example.com")
+        parser.add_argument("--password", default=BENCHMARK_PASSWORD)
+        parser.add_argument(
+            "--counters", type=int, default=10, help="Concurrent POS counters."
+        )
+        parser.add_argument(
+            "--duration", type=float, default=60, help="Seconds to run for."
+        )
+        parser.add_argument(
+            "--ramp-up",
+            type=float,
+            default=5,
+            help="Seconds over which counters are started.",
+        )
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=0,
+            help="Mean pause in seconds between a cashier's steps.",
+        )
+        parser.add_argument(
+            "--dashboard-every",
+            type=int,
+            default=10,
+            help="Refresh alerts and dashboards every N sales per counter.",
+        )
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument("--output", help="Write the summary as JSON here.")
+        parser.add_argument(
+            "--compare",
+            help="Summary JSON of an earlier run (e.g. another gunicorn config).",
+        )
+
+    def login(self, base_url, email, password):
+        try:
+            response = requests.post(
+                f"{base_url}/auth/login/token/",
+                json={"email": email, "password": password},
+                timeout=30,
+            )
+        except requests.RequestException as e:
+            raise CommandError(f"Could not reach {base_url}: {e}")
+        if response.status_code != 200:
+            raise CommandError(f"Login as {email} failed: {response.text}")
+        token = response.json()["access"]
+
+        session = requests.Session()
+        session.headers["Authorization"] = f"Bearer {token}"
+        profile = session.get(f"{base_url}/auth/profile/", timeout=30).json()
+        names = []
+        for page in range(1, 6):
+            stock = session.get(
+                f"{base_url}/inventory/stockpiles/", params={"page": page}, timeout=30
+            )
+            if stock.status_code != 200:
+                break
+            names += [
+                item["medicine_detail"]["name"] for item in stock.json()["results"]
+            ]
+        if not names:
+            raise CommandError(
+                f"{email} has no stock to sell. Seed it with seed_benchmark."
+            )
+        return token, profile, names
+
+    def handle(self, *args, **options):
+        base_url = options["base_url"].rstrip("/")
+        token, profile, search_terms = self.login(
+            base_url, options["email"], options["password"]
+        )
+
+        recorder = Recorder()
+        started = time.monotonic()
+        deadline = started + options["duration"]
+        threads = []
+        for n in range(options["counters"]):
+            counter = Counter(base_url, token, profile, search_terms, recorder, options)
+            thread = threading.Thread(target=counter.run, args=(deadline,))
+            thread.start()
+            threads.append(thread)
+            if options["ramp_up"] and options["counters"] > 1:
+                time.sleep(options["ramp_up"] / options["counters"])
+        for thread in threads:
+            thread.join()
+
+        summary = recorder.summary(time.monotonic() - started)
+        summary["counters"] = options["counters"]
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+        self.report(summary, baseline)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(summary, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def report(self, summary, baseline=None):
+        self.stdout.write(
+            f"{'step':<16} {'reqs':>7} {'err':>5} {'rps':>7} {'p50':>8} "
+            f"{'p95':>8} {'p99':>8} {'db p50':>8}"
+        )
+        for step, stats in sorted(summary["steps"].items()):
+            db = stats["server_db_ms"]
+            self.stdout.write(
+                f"{step:<16} {stats['requests']:>7} {stats['errors']:>5} "
+                f"{stats['rps']:>7.1f} {stats['p50_ms']:>6.0f}ms "
+                f"{stats['p95_ms']:>6.0f}ms {stats['p99_ms']:>6.0f}ms "
+                f"{'-' if db is None else f'{db:.0f}ms':>8}"
+            )
+        style = self.style.SUCCESS if not summary["error_rate"] else self.style.WARNING
+        self.stdout.write(
+            style(
+                f"{summary['requests']} requests from {summary['counters']} counters "
+                f"in {summary['duration_s']}s: {summary['rps']} req/s, "
+                f"{summary['error_rate']:.2%} errors"
+            )
+        )
+        if baseline:
+            self.stdout.write(
+                f"vs baseline: {summary['rps'] / baseline['rps'] - 1:+.0%} req/s"
+            )
+            for step, stats in sorted(summary["steps"].items()):
+                before = baseline["steps"].get(step)
+                if before:
+                    self.stdout.write(
+                        f"  {step:<16} p95 {stats['p95_ms'] - before['p95_ms']:+.0f}ms, "
+                        f"p99 {stats['p99_ms'] - before['p99_ms']:+.0f}ms"
+                    )
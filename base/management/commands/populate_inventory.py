@@ -1,48 +1,65 @@
-import random
-import datetime
-from decimal import Decimal
+import time
 
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
-
-from inventory.models import Inventory, Batch, Medicine
-from users.models.organization import (
-    Organization,
-)  # Make sure this import path is correct
+from base.synthetic import SyntheticPharmacies, load_profile
+from inventory.models import Inventory
+from users.models import Organization
 
 
 class Command(BaseCommand):
     """
-    Django command to populate inventory with a specified number of medicines.
-
-    This command will:
-    1. Select 400 random medicines from the database.
-    2. Create an Inventory entry for each medicine for a given Organization.
-    3. Create two distinct Batch entries for each Inventory item.
-    4. Set expiry dates within the next 6 months to simulate near-expiry alerts.
-    5. Set prices based on a per-piece cost between 3 and 50 BDT.
+    Fill an existing organization with generated data.
+
+    By default this stocks 400 random catalog medicines with two batches each,
+    as before. --years, --customers and --suppliers add sales history,
+    credit customers and supplier orders on top. All rows are written in bulk
+    (COPY for the history tables) from a seeded generator; see
+    base.synthetic.DEFAULT_PROFILE for the distributions and --profile to
+    override them.
     """
 
-    help = "Populates inventory with 400 medicines, with batches expiring in the next 6 months."
+    help = (
+        "Generate inventory, batches and optionally years of sales for an organization."
+    )
 
     def add_arguments(self, parser):
-        """
-        Adds the command-line arguments for the management command.
-        """
         parser.add_argument(
             "organization_id",
             type=int,
             help="The ID of the Organization to add inventory to.",
         )
+        parser.add_argument(
+            "--medicines",
+            type=int,
+            default=400,
+            help="Catalog medicines to stock (skips ones already stocked).",
+        )
+        parser.add_argument(
+            "--batches", type=int, default=2, help="Batches per inventory item."
+        )
+        parser.add_argument("--customers", type=int, default=0)
+        parser.add_argument(
+            "--years", type=float, default=0, help="Years of sales history."
+        )
+        parser.add_argument(
+            "--suppliers",
+            action="store_true",
+            help="Also generate suppliers and supplier orders for the history.",
+        )
+        parser.add_argument(
+            "--profile", help="JSON file overriding base.synthetic.DEFAULT_PROFILE."
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--chunk-size", type=int, default=20000)
+
+    def log(self, message):
+        self.stdout.write(message)
 
     @transaction.atomic
     def handle(self, *args, **options):
-        """
-        The main logic for the management command.
-        """
         organization_id = options["organization_id"]
-        num_medicines_to_add = 400
 
         try:
             organization = Organization.objects.get(pk=organization_id)
@@ -51,95 +68,54 @@ class Command(BaseCommand):
                 f'Organization with ID "{organization_id}" does not exist.'
             )
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'Starting to populate inventory for organization: "{organization.name}"'
+        employee = organization.user_set.order_by("-role", "id").first()
+        if options["years"] and employee is None:
+            raise CommandError(
+                f'Organization "{organization.name}" has no users to record sales for.'
             )
-        )
-
-        # Fetch all medicine IDs and randomly select 400
-        medicine_ids = list(Medicine.objects.values_list("id", flat=True))
 
-        if len(medicine_ids) < num_medicines_to_add:
+        try:
+            profile = load_profile(options["profile"])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Invalid profile: {e}")
+
+        started = time.perf_counter()
+        generator = SyntheticPharmacies(
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            profile=profile,
+            log=self.log,
+        )
+        stocked = Inventory.objects.for_organization(organization).values_list(
+            "medicine_id", flat=True
+        )
+        medicine_ids = generator.medicines(
+            options["medicines"], exclude=stocked, create_missing=False
+        )
+        if len(medicine_ids) < options["medicines"]:
             self.stdout.write(
                 self.style.WARNING(
-                    f"Found only {len(medicine_ids)} medicines, will populate all of them."
+                    f"Found only {len(medicine_ids)} unstocked medicines, "
+                    "will populate all of them."
                 )
             )
-            num_medicines_to_add = len(medicine_ids)
-
-        random_medicine_ids = random.sample(medicine_ids, num_medicines_to_add)
-        medicines = Medicine.objects.filter(pk__in=random_medicine_ids)
-
-        count = 0
-        for medicine in medicines:
-            # Get or create the main inventory entry for the medicine
-            inventory, created = Inventory.objects.get_or_create(
-                medicine=medicine,
-                organization=organization,
-                defaults={"stock_alert_qty": random.randint(10, 50)},
-            )
 
-            if not created:
-                self.stdout.write(
-                    self.style.NOTICE(
-                        f'Inventory for "{medicine.name}" already exists. Skipping.'
-                    )
-                )
-                continue
-
-            # Generate two unique expiry day offsets to ensure batches have different dates
-            expiry_days = random.sample(range(1, 181), 2)
-
-            # --- Create the first batch ---
-            batch1_qty = random.randint(5, 150)
-            # UPDATED: Price set between 3 and 50
-            buy_price1 = Decimal(random.uniform(3.0, 50.0)).quantize(Decimal("0.01"))
-
-            Batch.objects.create(
-                inventory=inventory,
-                buying_price=buy_price1,
-                selling_price=buy_price1
-                + Decimal(random.uniform(2.0, 15.0)).quantize(Decimal("0.01")),
-                batch_number="BATCH-A",
-                quantity=batch1_qty,
-                alert_quantity=random.randint(5, 20),
-                # UPDATED: Expiry set to 1-180 days from now
-                expiry_date=datetime.date.today()
-                + datetime.timedelta(days=expiry_days[0]),
-            )
-
-            # --- Create the second batch ---
-            batch2_qty = random.randint(5, 150)
-            # UPDATED: Price set between 3 and 50
-            buy_price2 = Decimal(random.uniform(3.0, 50.0)).quantize(Decimal("0.01"))
-
-            Batch.objects.create(
-                inventory=inventory,
-                buying_price=buy_price2,
-                selling_price=buy_price2
-                + Decimal(random.uniform(2.0, 15.0)).quantize(Decimal("0.01")),
-                batch_number="BATCH-B",
-                quantity=batch2_qty,
-                alert_quantity=random.randint(5, 20),
-                # UPDATED: Expiry set to 1-180 days from now, different from the first batch
-                expiry_date=datetime.date.today()
-                + datetime.timedelta(days=expiry_days[1]),
-            )
-
-            # Update the total quantity in the main inventory record
-            inventory.quantity = batch1_qty + batch2_qty
-            inventory.save()
+        batches = generator.stock(organization, medicine_ids, options["batches"])
+        self.log(f"Stocked {len(medicine_ids)} medicines with {len(batches)} batches")
 
-            count += 1
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"({count}/{num_medicines_to_add}) Successfully created inventory and two batches for: {medicine.name}"
-                )
-            )
+        days = round(options["years"] * 365)
+        customers = generator.customers(organization, options["customers"])
+        if days:
+            sales = generator.sales(organization, employee, batches, customers, days)
+            self.log(f"Generated {sales} sales over {days} days")
+        if options["suppliers"]:
+            orders = generator.suppliers(organization, max(days, 30))
+            self.log(f"Generated {orders} supplier orders")
+        if customers:
+            generator.rebuild_balances([organization])
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'\n✅ Successfully populated the inventory for {count} new medicines in organization "{organization.name}".'
+                f'Populated "{organization.name}" in {time.perf_counter() - started:.1f}s.'
             )
         )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from checkout.models import CustomerBalance, CustomerDetails
+from users.models.organization import Organization
+
+
+class Command(BaseCommand):
+    help = "Recompute the CustomerBalance ledger from checkout orders and payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            type=int,
+            help="Only rebuild balances for this Organization ID.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of balances written per upsert.",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        customers = CustomerDetails.objects.all()
+
+        organization_id = options["organization"]
+        if organization_id:
+            if not Organization.objects.filter(pk=organization_id).exists():
+                raise CommandError(
+                    f'Organization with ID "{organization_id}" does not exist.'
+                )
+            customers = customers.filter(organization_id=organization_id)
+
+        count = CustomerBalance.objects.rebuild(
+            customers, batch_size=options["batch_size"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt balances for {count} customers.")
+        )
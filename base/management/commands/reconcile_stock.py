@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from inventory.models import Batch, StockMovement, StockMovementKind
+from users.models.organization import Organization
+
+
+class Command(BaseCommand):
+    help = "Compare batch quantities with the stock movement ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            type=int,
+            help="Only check batches of this Organization ID.",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Record adjustments that bring the ledger in line with the batches.",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        batches = Batch.objects.all()
+        organization_id = options["organization"]
+        if organization_id:
+            if not Organization.objects.filter(pk=organization_id).exists():
+                raise CommandError(
+                    f'Organization with ID "{organization_id}" does not exist.'
+                )
+            batches = batches.filter(organization_id=organization_id)
+
+        mismatched = list(StockMovement.objects.unreconciled(batches).order_by("id"))
+        for batch in mismatched:
+            self.stdout.write(
+                f"Batch {batch.id} ({batch.batch_number}): "
+                f"quantity {batch.quantity}, ledger {batch.ledger_quantity}"
+            )
+
+        if options["fix"]:
+            StockMovement.objects.record(
+                StockMovement.of(
+                    batch,
+                    StockMovementKind.ADJUSTMENT,
+                    batch.quantity - batch.ledger_quantity,
+                    note="Reconciliation",
+                )
+                for batch in mismatched
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"Adjusted the ledger of {len(mismatched)} batches.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"{len(mismatched)} batches differ from the ledger.")
+            )
@@ -0,0 +1,226 @@
+import json
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from base.synthetic import BENCHMARK_SLUG_PREFIX
+from checkout.models import CheckoutOrder
+from inventory.models import Batch
+from users.models import Organization
+from utils.middleware import recording_queries
+
+
+class Rollback(Exception):
+    pass
+
+
+def checkout_payload(organization, employee):
+    batch = (
+        Batch.objects.for_organization(organization)
+        .filter(quantity__gte=10)
+        .order_by("id")
+        .first()
+    )
+    if batch is None:
+        raise CommandError("No batch with stock to sell in the benchmark pharmacy.")
+    price = float(batch.selling_price)
+    return {
+        "pharmacy_shop": organization.id,
+        "employee": employee.id,
+        "items": [
+            {
+                "selectedBatchId": batch.id,
+                "selectedUnitItem": 1,
+                "selectedUnitQuantity": 2,
+                "selling_price": price,
+                "per_piece_price": price,
+            }
+        ],
+        "amount": {"finalAmount": price, "cashReceived": price, "changeAmount": 0},
+    }
+
+
+def benchmark_cases(organization, employee):
+    """(name, method, path, payload) for the endpoints on the POS hot path"""
+    medicine_name = (
+        CheckoutOrder.objects.for_organization(organization)
+        .filter(items__inventory__isnull=False)
+        .values_list("items__inventory__medicine__name", flat=True)
+        .first()
+        or "para"
+    )
+    return [
+        ("checkout_create", "post", "/checkout/Checkout/", checkout_payload),
+        ("checkout_list", "get", "/checkout/Checkout/", None),
+        (
+            "inventory_search",
+            "get",
+            f"/inventory/stockpiles/?q={medicine_name[:8]}",
+            None,
+        ),
+        ("alerts_stock", "get", "/inventory/alerts/?alert_type=stock", None),
+        ("alerts_expiry", "get", "/inventory/alerts/?alert_type=expiry", None),
+        ("alerts_summary", "get", "/inventory/alerts/summary/", None),
+        (
+            "dashboard_sales",
+            "get",
+            "/checkout/dashboard/sales-profit/?filter_by=this_month",
+            None,
+        ),
+        ("dashboard_dues", "get", "/checkout/dashboard/dues-report/", None),
+        ("customer_list", "get", "/checkout/customers/", None),
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot API endpoints against a seeded benchmark pharmacy "
+        "(see seed_benchmark) and report latency percentiles and query counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            type=int,
+            help="Organization ID to benchmark. Defaults to the first seeded one.",
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--only", nargs="*", help="Only run the named cases (e.g. alerts_stock)."
+        )
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+        parser.add_argument(
+            "--compare", help="JSON results of an earlier run to diff against."
+        )
+
+    def get_organization(self, organization_id):
+        organizations = Organization.objects.order_by("id")
+        if organization_id:
+            organization = organizations.filter(pk=organization_id).first()
+        else:
+            organization = organizations.filter(
+                slug__startswith=BENCHMARK_SLUG_PREFIX
+            ).first()
+        if organization is None:
+            raise CommandError(
+                "No organization to benchmark. Run seed_benchmark first."
+            )
+        return organization
+
+    def run_case(self, client, method, path, payload, iterations, warmup):
+        timings, queries, status = [], [], None
+        for iteration in range(warmup + iterations):
+            try:
+                # Writes are rolled back so every run sees the same data
+                with transaction.atomic():
+                    # Counted on every alias (reads may go to the replica)
+                    # and every thread the view fans out to
+                    with recording_queries() as captured:
+                        started = time.perf_counter()
+                        response = getattr(client, method)(
+                            path, payload, content_type="application/json"
+                        )
+                        elapsed = (time.perf_counter() - started) * 1000
+                    raise Rollback
+            except Rollback:
+                pass
+            status = response.status_code
+            if iteration >= warmup:
+                timings.append(elapsed)
+                queries.append(captured.count)
+
+        timings.sort()
+        return {
+            "status": status,
+            "median_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[max(0, round(0.95 * len(timings)) - 1)], 2),
+            "min_ms": round(timings[0], 2),
+            "queries": max(queries),
+        }
+
+    def handle(self, *args, **options):
+        organization = self.get_organization(options["organization"])
+        employee = organization.user_set.filter(role="admin").order_by("id").first()
+        if employee is None:
+            raise CommandError(f"{organization} has no admin user to log in with.")
+
+        token = AccessToken.for_user(employee)
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name, method, path, payload in benchmark_cases(organization, employee):
+                if options["only"] and name not in options["only"]:
+                    continue
+                if callable(payload):
+                    payload = payload(organization, employee)
+                results[name] = self.run_case(
+                    client,
+                    method,
+                    path,
+                    payload,
+                    options["iterations"],
+                    options["warmup"],
+                )
+
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)["results"]
+        self.report(results, baseline)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(
+                    {
+                        "revision": git_revision(),
+                        "ran_at": timezone.now().isoformat(),
+                        "organization": organization.id,
+                        "checkout_orders": CheckoutOrder.objects.for_organization(
+                            organization
+                        ).count(),
+                        "iterations": options["iterations"],
+                        "results": results,
+                    },
+                    f,
+                    indent=2,
+                )
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def report(self, results, baseline):
+        self.stdout.write(
+            f"{'case':<20} {'status':>6} {'median':>9} {'p95':>9} {'queries':>8}"
+        )
+        for name, result in results.items():
+            line = (
+                f"{name:<20} {result['status']:>6} {result['median_ms']:>7.1f}ms "
+                f"{result['p95_ms']:>7.1f}ms {result['queries']:>8}"
+            )
+            before = baseline.get(name)
+            if before:
+                change = (result["median_ms"] / before["median_ms"] - 1) * 100
+                line += (
+                    f"   {change:+.0f}% median, "
+                    f"{result['queries'] - before['queries']:+d} queries"
+                )
+            self.stdout.write(line)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from base.exports import run_job
+from base.models import ExportJob, ExportJobStatus
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the pending background exports to EXPORT_DIR, then delete the "
+        "jobs and files older than EXPORT_JOB_TTL. Run it every minute or so."
+    )
+
+    def handle(self, *args, **options):
+        done = 0
+        while job := ExportJob.objects.claim():
+            run_job(job)
+            if job.status == ExportJobStatus.FAILED:
+                self.stdout.write(
+                    self.style.ERROR(f"Export {job.pk} failed: {job.error}")
+                )
+            else:
+                self.stdout.write(f"Wrote {job.rows} rows to {job.path}")
+            done += 1
+
+        expired = 0
+        for job in ExportJob.objects.expired():
+            if job.file_name:
+                job.path.unlink(missing_ok=True)
+            job.delete()
+            expired += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Ran {done} exports, deleted {expired} expired.")
+        )
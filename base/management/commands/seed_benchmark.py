@@ -0,0 +1,102 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from base.synthetic import (
+    BENCHMARK_PASSWORD,
+    BENCHMARK_SLUG_PREFIX,
+    SyntheticPharmacies,
+    load_profile,
+)
+from users.models import Organization
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed benchmark pharmacies with stock, customers, suppliers and years "
+        "of sales. The same --seed and --profile always produce the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organizations", type=int, default=2)
+        parser.add_argument(
+            "--medicines", type=int, default=500, help="Inventory items per pharmacy."
+        )
+        parser.add_argument(
+            "--batches", type=int, default=2, help="Batches per inventory item."
+        )
+        parser.add_argument("--customers", type=int, default=200)
+        parser.add_argument(
+            "--years", type=float, default=1, help="Years of sales history."
+        )
+        parser.add_argument(
+            "--orders-per-day",
+            type=int,
+            help="Average sales per day (overrides the profile).",
+        )
+        parser.add_argument(
+            "--profile", help="JSON file overriding base.synthetic.DEFAULT_PROFILE."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--chunk-size", type=int, default=20000)
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete previously seeded benchmark pharmacies first.",
+        )
+
+    def log(self, message):
+        self.stdout.write(message)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        existing = Organization.objects.filter(slug__startswith=BENCHMARK_SLUG_PREFIX)
+        if existing.exists():
+            if not options["reset"]:
+                raise CommandError(
+                    "Benchmark pharmacies already exist. Pass --reset to replace them."
+                )
+            existing.delete()
+            self.log("Deleted previous benchmark pharmacies")
+
+        try:
+            profile = load_profile(options["profile"])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Invalid profile: {e}")
+        if options["orders_per_day"] is not None:
+            profile["orders_per_day"] = options["orders_per_day"]
+
+        started = time.perf_counter()
+        generator = SyntheticPharmacies(
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            profile=profile,
+            log=self.log,
+        )
+        medicine_ids = generator.medicines(options["medicines"])
+        days = round(options["years"] * 365)
+
+        organizations = []
+        for index in range(options["organizations"]):
+            organization, admin = generator.organization(index)
+            self.log(
+                f"{organization.name} (login {admin.email} / {BENCHMARK_PASSWORD})"
+            )
+            batches = generator.stock(organization, medicine_ids, options["batches"])
+            customers = generator.customers(organization, options["customers"])
+            sales = generator.sales(organization, admin, batches, customers, days)
+            supplier_orders = generator.suppliers(organization, days)
+            organizations.append(organization)
+            self.log(
+                f"  {len(batches)} batches, {len(customers)} customers, "
+                f"{sales} sales, {supplier_orders} supplier orders"
+            )
+
+        generator.rebuild_balances(organizations)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(organizations)} pharmacies in "
+                f"{time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -1,3 +1,203 @@
-from django.db import models
+from datetime import timedelta
+from pathlib import Path
 
-# Create your models here.
+from django.conf import settings
+from django.contrib import admin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from users.models import Organization
+from utils.managers import TenantQuerySet
+
+
+class IdempotencyKeyQuerySet(TenantQuerySet):
+    def live(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+    def lookup(self, organization_id, key):
+        return self.live().filter(organization_id=organization_id, key=key).first()
+
+    def lock(self, organization_id, key):
+        """
+        Block until no other transaction holds the same organization and key.
+        Released when the surrounding transaction ends.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, hashtext(%s))",
+                [organization_id, key],
+            )
+
+    def store(self, organization_id, key, fingerprint, path, response):
+        return self.update_or_create(
+            organization_id=organization_id,
+            key=key,
+            defaults={
+                "fingerprint": fingerprint,
+                "path": path[:255],
+                "response_status": response.status_code,
+                "response_body": response.data,
+                "created_at": timezone.now(),
+                "expires_at": timezone.now()
+                + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+            },
+        )[0]
+
+
+class IdempotencyKey(models.Model):
+    """The response of a write sent with an Idempotency-Key header, for replays"""
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    path = models.CharField(max_length=255)
+    response_status = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = IdempotencyKeyQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "key"], name="idempotencykey_org_key_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.path})"
+
+
+class DataVersionQuerySet(models.QuerySet):
+    def current(self, keys):
+        """Versions of the given keys, 0 for keys never bumped"""
+        versions = dict(self.filter(key__in=keys).values_list("key", "version"))
+        return [versions.get(key, 0) for key in keys]
+
+    def bump(self, keys):
+        table = self.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} (key, version) VALUES (%s, 1) "
+                f"ON CONFLICT (key) DO UPDATE SET version = {table}.version + 1",
+                # Sorted so concurrent bumps of the same keys cannot deadlock
+                [[key] for key in sorted(keys)],
+            )
+
+
+class DataVersion(models.Model):
+    """
+    A counter bumped after every committed write to a group of tables, per
+    organization, so read endpoints can tell cheaply whether anything they
+    depend on has changed (utils.conditional).
+    """
+
+    key = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    objects = DataVersionQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.key}: {self.version}"
+
+
+class ExportJobStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
+class ExportJobQuerySet(TenantQuerySet):
+    def expired(self):
+        return self.filter(
+            finished_at__lte=timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TTL)
+        )
+
+    def claim(self):
+        """
+        Take the oldest pending job and mark it running, or return None.
+        Concurrent workers skip the jobs another one has locked.
+        """
+        with transaction.atomic():
+            job = (
+                self.select_for_update(skip_locked=True)
+                .filter(status=ExportJobStatus.PENDING)
+                .order_by("created_at")
+                .first()
+            )
+            if job:
+                job.status = ExportJobStatus.RUNNING
+                job.started_at = timezone.now()
+                job.save(update_fields=["status", "started_at"])
+            return job
+
+
+class ExportJob(models.Model):
+    """
+    An export too large to stream within a request, written to a file in
+    EXPORT_DIR by ``manage.py run_export_jobs`` and downloaded once done.
+    """
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="export_jobs"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    kind = models.CharField(max_length=30)
+    format = models.CharField(max_length=10)
+    start = models.DateField(null=True, blank=True)
+    end = models.DateField(null=True, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=ExportJobStatus.choices,
+        default=ExportJobStatus.PENDING,
+    )
+    rows = models.PositiveBigIntegerField(default=0)
+    file_name = models.CharField(max_length=255, blank=True, default="")
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ExportJobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"], name="exportjob_status_created_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind}.{self.format} ({self.status})"
+
+    @property
+    def path(self):
+        return Path(settings.EXPORT_DIR) / self.file_name
+
+    @property
+    def download_name(self):
+        dates = "-".join(f"{day:%Y%m%d}" for day in (self.start, self.end) if day)
+        return "-".join(filter(None, [self.kind, dates])) + f".{self.format}"
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ("key", "organization", "path", "response_status", "expires_at")
+    list_filter = ("organization",)
+    search_fields = ("key",)
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "format", "organization", "status", "rows", "created_at")
+    list_filter = ("status", "kind")
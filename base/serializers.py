@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import serializers
+
+from base.models import ExportJob, ExportJobStatus
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False, help_text="First day, inclusive")
+    end = serializers.DateField(required=False, help_text="Last day, inclusive")
+    background = serializers.BooleanField(
+        default=False, help_text="Write the export to a file to download later"
+    )
+
+    def validate(self, attrs):
+        if not self.context["export"].dated:
+            attrs.pop("start", None)
+            attrs.pop("end", None)
+            return attrs
+        if "start" not in attrs or "end" not in attrs:
+            raise serializers.ValidationError("start and end are required.")
+        if attrs["end"] < attrs["start"]:
+            raise serializers.ValidationError("end must not be before start.")
+        # Long ranges are written in the background rather than held open
+        # in a request
+        days = (attrs["end"] - attrs["start"]).days + 1
+        if days > settings.EXPORT_MAX_SYNC_DAYS:
+            attrs["background"] = True
+        return attrs
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "kind",
+            "format",
+            "start",
+            "end",
+            "status",
+            "rows",
+            "error",
+            "created_at",
+            "finished_at",
+            "download_url",
+        ]
+
+    def get_download_url(self, job):
+        if job.status != ExportJobStatus.DONE:
+            return None
+        return reverse("export-job-download", args=[job.pk])
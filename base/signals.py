@@ -0,0 +1,46 @@
+from operator import attrgetter
+
+from django.db.models.signals import post_delete, post_save
+
+from checkout.models.checkout_order import CheckoutOrder
+from checkout.models.checkout_payment import Payment
+from checkout.models.customer_details import CustomerDetails
+from checkout.models.order import Order
+from inventory.models import Batch, Category, GenericName, Inventory, Medicine
+from supplier.models import Supplier, SupplierOrder, SupplierPaymentRecord
+from utils.conditional import CATALOG, SALES, SUPPLIERS, bump_version
+
+# Model -> (scope, path to its organization id, None for shared tables).
+# Bulk writes skip these signals and call bump_version themselves.
+TRACKED = {
+    Medicine: (CATALOG, None),
+    Category: (CATALOG, None),
+    GenericName: (CATALOG, None),
+    Inventory: (CATALOG, "organization_id"),
+    Batch: (CATALOG, "organization_id"),
+    CheckoutOrder: (SALES, "pharmacy_shop_id"),
+    Order: (SALES, "checkout.pharmacy_shop_id"),
+    Payment: (SALES, "checkout_order.pharmacy_shop_id"),
+    CustomerDetails: (SALES, "organization_id"),
+    Supplier: (SUPPLIERS, "organization_id"),
+    SupplierOrder: (SUPPLIERS, "organization_id"),
+    SupplierPaymentRecord: (SUPPLIERS, "organization_id"),
+}
+
+
+def bump_data_version(sender, instance, **kwargs):
+    scope, organization = TRACKED[sender]
+    if organization is None:
+        bump_version(scope)
+        return
+    try:
+        organization_id = attrgetter(organization)(instance)
+    except AttributeError:
+        # e.g. a cart line not attached to a checkout yet
+        return
+    bump_version(scope, organization_id)
+
+
+for model in TRACKED:
+    post_save.connect(bump_data_version, sender=model)
+    post_delete.connect(bump_data_version, sender=model)
@@ -0,0 +1,510 @@
+import io
+import json
+import math
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils import timezone
+
+from checkout.models import (
+    CheckoutOrder,
+    CustomerBalance,
+    CustomerDetails,
+    Order,
+    Payment,
+)
+from checkout.models.checkout_order import StatusChoice
+from checkout.models.customer_details import normalize_contact
+from inventory.models import (
+    Batch,
+    GenericName,
+    Inventory,
+    Medicine,
+    StockMovement,
+    StockMovementKind,
+)
+from supplier.models import Supplier, SupplierOrder
+from supplier.models.supplier_order import SupplierOrderStatus
+from users.models import Organization, User
+from utils.partitions import PARTITIONED_TABLES, ensure_partitions
+
+BENCHMARK_SLUG_PREFIX = "benchmark-pharmacy-"
+BENCHMARK_PASSWORD = "benchmark"
+
+# Shape of the generated data. Override any key with --profile <file.json>.
+DEFAULT_PROFILE = {
+    # Mean sales per day at the start of the history, before weekday weights
+    "orders_per_day": 40,
+    # Sales volume growth per year of history
+    "yearly_growth": 0.1,
+    # Relative sales volume Monday..Sunday
+    "weekday_weights": [1.0, 1.0, 1.0, 1.0, 1.2, 1.3, 0.8],
+    "opening_hours": [8, 23],
+    # Relative frequency of orders with 1, 2, 3... lines
+    "items_per_order": [45, 30, 15, 7, 3],
+    "units_per_item": [1, 10],
+    # Zipf exponent for medicine popularity; 0 sells every batch equally
+    "popularity_skew": 1.1,
+    # Share of sales left on customer credit and how much of those is paid
+    "credit_share": 0.1,
+    "credit_paid_fractions": [0, 0.25, 0.5],
+    "buying_price": [3, 50],
+    "markup": [2, 15],
+    "batch_quantity": [0, 500],
+    "expiry_days": [-30, 540],
+    "stock_alert_qty": [10, 50],
+    "suppliers": 10,
+    "supplier_orders_per_month": 4,
+    "supplier_order_amount": [2000, 50000],
+    "supplier_paid_share": 0.8,
+}
+
+
+def load_profile(path=None):
+    profile = dict(DEFAULT_PROFILE)
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(DEFAULT_PROFILE)
+        if unknown:
+            raise ValueError(f"Unknown profile keys: {', '.join(sorted(unknown))}")
+        profile.update(overrides)
+    return profile
+
+
+def cents(value):
+    """Format integer cents as a numeric literal, e.g. 1234 -> '12.34'"""
+    return f"{value // 100}.{value % 100:02d}"
+
+
+def copy_rows(model, fields, rows):
+    """Stream rows (tuples in `fields` order) into the model's table with COPY"""
+    columns = ", ".join(
+        connection.ops.quote_name(model._meta.get_field(name).column) for name in fields
+    )
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join("\\N" if value is None else str(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    sql = (
+        f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN"
+    )
+    with connection.cursor() as cursor:
+        if is_psycopg3:
+            with cursor.cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            cursor.cursor.copy_expert(sql, buffer)
+
+
+def reserve_ids(model, count):
+    """Take `count` primary keys from the model's sequence up front"""
+    if not count:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+            "FROM generate_series(1, %s)",
+            [model._meta.db_table, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class SyntheticPharmacies:
+    """
+    Generate pharmacies with stock, customers, suppliers and sales history.
+
+    Catalog and stock rows go through bulk_create; the high-volume history
+    tables (checkout orders, order lines, payments, supplier orders) are
+    streamed with COPY using IDs reserved from their sequences. Amounts are
+    kept in integer cents while generating. One seeded Random drives
+    everything, so the same arguments and profile produce the same rows.
+    """
+
+    def __init__(self, seed=0, chunk_size=20000, profile=None, log=None):
+        self.random = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.profile = profile or dict(DEFAULT_PROFILE)
+        self.log = log or (lambda message: None)
+
+    def bulk(self, model, rows):
+        return model.objects.bulk_create(rows, batch_size=self.chunk_size)
+
+    def between(self, key):
+        low, high = self.profile[key]
+        return self.random.randint(low, high)
+
+    def amount(self, key):
+        """Random amount in cents from a profile range given in taka"""
+        low, high = self.profile[key]
+        return self.random.randint(round(low * 100), round(high * 100))
+
+    def medicines(self, count, exclude=(), create_missing=True):
+        """
+        Pick `count` random medicine IDs not in `exclude`. When the catalog is
+        short, synthetic medicines are added, or with create_missing=False
+        every available one is returned.
+        """
+        ids = list(
+            Medicine.objects.exclude(id__in=exclude)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        missing = count - len(ids)
+        if missing > 0 and not create_missing:
+            count = len(ids)
+        elif missing > 0:
+            generics = self.bulk(
+                GenericName,
+                [GenericName(name=f"Benchmark Generic {i:04d}") for i in range(100)],
+            )
+            created = self.bulk(
+                Medicine,
+                [
+                    Medicine(
+                        name=f"Benchmark Medicine {len(ids) + i:06d}",
+                        generic_name=self.random.choice(generics),
+                        dosage=f"{self.random.choice([5, 10, 20, 250, 500])}mg",
+                        pieces_per_strip=10,
+                        strips_per_box=10,
+                        pieces_per_box=100,
+                    )
+                    for i in range(missing)
+                ],
+            )
+            ids += [medicine.id for medicine in created]
+            self.log(f"Created {missing} catalog medicines")
+        return self.random.sample(ids, count)
+
+    def organization(self, index):
+        organization = Organization.objects.create(
+            name=f"Benchmark Pharmacy {index}",
+            address="Benchmark Road",
+            contact_number=f"bench-{index}",
+        )
+        admin = User.objects.create(
+            email=f"benchmark-admin-{index}@example.com",
+            password=make_password(BENCHMARK_PASSWORD),
+            organization=organization,
+            first_name="Benchmark",
+            last_name=f"Admin {index}",
+            user_type="organization",
+            role="admin",
+            is_active=True,
+            is_email_verified=True,
+        )
+        return organization, admin
+
+    def stock(self, organization, medicine_ids, batches_per_item):
+        today = date.today()
+        inventories = self.bulk(
+            Inventory,
+            [
+                Inventory(
+                    medicine_id=medicine_id,
+                    organization=organization,
+                    stock_alert_qty=self.between("stock_alert_qty"),
+                )
+                for medicine_id in medicine_ids
+            ],
+        )
+        batches = []
+        for inventory in inventories:
+            for n in range(batches_per_item):
+                buying_price = self.amount("buying_price")
+                batches.append(
+                    Batch(
+                        inventory=inventory,
+                        organization=organization,
+                        batch_number=f"BATCH-{chr(ord('A') + n)}",
+                        buying_price=cents(buying_price),
+                        selling_price=cents(buying_price + self.amount("markup")),
+                        unit_size=1,
+                        quantity=self.between("batch_quantity"),
+                        alert_quantity=self.random.randint(5, 20),
+                        expiry_date=today + timedelta(days=self.between("expiry_days")),
+                    )
+                )
+        batches = self.bulk(Batch, batches)
+        self.bulk(
+            StockMovement,
+            [
+                StockMovement.of(batch, StockMovementKind.RECEIPT, batch.quantity)
+                for batch in batches
+                if batch.quantity
+            ],
+        )
+
+        quantities = {}
+        for batch in batches:
+            quantities[batch.inventory_id] = (
+                quantities.get(batch.inventory_id, 0) + batch.quantity
+            )
+        for inventory in inventories:
+            inventory.quantity = quantities.get(inventory.id, 0)
+        Inventory.objects.bulk_update(
+            inventories, ["quantity"], batch_size=self.chunk_size
+        )
+        return batches
+
+    def customers(self, organization, count):
+        rows = []
+        for i in range(count):
+            contact = f"01{self.random.randint(300000000, 999999999)}"
+            rows.append(
+                CustomerDetails(
+                    name=f"Customer {organization.id}-{i}",
+                    contact=contact,
+                    contact_normalized=normalize_contact(contact),
+                    organization=organization,
+                )
+            )
+        return self.bulk(CustomerDetails, rows)
+
+    def daily_orders(self, day, years_in):
+        mean = (
+            self.profile["orders_per_day"]
+            * self.profile["weekday_weights"][day.weekday()]
+            * (1 + self.profile["yearly_growth"]) ** years_in
+        )
+        return max(0, round(self.random.gauss(mean, math.sqrt(mean))))
+
+    def sales(self, organization, employee, batches, customers, days):
+        """Checkout history for the last `days` days, written in COPY chunks"""
+        if not batches:
+            return 0
+        tz = timezone.get_current_timezone()
+        start = date.today() - timedelta(days=days)
+        # Rows COPY'd into months without a partition would go to the default one
+        for model in (CheckoutOrder, Order):
+            table = model._meta.db_table
+            ensure_partitions(table, PARTITIONED_TABLES[table], since=start)
+        opening, closing = self.profile["opening_hours"]
+        skew = self.profile["popularity_skew"]
+        popularity = list(
+            accumulate(1 / (rank + 1) ** skew for rank in range(len(batches)))
+        )
+        line_counts = list(range(1, len(self.profile["items_per_order"]) + 1))
+        prices = [
+            (batch.id, batch.inventory_id, round(float(batch.selling_price) * 100))
+            for batch in batches
+        ]
+
+        total = 0
+        pending = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            for _ in range(self.daily_orders(day, offset / 365)):
+                created_at = datetime.combine(
+                    day,
+                    time(
+                        self.random.randrange(opening, closing),
+                        self.random.randrange(60),
+                        self.random.randrange(60),
+                    ),
+                    tz,
+                )
+                lines = self.random.choices(
+                    prices,
+                    cum_weights=popularity,
+                    k=self.random.choices(
+                        line_counts, weights=self.profile["items_per_order"]
+                    )[0],
+                )
+                pending.append((created_at, lines))
+            if len(pending) >= self.chunk_size:
+                total += self._write_sales(organization, employee, customers, pending)
+                pending = []
+        if pending:
+            total += self._write_sales(organization, employee, customers, pending)
+        return total
+
+    def _write_sales(self, organization, employee, customers, pending):
+        pending.sort(key=lambda sale: sale[0])
+        checkout_ids = reserve_ids(CheckoutOrder, len(pending))
+        low_units, high_units = self.profile["units_per_item"]
+        credit_share = self.profile["credit_share"]
+        paid_fractions = self.profile["credit_paid_fractions"]
+
+        checkouts, items, payments = [], [], []
+        for checkout_id, (created_at, lines) in zip(checkout_ids, pending):
+            price = 0
+            for batch_id, inventory_id, unit_price in lines:
+                quantity = self.random.randint(low_units, high_units)
+                line_total = unit_price * quantity
+                price += line_total
+                items.append(
+                    (
+                        checkout_id,
+                        batch_id,
+                        inventory_id,
+                        quantity,
+                        cents(unit_price),
+                        "0.00",
+                        cents(line_total),
+                        created_at,
+                    )
+                )
+
+            customer = None
+            paid = price
+            if customers and self.random.random() < credit_share:
+                customer = self.random.choice(customers)
+                paid = round(price * self.random.choice(paid_fractions))
+            due = price - paid
+            if due <= 0:
+                status = StatusChoice.COMPLETED
+            elif paid > 0:
+                status = StatusChoice.PARTIALLY_PAID
+            else:
+                status = StatusChoice.PENDING
+
+            checkouts.append(
+                (
+                    checkout_id,
+                    organization.id,
+                    employee.id,
+                    customer.id if customer else None,
+                    customer.name if customer else None,
+                    customer.contact if customer else None,
+                    cents(price),
+                    cents(paid),
+                    cents(due),
+                    status,
+                    "0.00",
+                    created_at,
+                )
+            )
+            if customer and paid > 0:
+                payments.append(
+                    (
+                        checkout_id,
+                        customer.id,
+                        cents(paid),
+                        "cash",
+                        "Initial payment during checkout",
+                        created_at,
+                    )
+                )
+
+        copy_rows(
+            CheckoutOrder,
+            [
+                "id",
+                "pharmacy_shop",
+                "employee",
+                "customer",
+                "customer_name",
+                "customer_contact",
+                "checkout_price",
+                "paid_amount",
+                "due_amount",
+                "status",
+                "discount_percentage",
+                "created_at",
+            ],
+            checkouts,
+        )
+        copy_rows(
+            Order,
+            [
+                "checkout",
+                "batch",
+                "inventory",
+                "quantity",
+                "price_per_unit",
+                "discount",
+                "total_price",
+                "created_at",
+            ],
+            items,
+        )
+        copy_rows(
+            Payment,
+            [
+                "checkout_order",
+                "customer",
+                "amount",
+                "payment_method",
+                "notes",
+                "created_at",
+            ],
+            payments,
+        )
+        self.log(
+            f"  {len(checkouts)} sales, {len(items)} lines through {pending[-1][0]:%Y-%m-%d}"
+        )
+        return len(checkouts)
+
+    def suppliers(self, organization, days):
+        """Suppliers with monthly purchase orders over the last `days` days"""
+        suppliers = self.bulk(
+            Supplier,
+            [
+                Supplier(
+                    name=f"Benchmark Supplier {organization.id}-{i}",
+                    organization=organization,
+                    phone=f"01{self.random.randint(300000000, 999999999)}",
+                    supplier_type="distributor",
+                )
+                for i in range(self.profile["suppliers"])
+            ],
+        )
+        if not suppliers:
+            return 0
+
+        tz = timezone.get_current_timezone()
+        start = date.today() - timedelta(days=days)
+        paid_share = self.profile["supplier_paid_share"]
+        orders = []
+        for offset in range(0, days, 30):
+            for _ in range(self.profile["supplier_orders_per_month"]):
+                order_date = start + timedelta(days=offset + self.random.randrange(30))
+                if order_date > date.today():
+                    continue
+                total = self.amount("supplier_order_amount")
+                paid = total if self.random.random() < paid_share else total // 2
+                created_at = datetime.combine(order_date, time(10), tz)
+                orders.append(
+                    (
+                        self.random.choice(suppliers).id,
+                        organization.id,
+                        cents(total),
+                        cents(paid),
+                        cents(total - paid),
+                        order_date,
+                        # Historical orders have all been delivered
+                        SupplierOrderStatus.RECEIVED,
+                        created_at,
+                        created_at,
+                        created_at,
+                    )
+                )
+        copy_rows(
+            SupplierOrder,
+            [
+                "supplier",
+                "organization",
+                "total_amount",
+                "paid_amount",
+                "due_amount",
+                "order_date",
+                "status",
+                "received_at",
+                "created_at",
+                "updated_at",
+            ],
+            orders,
+        )
+        return len(orders)
+
+    def rebuild_balances(self, organizations):
+        return CustomerBalance.objects.rebuild(
+            CustomerDetails.objects.filter(organization__in=organizations),
+            batch_size=self.chunk_size,
+        )
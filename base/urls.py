@@ -0,0 +1,19 @@
+from django.urls import path
+
+from .views import (
+    ExportJobDownloadView,
+    ExportJobListView,
+    ExportJobView,
+    ExportView,
+)
+
+urlpatterns = [
+    path("jobs/", ExportJobListView.as_view(), name="export-jobs"),
+    path("jobs/<int:pk>/", ExportJobView.as_view(), name="export-job"),
+    path(
+        "jobs/<int:pk>/download/",
+        ExportJobDownloadView.as_view(),
+        name="export-job-download",
+    ),
+    path("<str:kind>.<str:file_format>", ExportView.as_view(), name="export"),
+]
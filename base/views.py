@@ -1,3 +1,131 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.db import router
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from utils import metrics
+from utils.exports import CONTENT_TYPES, FORMATS, export_chunks, streaming_export
+from utils.replica import replica_reads
 
-# Create your views here.
+from .exports import EXPORTS
+from .models import ExportJob, ExportJobStatus
+from .serializers import ExportJobSerializer, ExportQuerySerializer
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of request, database, cache and checkout
+    metrics, merged across gunicorn workers when running multiprocess.
+
+    When METRICS_TOKEN is set the scraper must send it as a bearer token.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not constant_time_compare(supplied, token):
+            return HttpResponseForbidden()
+
+    payload, content_type = metrics.render()
+    return HttpResponse(payload, content_type=content_type)
+
+
+def export_for(kind, file_format):
+    if kind not in EXPORTS or file_format not in FORMATS:
+        raise NotFound()
+    return EXPORTS[kind]
+
+
+class ExportView(APIView):
+    """
+    Download orders with their items, payments, supplier orders with their
+    items, or current stock as CSV or XLSX.
+
+    The file is streamed while rows are read, so it starts right away and
+    memory stays flat however large it is. Ranges longer than
+    EXPORT_MAX_SYNC_DAYS days, or any export with ``background=true``, are
+    queued instead: the answer is 202 with a job to poll until its
+    ``download_url`` is set.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        query_serializer=ExportQuerySerializer,
+        responses={200: "The export file", 202: ExportJobSerializer},
+    )
+    def get(self, request, kind, file_format):
+        export = export_for(kind, file_format)
+        query = ExportQuerySerializer(
+            data=request.query_params, context={"export": export}
+        )
+        query.is_valid(raise_exception=True)
+        start = query.validated_data.get("start")
+        end = query.validated_data.get("end")
+
+        if query.validated_data["background"]:
+            job = ExportJob.objects.create(
+                organization=request.user.organization,
+                user=request.user,
+                kind=kind,
+                format=file_format,
+                start=start,
+                end=end,
+            )
+            return Response(
+                ExportJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Location": reverse("export-job", args=[job.pk])},
+            )
+
+        # Rows are read after this returns, outside of any replica_reads
+        # block, so the database is chosen now
+        with replica_reads(request.user.organization_id):
+            using = router.db_for_read(export.model)
+        rows = export.rows(request.user.organization, start, end, using=using)
+        name = ExportJob(kind=kind, format=file_format, start=start, end=end)
+        return streaming_export(
+            export_chunks(file_format, export.header, rows),
+            file_format,
+            name.download_name.removesuffix(f".{file_format}"),
+        )
+
+
+class ExportJobListView(ListAPIView):
+    """The organization's background exports, newest first"""
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = ExportJobSerializer
+
+    def get_queryset(self):
+        return ExportJob.objects.for_organization(
+            self.request.user.organization
+        ).order_by("-created_at")
+
+
+class ExportJobView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = ExportJobSerializer
+
+    def get_queryset(self):
+        return ExportJob.objects.for_organization(self.request.user.organization)
+
+
+class ExportJobDownloadView(ExportJobView):
+    @swagger_auto_schema(responses={200: "The export file"})
+    def get(self, request, *args, **kwargs):
+        job = self.get_object()
+        if job.status != ExportJobStatus.DONE or not job.path.exists():
+            raise NotFound("The export is not ready.")
+        return FileResponse(
+            open(job.path, "rb"),
+            as_attachment=True,
+            filename=job.download_name,
+            content_type=CONTENT_TYPES[job.format],
+        )
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BACKFILL_BALANCES = """
+INSERT INTO checkout_customerbalance
+    (customer_id, organization_id, outstanding_due, lifetime_paid, open_orders, last_activity_at)
+SELECT
+    c.id,
+    c.organization_id,
+    COALESCE((SELECT SUM(o.due_amount) FROM checkout_checkoutorder o WHERE o.customer_id = c.id), 0),
+    COALESCE((SELECT SUM(p.amount) FROM checkout_payment p WHERE p.customer_id = c.id), 0),
+    (SELECT COUNT(*) FROM checkout_checkoutorder o WHERE o.customer_id = c.id AND o.due_amount > 0),
+    GREATEST(
+        (SELECT MAX(o.created_at) FROM checkout_checkoutorder o WHERE o.customer_id = c.id),
+        (SELECT MAX(p.created_at) FROM checkout_payment p WHERE p.customer_id = c.id)
+    )
+FROM checkout_customerdetails c;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0010_customerdetails_organization'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('outstanding_due', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('lifetime_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('open_orders', models.IntegerField(default=0)),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True)),
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='balance', to='checkout.customerdetails')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='customer_balances', to='users.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', '-outstanding_due'], name='custbalance_org_due_idx'), models.Index(condition=models.Q(('outstanding_due__gt', 0)), fields=['organization'], name='custbalance_org_has_due_idx')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_BALANCES, migrations.RunSQL.noop),
+    ]
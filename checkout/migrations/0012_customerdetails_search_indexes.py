@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:38
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0011_customerbalance'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+        ('inventory', '0008_enable_pg_trgm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerdetails',
+            name='contact_normalized',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.RunSQL(
+            r"""
+            UPDATE checkout_customerdetails
+            SET contact_normalized = LEFT(
+                regexp_replace(regexp_replace(COALESCE(contact, ''), '\D', '', 'g'), '^880', '0'),
+                20
+            );
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='customerdetails',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='customer_name_gin_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='customerdetails',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['contact'], name='customer_contact_gin_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='customerdetails',
+            index=models.Index(fields=['organization', 'contact_normalized'], name='customer_org_contact_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0012_customerdetails_search_indexes'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checkoutorder',
+            index=models.Index(fields=['pharmacy_shop', '-created_at'], name='checkout_shop_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderdetails',
+            index=models.Index(fields=['pharmacy_shop', '-created_at'], name='orderdetails_shop_created_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:06
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0013_tenant_indexes'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checkoutorder',
+            name='client_uuid',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='checkoutorder',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='checkoutorder',
+            constraint=models.UniqueConstraint(fields=('pharmacy_shop', 'client_uuid'), name='checkout_shop_client_uuid_uniq'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from utils.partitions import partition_by_month, unpartition
+
+PARTITIONED = ["checkout_checkoutorder", "checkout_order"]
+
+
+def partition_tables(apps, schema_editor):
+    # Items used to get their own created_at, so some fall in a later month
+    # than their checkout; give them the checkout's, so a month's items sit
+    # in the same partition as its checkouts and are archived with them
+    schema_editor.execute(
+        "UPDATE checkout_order o SET created_at = c.created_at "
+        "FROM checkout_checkoutorder c "
+        "WHERE o.checkout_id = c.id AND o.created_at <> c.created_at"
+    )
+    for table in PARTITIONED:
+        partition_by_month(table, "created_at")
+
+
+def unpartition_tables(apps, schema_editor):
+    for table in PARTITIONED:
+        unpartition(table, "created_at")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0014_checkoutorder_client_uuid'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='checkoutorder',
+            name='checkout_shop_client_uuid_uniq',
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='checkout',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='checkout.checkoutorder'),
+        ),
+        migrations.AlterField(
+            model_name='orderdetails',
+            name='checkout',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='checkout.checkoutorder'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='checkout_order',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='checkout.checkoutorder'),
+        ),
+        migrations.AddConstraint(
+            model_name='checkoutorder',
+            constraint=models.UniqueConstraint(fields=('pharmacy_shop', 'client_uuid', 'created_at'), name='checkout_shop_client_uuid_uniq'),
+        ),
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
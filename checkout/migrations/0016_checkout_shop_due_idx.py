@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0015_partition_checkout_tables'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checkoutorder',
+            index=models.Index(condition=models.Q(('due_amount', 0), _negated=True), fields=['pharmacy_shop'], name='checkout_shop_due_idx'),
+        ),
+    ]
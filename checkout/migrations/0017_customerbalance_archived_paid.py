@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0016_checkout_shop_due_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerbalance',
+            name='archived_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+    ]
@@ -3,3 +3,4 @@ from .checkout_order import CheckoutOrder
 from .order_details import OrderDetails
 from .customer_details import *
 from .checkout_payment import Payment
+from .customer_balance import CustomerBalance
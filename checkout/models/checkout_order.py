@@ -1,10 +1,13 @@
 from django.db import models, transaction
 from django.contrib import admin
+from django.utils import timezone
 from users.models.organization import Organization
 from inventory.models.product import Medicine
 from inventory.models.stockpile import Inventory
 from users.models.user import User
 from ..models.customer_details import CustomerDetails
+from ..models.customer_balance import CustomerBalance
+from utils.managers import TenantQuerySet
 from decimal import Decimal
 
 
@@ -14,6 +17,19 @@ class StatusChoice(models.TextChoices):
     PARTIALLY_PAID = "partially_paid", "Partially Paid"
 
 
+class CheckoutOrderQuerySet(TenantQuerySet):
+    def with_details(self):
+        """Load everything CheckoutOrderSerializer touches in a fixed number of queries"""
+        return self.select_related("pharmacy_shop", "employee").prefetch_related(
+            models.Prefetch(
+                "customer", queryset=CustomerDetails.objects.with_balance()
+            ),
+            "payments__customer",
+            "items__batch",
+            "items__inventory__medicine",
+        )
+
+
 class CheckoutOrder(models.Model):
     pharmacy_shop = models.ForeignKey(Organization, on_delete=models.CASCADE)
     employee = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -42,14 +58,52 @@ class CheckoutOrder(models.Model):
     customer_name = models.CharField(max_length=100, null=True, blank=True)
     customer_contact = models.CharField(max_length=100, null=True, blank=True)
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Client-generated id of a sale uploaded through /checkout/sync/
+    client_uuid = models.UUIDField(null=True, blank=True, editable=False)
+
+    # Not auto_now_add: sales synced from offline tills keep their own time.
+    # The table is range-partitioned by month on it (migration 0015).
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    tenant_field = "pharmacy_shop"
+
+    objects = CheckoutOrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["pharmacy_shop", "-created_at"],
+                name="checkout_shop_created_idx",
+            ),
+            # Orders still owing (or overpaid), for the dues reports
+            models.Index(
+                fields=["pharmacy_shop"],
+                condition=~models.Q(due_amount=0),
+                name="checkout_shop_due_idx",
+            ),
+        ]
+        constraints = [
+            # Unique keys of a partitioned table must include the partition
+            # key; SalesSync serializes each shop's syncs, so resends are
+            # still found before inserting
+            models.UniqueConstraint(
+                fields=["pharmacy_shop", "client_uuid", "created_at"],
+                name="checkout_shop_client_uuid_uniq",
+            ),
+        ]
 
     def update_total_price(self):
         """Recalculate the total price based on all related Order items"""
+        previous_due = self.due_amount
         total = self.items.aggregate(models.Sum("total_price"))["total_price__sum"] or 0
         self.checkout_price = total
         self.due_amount = Decimal(total) - self.paid_amount
         self.save()
+        CustomerBalance.objects.apply(
+            self.customer_id,
+            due=self.due_amount - previous_due,
+            open_orders=int(self.due_amount > 0) - int(previous_due > 0),
+        )
 
     def update_status(self):
         """Update order status based on payment"""
@@ -1,13 +1,20 @@
-from django.db import models
+from django.db import models, transaction
 from ..models.checkout_order import CheckoutOrder
 from ..models.customer_details import CustomerDetails
+from ..models.customer_balance import CustomerBalance, to_amount
 from django.contrib import admin
+from django.utils import timezone
+from utils.managers import TenantQuerySet
 from decimal import Decimal
 
 
 class Payment(models.Model):
+    # No database constraint, CheckoutOrder is partitioned
     checkout_order = models.ForeignKey(
-        CheckoutOrder, on_delete=models.CASCADE, related_name="payments"
+        CheckoutOrder,
+        on_delete=models.CASCADE,
+        related_name="payments",
+        db_constraint=False,
     )
     customer = models.ForeignKey(
         CustomerDetails, on_delete=models.CASCADE, related_name="payments"
@@ -24,9 +31,26 @@ class Payment(models.Model):
         default="cash",
     )
     notes = models.TextField(blank=True, null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
+    tenant_field = "checkout_order__pharmacy_shop"
+
+    objects = TenantQuerySet.as_manager()
+
+    @transaction.atomic
     def save(self, *args, **kwargs):
+        # The payment, the order's paid/due amounts and the customer's
+        # balance are written together or not at all
+        previous_paid = 0
+        if not self._state.adding:
+            # An edited amount changes lifetime_paid by the difference
+            previous_paid = (
+                Payment.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("amount", flat=True)
+                .first()
+            )
+        previous_due = self.checkout_order.due_amount
         super().save(*args, **kwargs)
         # Update checkout order payment status
         self.checkout_order.paid_amount = (
@@ -40,6 +64,14 @@ class Payment(models.Model):
         )
         self.checkout_order.update_status()
 
+        current_due = self.checkout_order.due_amount
+        CustomerBalance.objects.apply(
+            self.customer_id,
+            due=to_amount(current_due) - to_amount(previous_due),
+            paid=to_amount(self.amount) - to_amount(previous_paid),
+            open_orders=int(current_due > 0) - int(previous_due > 0),
+        )
+
     def __str__(self):
         return f"Payment {self.amount} for Order {self.checkout_order.id}"
 
@@ -0,0 +1,194 @@
+from django.db import models
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.contrib import admin
+from django.utils import timezone
+from users.models import Organization
+from ..models.customer_details import CustomerDetails
+from utils.managers import TenantQuerySet
+from decimal import Decimal
+
+
+def to_amount(value):
+    """Coerce a float/Decimal amount to a 2-place Decimal"""
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+class CustomerBalanceQuerySet(TenantQuerySet):
+    def apply(self, customer_id, due=0, paid=0, open_orders=0):
+        """
+        Add the given deltas to a customer's running totals.
+
+        Must be called inside the transaction that wrote the checkout order or
+        payment. A customer without a balance row yet is seeded from the
+        source rows, which already include the current write.
+        """
+        if not customer_id:
+            return
+        updated = self.filter(customer_id=customer_id).update(
+            outstanding_due=F("outstanding_due") + to_amount(due),
+            lifetime_paid=F("lifetime_paid") + to_amount(paid),
+            open_orders=F("open_orders") + open_orders,
+            last_activity_at=timezone.now(),
+        )
+        if not updated:
+            self.rebuild(CustomerDetails.objects.filter(id=customer_id))
+
+    def rebuild(self, customers, batch_size=1000):
+        """Recompute balances of the given customers from orders and payments"""
+        from .checkout_order import CheckoutOrder
+        from .checkout_payment import Payment
+
+        open_orders_subquery = (
+            CheckoutOrder.objects.filter(customer=OuterRef("pk"), due_amount__gt=0)
+            .order_by()
+            .values("customer")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        last_order_subquery = (
+            CheckoutOrder.objects.filter(customer=OuterRef("pk"))
+            .order_by()
+            .values("customer")
+            .annotate(last=Max("created_at"))
+            .values("last")
+        )
+        last_payment_subquery = (
+            Payment.objects.filter(customer=OuterRef("pk"))
+            .order_by()
+            .values("customer")
+            .annotate(last=Max("created_at"))
+            .values("last")
+        )
+        rows = (
+            customers.with_totals()
+            .annotate(
+                # Payments taken out by archive_partitions still count
+                archived_paid=Coalesce(F("balance__archived_paid"), Decimal("0.00")),
+                open_count=Subquery(open_orders_subquery),
+                last_order_at=Subquery(last_order_subquery),
+                last_payment_at=Subquery(last_payment_subquery),
+            )
+            .order_by()
+            .values(
+                "id",
+                "organization_id",
+                "due_total",
+                "paid_total",
+                "archived_paid",
+                "open_count",
+                "last_order_at",
+                "last_payment_at",
+            )
+        )
+
+        balances = []
+        count = 0
+        for row in rows.iterator(chunk_size=batch_size):
+            activity = [
+                at for at in (row["last_order_at"], row["last_payment_at"]) if at
+            ]
+            balances.append(
+                self.model(
+                    customer_id=row["id"],
+                    organization_id=row["organization_id"],
+                    outstanding_due=row["due_total"],
+                    lifetime_paid=row["paid_total"] + row["archived_paid"],
+                    open_orders=row["open_count"] or 0,
+                    last_activity_at=max(activity) if activity else None,
+                )
+            )
+            if len(balances) >= batch_size:
+                count += self._upsert(balances)
+                balances = []
+        if balances:
+            count += self._upsert(balances)
+        return count
+
+    def archive_payments(self, payments):
+        """
+        Move the amounts of ``payments``, which are about to be archived,
+        into their customers' ``archived_paid``. Customers without a balance
+        row get one first, computed while the payments still exist.
+        """
+        customer_ids = set(payments.values_list("customer_id", flat=True))
+        self.rebuild(
+            CustomerDetails.objects.filter(id__in=customer_ids, balance__isnull=True)
+        )
+        archived = (
+            payments.filter(customer_id=OuterRef("customer_id"))
+            .order_by()
+            .values("customer_id")
+            .annotate(total=Sum("amount"))
+            .values("total")
+        )
+        return self.filter(customer_id__in=customer_ids).update(
+            archived_paid=F("archived_paid") + Subquery(archived)
+        )
+
+    def _upsert(self, balances):
+        self.bulk_create(
+            balances,
+            update_conflicts=True,
+            unique_fields=["customer"],
+            update_fields=[
+                "organization",
+                "outstanding_due",
+                "lifetime_paid",
+                "open_orders",
+                "last_activity_at",
+            ],
+        )
+        return len(balances)
+
+
+class CustomerBalance(models.Model):
+    """Running due/paid totals per customer, kept in step with checkout writes"""
+
+    customer = models.OneToOneField(
+        CustomerDetails, on_delete=models.CASCADE, related_name="balance"
+    )
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="customer_balances",
+        null=True,
+        blank=True,
+    )
+    outstanding_due = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    lifetime_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Part of lifetime_paid whose payments archive_partitions moved out of the
+    # database, so rebuilding from the remaining payments still adds up
+    archived_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    open_orders = models.IntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+
+    objects = CustomerBalanceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["organization", "-outstanding_due"],
+                name="custbalance_org_due_idx",
+            ),
+            models.Index(
+                fields=["organization"],
+                condition=Q(outstanding_due__gt=0),
+                name="custbalance_org_has_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.customer} - due {self.outstanding_due}"
+
+
+@admin.register(CustomerBalance)
+class CustomerBalanceAdmin(admin.ModelAdmin):
+    list_display = (
+        "customer",
+        "organization",
+        "outstanding_due",
+        "lifetime_paid",
+        "open_orders",
+        "last_activity_at",
+    )
@@ -1,11 +1,62 @@
+import re
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib import admin
 from users.models import Organization
+from utils.managers import TenantQuerySet
+from decimal import Decimal
+
+
+def normalize_contact(contact):
+    """Reduce a phone number to its local digits, e.g. +880 1712-345678 -> 01712345678"""
+    digits = re.sub(r"\D", "", contact or "")
+    return re.sub(r"^880", "0", digits)
+
+
+class CustomerDetailsQuerySet(TenantQuerySet):
+    def with_totals(self):
+        """Annotate due and paid totals with correlated subqueries"""
+        from .checkout_order import CheckoutOrder
+        from .checkout_payment import Payment
+
+        due_subquery = (
+            CheckoutOrder.objects.filter(customer=OuterRef("pk"))
+            .order_by()
+            .values("customer")
+            .annotate(total=Sum("due_amount"))
+            .values("total")
+        )
+        paid_subquery = (
+            Payment.objects.filter(customer=OuterRef("pk"))
+            .order_by()
+            .values("customer")
+            .annotate(total=Sum("amount"))
+            .values("total")
+        )
+        amount_field = models.DecimalField(max_digits=12, decimal_places=2)
+        return self.annotate(
+            due_total=Coalesce(
+                Subquery(due_subquery, output_field=amount_field), Decimal("0.00")
+            ),
+            paid_total=Coalesce(
+                Subquery(paid_subquery, output_field=amount_field), Decimal("0.00")
+            ),
+        )
+
+    def with_balance(self):
+        """Annotate due and paid totals from the CustomerBalance ledger"""
+        return self.annotate(
+            due_total=Coalesce(F("balance__outstanding_due"), Decimal("0.00")),
+            paid_total=Coalesce(F("balance__lifetime_paid"), Decimal("0.00")),
+        )
 
 
 class CustomerDetails(models.Model):
     name = models.CharField(max_length=100, null=True, blank=True)
     contact = models.CharField(max_length=100, null=True, blank=True)
+    contact_normalized = models.CharField(max_length=20, blank=True, default="")
     organization = models.ForeignKey(
         Organization,
         on_delete=models.CASCADE,
@@ -14,15 +65,39 @@ class CustomerDetails(models.Model):
         blank=True,
     )
 
+    objects = CustomerDetailsQuerySet.as_manager()
+
     class Meta:
         unique_together = ("name", "contact")
+        indexes = [
+            GinIndex(
+                fields=["name"],
+                name="customer_name_gin_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["contact"],
+                name="customer_contact_gin_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+            models.Index(
+                fields=["organization", "contact_normalized"],
+                name="customer_org_contact_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.contact}"
 
+    def save(self, *args, **kwargs):
+        self.contact_normalized = normalize_contact(self.contact)[:20]
+        super().save(*args, **kwargs)
+
     @property
     def total_due_amount(self):
         """Calculate total due amount for this customer"""
+        if hasattr(self, "due_total"):
+            return self.due_total
         return (
             self.checkout_orders.all().aggregate(total=models.Sum("due_amount"))[
                 "total"
@@ -33,6 +108,8 @@ class CustomerDetails(models.Model):
     @property
     def total_paid_amount(self):
         """Calculate total paid amount for this customer"""
+        if hasattr(self, "paid_total"):
+            return self.paid_total
         return self.payments.aggregate(total=models.Sum("amount"))["total"] or 0
 
 
@@ -1,19 +1,24 @@
 from django.db import models, transaction
 from django.contrib import admin
+from django.utils import timezone
 from inventory.models.product import Medicine
 from inventory.models.stockpile import Inventory
 from inventory.models.batch import Batch
 from .checkout_order import CheckoutOrder
 from django.core.validators import MinValueValidator, MaxValueValidator
+from utils.managers import TenantQuerySet
 
 
 class Order(models.Model):
+    # No database constraint: CheckoutOrder is partitioned, and its primary
+    # key includes created_at
     checkout = models.ForeignKey(
         CheckoutOrder,
         on_delete=models.CASCADE,
         related_name="items",
         null=True,
         blank=True,
+        db_constraint=False,
     )
     batch = models.ForeignKey(
         Batch, on_delete=models.CASCADE, related_name="orders", null=True
@@ -30,7 +35,19 @@ class Order(models.Model):
         validators=[MinValueValidator(0.00), MaxValueValidator(100.00)],
     )
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Same as the checkout's, so an order and its items share a partition
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    tenant_field = "checkout__pharmacy_shop"
+
+    objects = TenantQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        # Items added later to a checkout still go to its month's partition,
+        # so the month is archived whole
+        if self._state.adding and self.checkout_id:
+            self.created_at = self.checkout.created_at
+        super().save(*args, **kwargs)
 
 
 @admin.register(Order)
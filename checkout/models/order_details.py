@@ -5,16 +5,34 @@ from inventory.models.product import Medicine
 from ..models.order import Order
 from ..models.checkout_order import CheckoutOrder
 from users.models.user import User
+from utils.managers import TenantQuerySet
 
 
 class OrderDetails(models.Model):
     pharmacy_shop = models.ForeignKey(Organization, on_delete=models.CASCADE)
+    # No database constraint, CheckoutOrder is partitioned
     checkout = models.ForeignKey(
-        CheckoutOrder, on_delete=models.CASCADE, null=True, blank=True
+        CheckoutOrder,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        db_constraint=False,
     )
     employee = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    tenant_field = "pharmacy_shop"
+
+    objects = TenantQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["pharmacy_shop", "-created_at"],
+                name="orderdetails_shop_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return (
             f"Order {self.id}, {self.pharmacy_shop.name} by {self.employee.first_name}"
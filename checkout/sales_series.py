@@ -0,0 +1,114 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DateField, DecimalField, IntegerField, Sum, Value
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models.checkout_order import CheckoutOrder
+from .models.checkout_payment import Payment
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+
+TRUNCATE = {DAY: TruncDay, WEEK: TruncWeek, MONTH: TruncMonth}
+
+ZERO = Value(Decimal("0"), output_field=DecimalField(max_digits=15, decimal_places=2))
+
+
+def bucket_start(day, interval):
+    """The first day of the bucket holding ``day``; weeks start on Monday"""
+    if interval == WEEK:
+        return day - timedelta(days=day.weekday())
+    if interval == MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, interval):
+    if interval == WEEK:
+        return day + timedelta(weeks=1)
+    if interval == MONTH:
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def buckets(start, end, interval):
+    """First days of the buckets covering the days ``start`` through ``end``"""
+    day = bucket_start(start, interval)
+    while day <= end:
+        yield day
+        day = next_bucket(day, interval)
+
+
+def bucketed(organization, interval, start, end, tz):
+    """
+    Sales, orders and dues of the checkouts created in each bucket, and the
+    payments collected in it, as one grouped query.
+
+    Both tables are truncated to the bucket in ``tz``, so a day runs from
+    local midnight to local midnight; whole buckets are read even when
+    ``start`` or ``end`` falls inside one. Rows of either table come back
+    separately (UNION ALL), at most two per bucket, and only for buckets
+    with activity; ``fill_gaps`` merges them into the full series.
+    """
+    since = timezone.make_aware(
+        datetime.combine(bucket_start(start, interval), time.min), tz
+    )
+    until = timezone.make_aware(
+        datetime.combine(next_bucket(bucket_start(end, interval), interval), time.min),
+        tz,
+    )
+
+    def bucket(field):
+        return TRUNCATE[interval](field, tzinfo=tz, output_field=DateField())
+
+    checkouts = (
+        CheckoutOrder.objects.for_organization(organization)
+        .filter(created_at__gte=since, created_at__lt=until)
+        .annotate(bucket=bucket("created_at"))
+        .values("bucket")
+        .annotate(
+            sales=Coalesce(Sum("checkout_price"), ZERO),
+            orders=Count("id"),
+            dues=Coalesce(Sum("due_amount"), ZERO),
+            collections=ZERO,
+        )
+        .order_by()
+    )
+    payments = (
+        Payment.objects.for_organization(organization)
+        .filter(created_at__gte=since, created_at__lt=until)
+        .annotate(bucket=bucket("created_at"))
+        .values("bucket")
+        .annotate(
+            sales=ZERO,
+            orders=Value(0, output_field=IntegerField()),
+            dues=ZERO,
+            collections=Coalesce(Sum("amount"), ZERO),
+        )
+        .order_by()
+    )
+    return checkouts.union(payments, all=True)
+
+
+def fill_gaps(rows, interval, start, end):
+    """Every bucket from ``start`` to ``end``, with zeros where nothing happened"""
+    series = {
+        day: {
+            "start": day,
+            "sales": Decimal("0"),
+            "orders": 0,
+            "dues": Decimal("0"),
+            "collections": Decimal("0"),
+        }
+        for day in buckets(start, end, interval)
+    }
+    for row in rows:
+        point = series.get(row["bucket"])
+        if point is None:
+            continue
+        for field in ["sales", "orders", "dues", "collections"]:
+            point[field] += row[field]
+    return list(series.values())
@@ -0,0 +1,341 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from inventory.models.batch import Batch
+from inventory.models.stock_movement import StockMovement, StockMovementKind
+from inventory.models.stockpile import Inventory
+from users.models import User
+from utils.conditional import CATALOG, SALES, bump_version
+from .models.checkout_order import CheckoutOrder
+from .models.checkout_payment import Payment
+from .models.customer_balance import CustomerBalance, to_amount
+from .models.customer_details import CustomerDetails, normalize_contact
+from .models.order import Order
+from .serializers.ordercheck import checkout_totals, item_total, record_checkout
+from .serializers.sync import SyncSaleSerializer
+
+CREATED = "created"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+
+class Rejected(Exception):
+    pass
+
+
+class SalesSync:
+    """
+    Apply sales recorded by an offline till, CHECKOUT_SYNC_CHUNK_SIZE at a
+    time.
+
+    Each chunk is one transaction: its batches are locked once, stock is
+    checked and decremented in memory and every table is written with a
+    handful of bulk statements instead of a round of queries per item. Sales
+    are keyed by their client uuid, so a till can resend a batch that timed
+    out and only the sales not applied yet are created.
+    """
+
+    def __init__(self, organization, user):
+        self.organization = organization
+        self.user = user
+
+    def run(self, raw_sales):
+        results = []
+        pending = []
+        first_seen = {}
+        for raw in raw_sales:
+            serializer = SyncSaleSerializer(data=raw)
+            if not serializer.is_valid():
+                results.append(
+                    {
+                        "uuid": str(raw.get("uuid", "")),
+                        "status": REJECTED,
+                        "errors": serializer.errors,
+                    }
+                )
+                continue
+            sale = serializer.validated_data
+            result = {"uuid": str(sale["uuid"])}
+            results.append(result)
+            if sale["uuid"] in first_seen:
+                # Sent twice in the same request, report it like a resend
+                result.update(status=DUPLICATE, first=first_seen[sale["uuid"]])
+                continue
+            first_seen[sale["uuid"]] = result
+            pending.append((sale, result))
+
+        chunk_size = settings.CHECKOUT_SYNC_CHUNK_SIZE
+        for start in range(0, len(pending), chunk_size):
+            self.apply_chunk(pending[start : start + chunk_size])
+
+        for result in results:
+            first = result.pop("first", None)
+            if first is None:
+                continue
+            if first["status"] == REJECTED:
+                result.update(status=REJECTED, errors=first["errors"])
+            elif "id" in first:
+                result["id"] = first["id"]
+        return results
+
+    @transaction.atomic
+    def apply_chunk(self, chunk):
+        self.lock()
+        uuids = [sale["uuid"] for sale, _ in chunk]
+        applied = dict(
+            CheckoutOrder.objects.for_organization(self.organization)
+            .filter(client_uuid__in=uuids)
+            .values_list("client_uuid", "id")
+        )
+        employees = self.employees(chunk)
+        batches = self.lock_batches(chunk)
+
+        accepted = []
+        for sale, result in chunk:
+            if sale["uuid"] in applied:
+                result.update(status=DUPLICATE, id=applied[sale["uuid"]])
+                continue
+            try:
+                employee_id = self.employee_for(sale, employees)
+                totals = checkout_totals(sale["amount"])
+                if totals["due_amount"] > 0 and not self.customer_key(sale):
+                    raise Rejected(
+                        "Customer name and contact are required for due payments."
+                    )
+                self.take_stock(sale, batches)
+            except Rejected as e:
+                result.update(status=REJECTED, errors=[str(e)])
+                continue
+            accepted.append((sale, result, employee_id, totals))
+
+        customers = self.resolve_customers(accepted)
+        sales = []
+        for sale, result, employee_id, totals in accepted:
+            key = self.customer_key(sale)
+            if key and key not in customers:
+                self.return_stock(sale, batches)
+                result.update(
+                    status=REJECTED,
+                    errors=["This customer belongs to another organization."],
+                )
+                continue
+            sales.append((sale, result, employee_id, totals, customers.get(key)))
+
+        self.create_sales(sales, batches)
+
+    def lock(self):
+        """Serialize syncs of an organization so a resend waits for the first"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s), %s)",
+                ["checkout-sync", self.organization.id],
+            )
+
+    def employees(self, chunk):
+        ids = {sale["employee"] for sale, _ in chunk if "employee" in sale}
+        return set(
+            User.objects.filter(organization=self.organization, id__in=ids).values_list(
+                "id", flat=True
+            )
+        )
+
+    def employee_for(self, sale, employees):
+        if "employee" not in sale:
+            return self.user.id
+        if sale["employee"] not in employees:
+            raise Rejected(f"Employee {sale['employee']} not found.")
+        return sale["employee"]
+
+    def lock_batches(self, chunk):
+        ids = {item["selectedBatchId"] for sale, _ in chunk for item in sale["items"]}
+        return {
+            batch.id: batch
+            for batch in Batch.objects.for_organization(self.organization)
+            .filter(id__in=ids)
+            .select_for_update()
+            .order_by("id")
+        }
+
+    @staticmethod
+    def pieces(sale):
+        needed = Counter()
+        for item in sale["items"]:
+            needed[item["selectedBatchId"]] += (
+                item["selectedUnitQuantity"] * item["selectedUnitItem"]
+            )
+        return needed
+
+    def take_stock(self, sale, batches):
+        needed = self.pieces(sale)
+        for batch_id, quantity in needed.items():
+            batch = batches.get(batch_id)
+            if batch is None:
+                raise Rejected(f"Batch with id {batch_id} not found.")
+            if batch.quantity < quantity:
+                raise Rejected(
+                    f"Insufficient stock for batch {batch_id}. "
+                    f"Available: {batch.quantity}, Required: {quantity}"
+                )
+        for batch_id, quantity in needed.items():
+            batches[batch_id].quantity -= quantity
+
+    def return_stock(self, sale, batches):
+        for batch_id, quantity in self.pieces(sale).items():
+            batches[batch_id].quantity += quantity
+
+    @staticmethod
+    def customer_key(sale):
+        name, contact = sale.get("customer_name"), sale.get("customer_contact")
+        if name and contact:
+            return name, contact
+        return None
+
+    def resolve_customers(self, accepted):
+        """Get or create the customers of the accepted sales, keyed by (name, contact)"""
+        keys = {self.customer_key(sale) for sale, *_ in accepted} - {None}
+        if not keys:
+            return {}
+
+        def fetch():
+            return {
+                (customer.name, customer.contact): customer
+                for customer in CustomerDetails.objects.filter(
+                    organization=self.organization,
+                    name__in={name for name, _ in keys},
+                    contact__in={contact for _, contact in keys},
+                )
+                if (customer.name, customer.contact) in keys
+            }
+
+        customers = fetch()
+        missing = keys - customers.keys()
+        if missing:
+            CustomerDetails.objects.bulk_create(
+                [
+                    CustomerDetails(
+                        name=name,
+                        contact=contact,
+                        contact_normalized=normalize_contact(contact)[:20],
+                        organization=self.organization,
+                    )
+                    for name, contact in missing
+                ],
+                ignore_conflicts=True,
+            )
+            customers = fetch()
+        return customers
+
+    def create_sales(self, sales, batches):
+        if not sales:
+            return
+        now = timezone.now()
+        checkouts = []
+        for sale, _, employee_id, totals, customer in sales:
+            sale["created_at"] = min(sale.get("sold_at") or now, now)
+            checkouts.append(
+                CheckoutOrder(
+                    pharmacy_shop=self.organization,
+                    employee_id=employee_id,
+                    customer=customer,
+                    customer_name=sale.get("customer_name"),
+                    customer_contact=sale.get("customer_contact"),
+                    client_uuid=sale["uuid"],
+                    discount_percentage=totals["discount_percentage"],
+                    status=totals["status"],
+                    checkout_price=totals["final_amount"],
+                    paid_amount=totals["actual_paid"],
+                    due_amount=totals["due_amount"],
+                    created_at=sale["created_at"],
+                )
+            )
+        CheckoutOrder.objects.bulk_create(checkouts)
+
+        orders = []
+        movements = []
+        payments = []
+        balances = defaultdict(lambda: {"due": 0, "paid": 0, "open_orders": 0})
+        for (sale, result, _, totals, customer), checkout in zip(sales, checkouts):
+            result.update(status=CREATED, id=checkout.id)
+            discount_percentage = totals["discount_percentage"]
+            for item in sale["items"]:
+                batch = batches[item["selectedBatchId"]]
+                quantity = item["selectedUnitQuantity"] * item["selectedUnitItem"]
+                orders.append(
+                    Order(
+                        checkout=checkout,
+                        batch=batch,
+                        inventory_id=batch.inventory_id,
+                        quantity=quantity,
+                        price_per_unit=item["per_piece_price"],
+                        discount=discount_percentage,
+                        total_price=item_total(
+                            item["selling_price"],
+                            item["selectedUnitItem"],
+                            discount_percentage,
+                        ),
+                        created_at=sale["created_at"],
+                    )
+                )
+                movements.append(
+                    StockMovement.of(
+                        batch,
+                        StockMovementKind.SALE,
+                        -quantity,
+                        reference_type="checkout",
+                        reference_id=checkout.id,
+                        user_id=checkout.employee_id,
+                        created_at=sale["created_at"],
+                    )
+                )
+            if customer is None:
+                continue
+            balance = balances[customer.id]
+            balance["due"] += to_amount(totals["due_amount"])
+            balance["open_orders"] += int(totals["due_amount"] > 0)
+            if totals["actual_paid"] > 0:
+                payments.append(
+                    Payment(
+                        checkout_order=checkout,
+                        customer=customer,
+                        amount=totals["actual_paid"],
+                        payment_method="cash",
+                        notes="Initial payment during checkout",
+                        created_at=sale["created_at"],
+                    )
+                )
+                balance["paid"] += to_amount(totals["actual_paid"])
+
+        Order.objects.bulk_create(orders)
+        StockMovement.objects.record(movements)
+        Payment.objects.bulk_create(payments)
+
+        touched = [
+            batches[batch_id]
+            for batch_id in {
+                item["selectedBatchId"] for sale, *_ in sales for item in sale["items"]
+            }
+        ]
+        for batch in touched:
+            batch.updated_at = now
+        Batch.objects.bulk_update(touched, ["quantity", "updated_at"])
+        Inventory.objects.filter(
+            id__in={batch.inventory_id for batch in touched}
+        ).sync_quantities()
+
+        for customer_id, deltas in balances.items():
+            CustomerBalance.objects.apply(customer_id, **deltas)
+
+        # Bulk writes skip the model signals that usually do this
+        bump_version(SALES, self.organization.id)
+        bump_version(CATALOG, self.organization.id)
+
+        for sale, _, _, totals, _ in sales:
+            transaction.on_commit(
+                lambda status=totals["status"], count=len(sale["items"]): (
+                    record_checkout(status, count)
+                ),
+                robust=True,
+            )
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from ..models.checkout_payment import Payment
 from ..models.checkout_order import CheckoutOrder
@@ -26,9 +27,13 @@ class MakePaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = ["checkout_order_id", "amount", "payment_method", "notes"]
 
+    def get_checkout_orders(self):
+        request = self.context.get("request")
+        return CheckoutOrder.objects.for_organization(request.user.organization)
+
     def validate_checkout_order_id(self, value):
         try:
-            checkout_order = CheckoutOrder.objects.get(id=value)
+            checkout_order = self.get_checkout_orders().get(id=value)
             if checkout_order.due_amount <= 0:
                 raise serializers.ValidationError("This order is already fully paid.")
             return value
@@ -40,9 +45,13 @@ class MakePaymentSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Payment amount must be greater than 0.")
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
         checkout_order_id = validated_data.pop("checkout_order_id")
-        checkout_order = CheckoutOrder.objects.get(id=checkout_order_id)
+        # Locked so concurrent payments cannot both pass the due check
+        checkout_order = (
+            self.get_checkout_orders().select_for_update().get(id=checkout_order_id)
+        )
 
         # Validate payment amount doesn't exceed due amount
         if validated_data["amount"] > checkout_order.due_amount:
@@ -14,6 +14,19 @@ class CustomerDetailsSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "contact", "total_due_amount", "total_paid_amount"]
 
 
+class CustomerSummarySerializer(CustomerDetailsSerializer):
+    open_orders = serializers.IntegerField(read_only=True)
+    order_count = serializers.IntegerField(read_only=True)
+    last_activity_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(CustomerDetailsSerializer.Meta):
+        fields = CustomerDetailsSerializer.Meta.fields + [
+            "open_orders",
+            "order_count",
+            "last_activity_at",
+        ]
+
+
 class PayTotalDueSerializer(serializers.Serializer):
     amount = serializers.DecimalField(max_digits=10, decimal_places=2)
     payment_method = serializers.ChoiceField(
@@ -1,5 +1,13 @@
+import zoneinfo
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
 
+from utils.partitions import add_months
+
+from ..sales_series import DAY, MONTH, TRUNCATE, WEEK, buckets
+
 
 class SalesAndProfitDashboardSerializer(serializers.Serializer):
     total_order = serializers.IntegerField()
@@ -20,3 +28,61 @@ class SupplierDashboardSerializer(serializers.Serializer):
     total_orders_amount = serializers.DecimalField(max_digits=15, decimal_places=2)
     total_dues = serializers.DecimalField(max_digits=15, decimal_places=2)
     orders_with_due = serializers.IntegerField()
+
+
+class SalesSeriesQuerySerializer(serializers.Serializer):
+    # Buckets a single request may ask for
+    MAX_BUCKETS = 400
+
+    interval = serializers.ChoiceField(choices=list(TRUNCATE), default=DAY)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    tz = serializers.CharField(
+        required=False, help_text="IANA time zone of the shop, like Asia/Dhaka"
+    )
+
+    def validate_tz(self, value):
+        try:
+            return zoneinfo.ZoneInfo(value)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError("Unknown time zone.")
+
+    def validate(self, attrs):
+        tz = attrs.setdefault("tz", timezone.get_current_timezone())
+        interval = attrs["interval"]
+        end = attrs.setdefault("end_date", timezone.localdate(timezone=tz))
+        # The last 30 days, 12 weeks or 12 months by default
+        attrs.setdefault(
+            "start_date",
+            {
+                DAY: end - timedelta(days=29),
+                WEEK: end - timedelta(weeks=11),
+                MONTH: add_months(end.replace(day=1), -11),
+            }[interval],
+        )
+        if attrs["end_date"] < attrs["start_date"]:
+            raise serializers.ValidationError("end_date must not be before start_date.")
+        if (
+            sum(1 for _ in buckets(attrs["start_date"], end, interval))
+            > self.MAX_BUCKETS
+        ):
+            raise serializers.ValidationError(
+                f"At most {self.MAX_BUCKETS} buckets, use a longer interval."
+            )
+        return attrs
+
+
+class SalesSeriesPointSerializer(serializers.Serializer):
+    start = serializers.DateField(help_text="First day of the bucket")
+    sales = serializers.DecimalField(max_digits=15, decimal_places=2)
+    orders = serializers.IntegerField()
+    dues = serializers.DecimalField(max_digits=15, decimal_places=2)
+    collections = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+class SalesSeriesSerializer(serializers.Serializer):
+    interval = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    tz = serializers.CharField()
+    series = SalesSeriesPointSerializer(many=True)
@@ -1,13 +1,57 @@
+from django.db import transaction
 from rest_framework import serializers
 from .order import OrderSerializer
 from ..models.checkout_order import CheckoutOrder, StatusChoice
 from ..models.order import Order
 from inventory.models.batch import Batch
+from inventory.models.stock_movement import StockMovement, StockMovementKind
 from users.models import User
 from ..models.customer_details import CustomerDetails
 from ..serializers.customer_details import CustomerDetailsSerializer
 from ..serializers.checkout_payment import PaymentSerializer
 from ..models.checkout_payment import Payment
+from ..models.customer_balance import CustomerBalance
+from utils import metrics
+
+
+def record_checkout(status, item_count):
+    metrics.checkout_orders_total.labels(status).inc()
+    metrics.checkout_items_total.inc(item_count)
+
+
+def checkout_totals(amount):
+    """Payment figures of a sale from the till's ``amount`` block"""
+    final_amount = round(float(amount.get("finalAmount", 0)), 2)
+    cash_received = round(float(amount.get("cashReceived", 0)), 2)
+    change_amount = round(float(amount.get("changeAmount", 0)), 2)
+
+    # Calculate actual paid amount (cash received minus change)
+    actual_paid = cash_received - max(change_amount, 0)
+    due_amount = final_amount - actual_paid
+
+    # Determine payment status
+    if due_amount <= 0:
+        order_status = StatusChoice.COMPLETED
+    elif actual_paid > 0:
+        order_status = StatusChoice.PARTIALLY_PAID
+    else:
+        order_status = StatusChoice.PENDING
+
+    return {
+        "final_amount": final_amount,
+        "cash_received": cash_received,
+        "change_amount": change_amount,
+        "actual_paid": actual_paid,
+        "due_amount": due_amount,
+        "status": order_status,
+        "discount_percentage": float(amount.get("discountPercentage", 0)),
+    }
+
+
+def item_total(price_per_unit, quantity, discount_percentage):
+    subtotal = price_per_unit * quantity
+    discount_amount = (discount_percentage / 100) * subtotal
+    return subtotal - discount_amount
 
 
 class CheckoutOrderSerializer(serializers.ModelSerializer):
@@ -39,6 +83,7 @@ class CheckoutOrderSerializer(serializers.ModelSerializer):
     def get_orders(self, obj):
         return obj.get_orders()
 
+    @transaction.atomic
     def create(self, validated_data):
         items_data = validated_data.pop("items", [])
         amount = validated_data.pop("amount")
@@ -46,27 +91,16 @@ class CheckoutOrderSerializer(serializers.ModelSerializer):
         customer_contact = validated_data.get("customer_contact")
         organization = self.context["request"].user.organization
 
-        # Extract payment details
-        final_amount = round(float(amount.get("finalAmount", 0)), 2)
-        cash_received = round(float(amount.get("cashReceived", 0)), 2)
-        change_amount = round(float(amount.get("changeAmount", 0)), 2)
-
-        # Calculate actual paid amount (cash received minus change)
-        actual_paid = cash_received - max(change_amount, 0)
-        due_amount = final_amount - actual_paid
+        totals = checkout_totals(amount)
+        final_amount = totals["final_amount"]
+        actual_paid = totals["actual_paid"]
+        due_amount = totals["due_amount"]
+        order_status = totals["status"]
 
         print(
-            f"Final Amount: {final_amount}, Cash Received: {cash_received}, Change Amount: {change_amount}, Actual Paid: {actual_paid}, Due Amount: {due_amount}"
+            f"Final Amount: {final_amount}, Cash Received: {totals['cash_received']}, Change Amount: {totals['change_amount']}, Actual Paid: {actual_paid}, Due Amount: {due_amount}"
         )
 
-        # Determine payment status
-        if due_amount <= 0:
-            order_status = StatusChoice.COMPLETED
-        elif actual_paid > 0:
-            order_status = StatusChoice.PARTIALLY_PAID
-        else:
-            order_status = StatusChoice.PENDING
-
         # Handle customer details for due/partial payments
         customer_details = None
         if customer_name and customer_contact:
@@ -80,7 +114,7 @@ class CheckoutOrderSerializer(serializers.ModelSerializer):
                 "Customer name and contact are required for due payments."
             )
 
-        discount_percentage = float(amount.get("discountPercentage", 0))
+        discount_percentage = totals["discount_percentage"]
 
         # Create checkout order
         checkout = CheckoutOrder.objects.create(
@@ -99,7 +133,15 @@ class CheckoutOrderSerializer(serializers.ModelSerializer):
             due_amount=due_amount,
         )
 
+        # The initial payment below adds its own amount to lifetime paid
+        CustomerBalance.objects.apply(
+            checkout.customer_id,
+            due=due_amount,
+            open_orders=int(due_amount > 0),
+        )
+
         # Create order items
+        movements = []
         for item in items_data:
             batch_id = item.get("selectedBatchId")
             quantity = item.get("selectedUnitItem", 1)
@@ -114,10 +156,7 @@ class CheckoutOrderSerializer(serializers.ModelSerializer):
                     f"Batch with id {batch_id} not found."
                 )
 
-            # Calculate prices
-            subtotal = price_per_unit * quantity
-            discount_amount = (discount_percentage / 100) * subtotal
-            total_price = subtotal - discount_amount
+            total_price = item_total(price_per_unit, quantity, discount_percentage)
 
             # Create order
             Order.objects.create(
@@ -128,6 +167,7 @@ class CheckoutOrderSerializer(serializers.ModelSerializer):
                 price_per_unit=price_per_piece,
                 discount=discount_percentage,
                 total_price=total_price,
+                created_at=checkout.created_at,
             )
 
             # Reduce batch quantity
@@ -135,6 +175,16 @@ class CheckoutOrderSerializer(serializers.ModelSerializer):
             if batch.quantity >= total_pieces_ordered:
                 batch.quantity -= total_pieces_ordered
                 batch.save()
+                movements.append(
+                    StockMovement.of(
+                        batch,
+                        StockMovementKind.SALE,
+                        -total_pieces_ordered,
+                        reference_type="checkout",
+                        reference_id=checkout.id,
+                        user_id=checkout.employee_id,
+                    )
+                )
 
                 # Also update the main inventory quantity if needed
                 if batch.inventory:
@@ -147,6 +197,7 @@ class CheckoutOrderSerializer(serializers.ModelSerializer):
                     f"Insufficient stock for batch {batch_id}. "
                     f"Available: {batch.quantity}, Required: {total_pieces_ordered}"
                 )
+        StockMovement.objects.record(movements)
 
         # Update total price
         # checkout.update_total_price()
@@ -161,4 +212,7 @@ class CheckoutOrderSerializer(serializers.ModelSerializer):
                 notes="Initial payment during checkout",
             )
 
+        transaction.on_commit(
+            lambda: record_checkout(order_status, len(items_data)), robust=True
+        )
         return checkout
@@ -0,0 +1,63 @@
+from django.conf import settings
+from rest_framework import serializers
+
+
+class SyncItemSerializer(serializers.Serializer):
+    selectedBatchId = serializers.IntegerField()
+    selectedUnitItem = serializers.IntegerField(min_value=1, default=1)
+    selectedUnitQuantity = serializers.IntegerField(min_value=1)
+    selling_price = serializers.FloatField()
+    per_piece_price = serializers.FloatField()
+
+
+class SyncAmountSerializer(serializers.Serializer):
+    finalAmount = serializers.FloatField(default=0)
+    cashReceived = serializers.FloatField(default=0)
+    changeAmount = serializers.FloatField(default=0)
+    discountPercentage = serializers.FloatField(default=0, min_value=0, max_value=100)
+
+
+class SyncSaleSerializer(serializers.Serializer):
+    """A sale recorded by a till while offline, in the checkout payload shape"""
+
+    uuid = serializers.UUIDField()
+    sold_at = serializers.DateTimeField(required=False)
+    employee = serializers.IntegerField(required=False)
+    customer_name = serializers.CharField(
+        max_length=100, required=False, allow_blank=True, allow_null=True
+    )
+    customer_contact = serializers.CharField(
+        max_length=100, required=False, allow_blank=True, allow_null=True
+    )
+    items = SyncItemSerializer(many=True, allow_empty=False)
+    amount = SyncAmountSerializer()
+
+
+class CheckoutSyncSerializer(serializers.Serializer):
+    """
+    Only checks the envelope; each sale is validated on its own so one bad
+    sale is reported without failing the rest.
+    """
+
+    sales = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_sales(self, value):
+        if len(value) > settings.CHECKOUT_SYNC_MAX_SALES:
+            raise serializers.ValidationError(
+                f"At most {settings.CHECKOUT_SYNC_MAX_SALES} sales per request."
+            )
+        return value
+
+
+class SyncResultSerializer(serializers.Serializer):
+    uuid = serializers.CharField()
+    status = serializers.ChoiceField(choices=["created", "duplicate", "rejected"])
+    id = serializers.IntegerField(required=False)
+    errors = serializers.JSONField(required=False)
+
+
+class CheckoutSyncResponseSerializer(serializers.Serializer):
+    results = SyncResultSerializer(many=True)
+    created = serializers.IntegerField()
+    duplicates = serializers.IntegerField()
+    rejected = serializers.IntegerField()
@@ -7,14 +7,19 @@ from .views.customer_details import (
     CustomerDetailsList,
     CustomerDetailView,
     CustomerDueOrdersView,
+    CustomerOrdersView,
+    CustomerPaymentsView,
     CustomerListView,
+    CustomerSearchView,
     PayTotalDueView,
 )
 from .views.checkout_payment import MakePaymentView
+from .views.sync import CheckoutSyncView
 from .views.dashboard import (
     SalesAndProfitDashboardApiView,
     DuesDashboardApiView,
     SupplierDashboardAPIView,
+    SalesSeriesDashboardApiView,
 )
 
 router = DefaultRouter()
@@ -27,8 +32,19 @@ urlpatterns = [
     path("", include(router.urls)),
     path("customer_details/", CustomerDetailsList.as_view()),
     path("customers/", CustomerListView.as_view(), name="customer-list"),
+    path("customers/search/", CustomerSearchView.as_view(), name="customer-search"),
     path("customers-stats/", CustomerStatsView.as_view(), name="customer-stats"),
     path("customers/<int:pk>/", CustomerDetailView.as_view(), name="customer-detail"),
+    path(
+        "customers/<int:customer_id>/orders/",
+        CustomerOrdersView.as_view(),
+        name="customer-orders",
+    ),
+    path(
+        "customers/<int:customer_id>/payments/",
+        CustomerPaymentsView.as_view(),
+        name="customer-payments",
+    ),
     path(
         "customers/<int:customer_id>/due-orders/",
         CustomerDueOrdersView.as_view(),
@@ -40,11 +56,17 @@ urlpatterns = [
         name="customer-pay-total-due",
     ),
     path("make-payment/", MakePaymentView.as_view(), name="make-payment"),
+    path("sync/", CheckoutSyncView.as_view(), name="checkout-sync"),
     path(
         "dashboard/sales-profit/",
         SalesAndProfitDashboardApiView.as_view(),
         name="dashboard-sales",
     ),
+    path(
+        "dashboard/sales-series/",
+        SalesSeriesDashboardApiView.as_view(),
+        name="dashboard-sales-series",
+    ),
     path(
         "dashboard/dues-report/",
         DuesDashboardApiView.as_view(),
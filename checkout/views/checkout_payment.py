@@ -1,5 +1,8 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
+from drf_yasg.utils import swagger_auto_schema
+from utils.idempotency import idempotent
+from utils.swagger_schema import idempotency_key
 from ..serializers.checkout_payment import MakePaymentSerializer, PaymentSerializer
 from ..serializers.ordercheck import CheckoutOrderSerializer
 
@@ -9,6 +12,8 @@ class MakePaymentView(generics.CreateAPIView):
 
     serializer_class = MakePaymentSerializer
 
+    @swagger_auto_schema(manual_parameters=[idempotency_key])
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
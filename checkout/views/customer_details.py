@@ -1,8 +1,9 @@
 from ..serializers.customer_details import (
     CustomerDetailsSerializer,
+    CustomerSummarySerializer,
     PayTotalDueSerializer,
 )
-from ..models.customer_details import CustomerDetails
+from ..models.customer_details import CustomerDetails, normalize_contact
 from ..models.checkout_order import CheckoutOrder
 from ..serializers.ordercheck import CheckoutOrderSerializer
 from ..serializers.checkout_payment import PaymentSerializer
@@ -12,8 +13,23 @@ from rest_framework import status
 
 from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
-from django.db.models import Q, Exists, OuterRef
+from django.db.models import (
+    Q,
+    F,
+    BooleanField,
+    Count,
+    ExpressionWrapper,
+    OuterRef,
+    Subquery,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.contrib.postgres.search import TrigramSimilarity
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from utils.async_views import AsyncAPIView
+from utils.idempotency import idempotent
 from utils.mixins import OrgScopedQuerySetMixin, CustomerOrganizationMixin
+from utils.swagger_schema import idempotency_key
 
 
 class CustomerDetailsList(ListAPIView):
@@ -25,7 +41,9 @@ class CustomerDetailsList(ListAPIView):
 
     def get_queryset(self):
         organization = self.request.user.organization
-        queryset = CustomerDetails.objects.filter(organization=organization)
+        queryset = CustomerDetails.objects.filter(
+            organization=organization
+        ).with_balance()
 
         # search = self.request.query_params.get("search", None)
         # if search:
@@ -44,14 +62,14 @@ class CustomerListView(ListAPIView):
     def get_queryset(self):
         organization = self.request.user.organization
 
-        due_orders_subquery = CheckoutOrder.objects.filter(
-            pharmacy_shop=organization, customer=OuterRef("pk"), due_amount__gt=0
-        )
-
         queryset = (
             CustomerDetails.objects.filter(organization=organization)
-            .distinct()
-            .annotate(has_due=Exists(due_orders_subquery))
+            .annotate(
+                has_due=ExpressionWrapper(
+                    Q(balance__open_orders__gt=0), output_field=BooleanField()
+                )
+            )
+            .with_balance()
         )
 
         search = self.request.query_params.get("search", None)
@@ -60,44 +78,159 @@ class CustomerListView(ListAPIView):
                 Q(name__icontains=search) | Q(contact__icontains=search)
             )
 
-        return queryset.order_by("-has_due", "-id")
+        if self.request.query_params.get("ordering") == "due":
+            return queryset.order_by("-due_total", "-id")
+
+        return queryset.order_by(F("has_due").desc(nulls_last=True), "-id")
+
+
+class CustomerSearchView(AsyncAPIView):
+    """
+    Counter-side customer lookup.
+
+    A query that is a phone number is matched exactly on the normalized
+    contact first; otherwise name and contact are matched through their
+    trigram indexes and ranked by similarity.
+    """
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                description="Customer name or phone number",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="Maximum number of results (default 10, 1 to 50)",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={200: CustomerDetailsSerializer(many=True)},
+    )
+    async def get(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 10)), 50))
+        except ValueError:
+            return Response(
+                {"limit": ["A whole number is required."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(query) < 2:
+            return Response([])
+
+        queryset = CustomerDetails.objects.filter(
+            organization=request.user.organization
+        )
+        matches = Q(name__icontains=query) | Q(contact__icontains=query)
+
+        contact = normalize_contact(query)
+        if len(contact) >= 6 and len(contact) >= len(query.replace(" ", "")) - 4:
+            exact = [
+                customer
+                async for customer in queryset.filter(contact_normalized=contact)
+                .with_balance()
+                .order_by("-id")[:limit]
+            ]
+            if exact:
+                return Response(CustomerDetailsSerializer(exact, many=True).data)
+            matches |= Q(contact_normalized__startswith=contact)
+
+        customers = [
+            customer
+            async for customer in queryset.filter(matches)
+            .annotate(
+                similarity=Greatest(
+                    TrigramSimilarity("name", query),
+                    TrigramSimilarity("contact", query),
+                )
+            )
+            .with_balance()
+            .order_by("-similarity", "-id")[:limit]
+        ]
+        return Response(CustomerDetailsSerializer(customers, many=True).data)
 
 
 class CustomerDetailView(RetrieveAPIView):
-    """Get customer details with their orders and payments"""
+    """
+    Get a compact customer summary.
 
-    queryset = CustomerDetails.objects.all()
-    serializer_class = CustomerDetailsSerializer
+    Order and payment history are served separately, paginated, by
+    CustomerOrdersView and CustomerPaymentsView.
+    """
+
+    serializer_class = CustomerSummarySerializer
+
+    def get_queryset(self):
+        order_count_subquery = (
+            CheckoutOrder.objects.filter(customer=OuterRef("pk"))
+            .order_by()
+            .values("customer")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        return (
+            CustomerDetails.objects.filter(organization=self.request.user.organization)
+            .with_balance()
+            .annotate(
+                open_orders=Coalesce(F("balance__open_orders"), 0),
+                last_activity_at=F("balance__last_activity_at"),
+                order_count=Coalesce(Subquery(order_count_subquery), 0),
+            )
+        )
+
+
+class CustomerOrdersView(ListAPIView):
+    """Paginated checkout orders of a customer, newest first"""
 
-    def retrieve(self, request, *args, **kwargs):
-        customer = self.get_object()
-        serializer = self.get_serializer(customer)
+    serializer_class = CheckoutOrderSerializer
 
-        # Get customer's orders
-        orders = CheckoutOrder.objects.filter(customer=customer).order_by("-created_at")
-        orders_serializer = CheckoutOrderSerializer(orders, many=True)
+    def get_queryset(self):
+        return (
+            CheckoutOrder.objects.filter(
+                customer_id=self.kwargs["customer_id"],
+                customer__organization=self.request.user.organization,
+            )
+            .with_details()
+            .order_by("-created_at")
+        )
 
-        # Get customer's payments
-        payments = Payment.objects.filter(customer=customer).order_by("-created_at")
-        payments_serializer = PaymentSerializer(payments, many=True)
 
-        data = serializer.data
-        data["orders"] = orders_serializer.data
-        data["payments"] = payments_serializer.data
+class CustomerPaymentsView(ListAPIView):
+    """Paginated payments of a customer, newest first"""
 
-        return Response(data)
+    serializer_class = PaymentSerializer
+
+    def get_queryset(self):
+        return (
+            Payment.objects.filter(
+                customer_id=self.kwargs["customer_id"],
+                customer__organization=self.request.user.organization,
+            )
+            .select_related("customer")
+            .order_by("-created_at")
+        )
 
 
 class CustomerDueOrdersView(OrgScopedQuerySetMixin, ListAPIView):
     """Get all due orders for a specific customer"""
 
+    queryset = CheckoutOrder.objects.all()
     serializer_class = CheckoutOrderSerializer
 
     def get_queryset(self):
         customer_id = self.kwargs["customer_id"]
-        return CheckoutOrder.objects.filter(
-            customer_id=customer_id, status__in=["pending", "partially_paid"]
-        ).order_by("-created_at")
+        return (
+            super()
+            .get_queryset()
+            .filter(customer_id=customer_id, status__in=["pending", "partially_paid"])
+            .with_details()
+            .order_by("-created_at")
+        )
 
 
 class PayTotalDueView(GenericAPIView):
@@ -108,10 +241,14 @@ class PayTotalDueView(GenericAPIView):
 
     serializer_class = PayTotalDueSerializer
 
+    @swagger_auto_schema(manual_parameters=[idempotency_key])
+    @idempotent
     def post(self, request, *args, **kwargs):
         customer_id = self.kwargs.get("customer_id")
         try:
-            customer = CustomerDetails.objects.get(id=customer_id)
+            customer = CustomerDetails.objects.for_organization(
+                request.user.organization
+            ).get(id=customer_id)
         except CustomerDetails.DoesNotExist:
             return Response(
                 {"error": "Customer not found."}, status=status.HTTP_404_NOT_FOUND
@@ -1,4 +1,5 @@
-from rest_framework.views import APIView
+from functools import partial
+
 from rest_framework.response import Response
 from django.db.models import Sum, Count
 from django.db.models.functions import Coalesce
@@ -12,13 +13,19 @@ from ..serializers.dashboard import (
     SalesAndProfitDashboardSerializer,
     DuesDashboardSerializer,
     SupplierDashboardSerializer,
+    SalesSeriesQuerySerializer,
+    SalesSeriesSerializer,
 )
+from ..sales_series import bucketed, fill_gaps
 from supplier.models import Supplier, SupplierOrder
 from ..models.checkout_order import CheckoutOrder
 from ..models.checkout_payment import Payment
+from utils.async_views import AsyncAPIView, run_concurrently
+from utils.conditional import SALES, SUPPLIERS, conditional
+from utils.replica import reads_from_replica
 
 
-class SalesAndProfitDashboardApiView(APIView):
+class SalesAndProfitDashboardApiView(AsyncAPIView):
     @swagger_auto_schema(
         manual_parameters=[
             openapi.Parameter(
@@ -46,7 +53,9 @@ class SalesAndProfitDashboardApiView(APIView):
         responses={200: SalesAndProfitDashboardSerializer},
         operation_description="Get aggregated sales and profit data with date-based filtering.",
     )
-    def get(self, request, *args, **kwargs):
+    @reads_from_replica
+    @conditional(SALES)
+    async def get(self, request, *args, **kwargs):
         filter_by = request.query_params.get("filter_by")
         start_date_str = request.query_params.get("start_date")
         end_date_str = request.query_params.get("end_date")
@@ -90,11 +99,22 @@ class SalesAndProfitDashboardApiView(APIView):
                     {"error": "Invalid date format. Use YYYY-MM-DD."}, status=400
                 )
 
-        aggregates = queryset.aggregate(
-            total_sales=Coalesce(Sum("checkout_price"), Decimal("0.0")),
-            total_orders=Count("id"),
-            total_dues_in_period=Coalesce(Sum("due_amount"), Decimal("0.0")),
-        )
+        totals = {
+            "total_sales": Coalesce(Sum("checkout_price"), Decimal("0.0")),
+            "total_orders": Count("id"),
+            "total_dues_in_period": Coalesce(Sum("due_amount"), Decimal("0.0")),
+        }
+        if start_date and end_date:
+            aggregates = await queryset.aaggregate(**totals)
+            first_order_at = None
+        else:
+            aggregates, first_order_at = await run_concurrently(
+                partial(queryset.aggregate, **totals),
+                CheckoutOrder.objects.filter(pharmacy_shop=request.user.organization)
+                .order_by("created_at")
+                .values_list("created_at", flat=True)
+                .first,
+            )
 
         total_sales = aggregates["total_sales"]
         total_order = aggregates["total_orders"]
@@ -109,15 +129,9 @@ class SalesAndProfitDashboardApiView(APIView):
         if start_date and end_date:
             delta = end_date - start_date
             num_days = delta.days + 1
-        else:
-            first_order = (
-                CheckoutOrder.objects.filter(pharmacy_shop=request.user.organization)
-                .order_by("created_at")
-                .first()
-            )
-            if first_order:
-                delta = timezone.now() - first_order.created_at
-                num_days = delta.days + 1
+        elif first_order_at:
+            delta = timezone.now() - first_order_at
+            num_days = delta.days + 1
 
         average_sales = total_sales / num_days if num_days > 0 else Decimal("0.0")
 
@@ -133,7 +147,7 @@ class SalesAndProfitDashboardApiView(APIView):
         return Response(serializer.data)
 
 
-class DuesDashboardApiView(APIView):
+class DuesDashboardApiView(AsyncAPIView):
     @swagger_auto_schema(
         manual_parameters=[
             openapi.Parameter(
@@ -162,24 +176,21 @@ class DuesDashboardApiView(APIView):
         operation_description="Get aggregated dues data. Note: 'Total Dues' and 'Customers with Dues' reflect the overall \
             current state and are not affected by date filters.",
     )
-    def get(self, request, *args, **kwargs):
+    @reads_from_replica
+    @conditional(SALES)
+    async def get(self, request, *args, **kwargs):
         filter_by = request.query_params.get("filter_by")
         start_date_str = request.query_params.get("start_date")
         end_date_str = request.query_params.get("end_date")
 
-        base_orders_queryset = CheckoutOrder.objects.filter(
-            pharmacy_shop=request.user.organization
-        )
-
-        total_dues = base_orders_queryset.filter(due_amount__gt=0).aggregate(
-            total=Coalesce(Sum("due_amount"), Decimal("0.0"))
-        )["total"]
-
-        customers_with_dues = (
-            base_orders_queryset.filter(due_amount__gt=0, customer__isnull=False)
-            .values("customer")
-            .distinct()
-            .count()
+        # Every order still owing counts, with or without a customer, and an
+        # overpaid order does not offset what the customer owes on others
+        orders_with_due = (
+            CheckoutOrder.objects.for_organization(request.user.organization)
+            # Implied by due_amount > 0, but spelled like the predicate of the
+            # partial index checkout_shop_due_idx so the planner can use it
+            .exclude(due_amount=0)
+            .filter(due_amount__gt=0)
         )
 
         payments_queryset = Payment.objects.filter(
@@ -226,9 +237,20 @@ class DuesDashboardApiView(APIView):
                     {"error": "Invalid date format. Use YYYY-MM-DD."}, status=400
                 )
 
-        dues_collected = payments_queryset.aggregate(
-            total=Coalesce(Sum("amount"), Decimal("0.0"))
-        )["total"]
+        dues, collected = await run_concurrently(
+            partial(
+                orders_with_due.aggregate,
+                total=Coalesce(Sum("due_amount"), Decimal("0.0")),
+                customers=Count("customer", distinct=True),
+            ),
+            partial(
+                payments_queryset.aggregate,
+                total=Coalesce(Sum("amount"), Decimal("0.0")),
+            ),
+        )
+        total_dues = dues["total"]
+        customers_with_dues = dues["customers"]
+        dues_collected = collected["total"]
 
         data = {
             "total_dues": total_dues,
@@ -240,7 +262,7 @@ class DuesDashboardApiView(APIView):
         return Response(serializer.data)
 
 
-class SupplierDashboardAPIView(APIView):
+class SupplierDashboardAPIView(AsyncAPIView):
     @swagger_auto_schema(
         manual_parameters=[
             openapi.Parameter(
@@ -268,7 +290,9 @@ class SupplierDashboardAPIView(APIView):
         responses={200: SupplierDashboardSerializer},
         operation_description="Get aggregated supplier data with date-based filtering.",
     )
-    def get(self, request, *args, **kwargs):
+    @reads_from_replica
+    @conditional(SUPPLIERS)
+    async def get(self, request, *args, **kwargs):
         filter_by = request.query_params.get("filter_by")
         start_date_str = request.query_params.get("start_date")
         end_date_str = request.query_params.get("end_date")
@@ -317,17 +341,16 @@ class SupplierDashboardAPIView(APIView):
                     {"error": "Invalid date format. Use YYYY-MM-DD."}, status=400
                 )
 
-        total_suppliers = Supplier.objects.filter(
-            organization=request.user.organization
-        ).count()
-
-        aggregates = queryset_orders.aggregate(
-            total_orders_amount=Coalesce(Sum("total_amount"), Decimal("0.00")),
-            total_dues=Coalesce(Sum("due_amount"), Decimal("0.00")),
+        total_suppliers, aggregates, orders_with_due = await run_concurrently(
+            Supplier.objects.filter(organization=request.user.organization).count,
+            partial(
+                queryset_orders.aggregate,
+                total_orders_amount=Coalesce(Sum("total_amount"), Decimal("0.00")),
+                total_dues=Coalesce(Sum("due_amount"), Decimal("0.00")),
+            ),
+            queryset_orders.filter(due_amount__gt=0).count,
         )
 
-        orders_with_due = queryset_orders.filter(due_amount__gt=0).count()
-
         data = {
             "total_suppliers": total_suppliers,
             "total_orders_amount": aggregates["total_orders_amount"],
@@ -337,3 +360,37 @@ class SupplierDashboardAPIView(APIView):
 
         serializer = SupplierDashboardSerializer(data)
         return Response(serializer.data)
+
+
+class SalesSeriesDashboardApiView(AsyncAPIView):
+    @swagger_auto_schema(
+        query_serializer=SalesSeriesQuerySerializer,
+        responses={200: SalesSeriesSerializer},
+        operation_description="Sales, orders, dues and collections per day, week "
+        "or month, for charts. Buckets are local to ``tz`` and every bucket of "
+        "the range is returned, with zeros where nothing happened.",
+    )
+    @reads_from_replica
+    @conditional(SALES)
+    async def get(self, request, *args, **kwargs):
+        query = SalesSeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        interval = query.validated_data["interval"]
+        start = query.validated_data["start_date"]
+        end = query.validated_data["end_date"]
+        tz = query.validated_data["tz"]
+
+        rows = [
+            row
+            async for row in bucketed(
+                request.user.organization, interval, start, end, tz
+            )
+        ]
+        data = {
+            "interval": interval,
+            "start_date": start,
+            "end_date": end,
+            "tz": str(tz),
+            "series": fill_gaps(rows, interval, start, end),
+        }
+        return Response(SalesSeriesSerializer(data).data)
@@ -10,27 +10,35 @@ from django.utils.timezone import now
 from rest_framework.exceptions import APIException
 from datetime import datetime, timedelta
 from django.utils.timezone import make_aware
+from drf_yasg.utils import swagger_auto_schema
+from utils.idempotency import idempotent
 from utils.mixins import OrgScopedQuerySetMixin
+from utils.replica import reads_from_replica
+from utils.swagger_schema import idempotency_key
 from ..models.customer_details import CustomerDetails
 from rest_framework.views import APIView
 from django.db.models import Sum
 from decimal import Decimal
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from ..models.customer_balance import CustomerBalance
 
 
 class CheckoutOrderViewSet(OrgScopedQuerySetMixin, viewsets.ModelViewSet):
+    queryset = CheckoutOrder.objects.all()
     serializer_class = CheckoutOrderSerializer
 
+    @swagger_auto_schema(manual_parameters=[idempotency_key])
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     def get_queryset(self):
         user = self.request.user
-        if user.role == "admin":
-            queryset = CheckoutOrder.objects.filter(
-                pharmacy_shop=user.organization
-            ).order_by("-created_at")
-        else:
-            queryset = CheckoutOrder.objects.filter(
-                pharmacy_shop=user.organization, employee=user
-            ).order_by("-created_at")
+        queryset = super().get_queryset()
+        if user.role != "admin":
+            queryset = queryset.filter(employee=user)
+        queryset = queryset.with_details().order_by("-created_at")
         date_filter = self.request.query_params.get("date")
         start_date_str = self.request.query_params.get("start_date")
         end_date_str = self.request.query_params.get("end_date")
@@ -73,6 +81,26 @@ class CheckoutOrderViewSet(OrgScopedQuerySetMixin, viewsets.ModelViewSet):
 
         return queryset
 
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            previous_customer_id = serializer.instance.customer_id
+            checkout = serializer.save()
+            # Direct edits can move dues between customers, so recompute both
+            CustomerBalance.objects.rebuild(
+                CustomerDetails.objects.filter(
+                    id__in=[previous_customer_id, checkout.customer_id]
+                )
+            )
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            customer_id = instance.customer_id
+            instance.delete()
+            if customer_id:
+                CustomerBalance.objects.rebuild(
+                    CustomerDetails.objects.filter(id=customer_id)
+                )
+
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
 
@@ -160,6 +188,7 @@ class CheckoutOrderViewSet(OrgScopedQuerySetMixin, viewsets.ModelViewSet):
 class CustomerStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @reads_from_replica
     def get(self, request, *args, **kwargs):
         organization = request.user.organization
 
@@ -167,21 +196,25 @@ class CustomerStatsView(APIView):
             CustomerDetails.objects.filter(organization=organization).distinct().count()
         )
 
-        total_due_result = CheckoutOrder.objects.filter(
-            pharmacy_shop=organization
-        ).aggregate(total=Sum("due_amount"))
-
-        total_due = total_due_result["total"] or Decimal("0.00")
-
-        customers_with_due = (
-            CustomerDetails.objects.filter(
-                organization=organization,
-                checkout_orders__due_amount__gt=0,
-            )
-            .distinct()
-            .count()
+        balances = CustomerBalance.objects.filter(organization=organization)
+
+        # The net due of every order: the customers' balances, plus the
+        # orders sold without a customer, which have no balance
+        total_due = (
+            balances.aggregate(total=Sum("outstanding_due"))["total"] or Decimal("0.00")
+        ) + (
+            CheckoutOrder.objects.for_organization(organization)
+            # Settled orders add nothing; skipping them matches the partial
+            # index checkout_shop_due_idx
+            .exclude(due_amount=0)
+            .filter(customer__isnull=True)
+            .aggregate(total=Sum("due_amount"))["total"]
+            or Decimal("0.00")
         )
 
+        # Customers with at least one order still owing
+        customers_with_due = balances.filter(open_orders__gt=0).count()
+
         data = {
             "total_customers": total_customers,
             "total_due": total_due,
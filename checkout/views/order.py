@@ -4,8 +4,9 @@ from ..models.order import Order
 from ..serializers.order import OrderSerializer
 from rest_framework.response import Response
 from rest_framework import status
+from utils.mixins import OrgScopedQuerySetMixin
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(OrgScopedQuerySetMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     pagination_class=None
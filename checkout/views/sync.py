@@ -0,0 +1,45 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import generics, status
+from rest_framework.response import Response
+
+from ..sales_sync import CREATED, DUPLICATE, REJECTED, SalesSync
+from ..serializers.sync import (
+    CheckoutSyncResponseSerializer,
+    CheckoutSyncSerializer,
+)
+
+
+class CheckoutSyncView(generics.GenericAPIView):
+    """
+    Upload sales a till recorded while offline.
+
+    Each sale carries a client-generated ``uuid`` plus the checkout payload
+    (``items``, ``amount``, customer) and optionally ``sold_at`` and
+    ``employee``. Sales already applied are reported as duplicates, so a
+    failed upload can simply be sent again.
+    """
+
+    serializer_class = CheckoutSyncSerializer
+
+    @swagger_auto_schema(
+        request_body=CheckoutSyncSerializer,
+        responses={200: CheckoutSyncResponseSerializer},
+    )
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = SalesSync(request.user.organization, request.user).run(
+            serializer.validated_data["sales"]
+        )
+        counts = {CREATED: 0, DUPLICATE: 0, REJECTED: 0}
+        for result in results:
+            counts[result["status"]] += 1
+        return Response(
+            {
+                "results": results,
+                "created": counts[CREATED],
+                "duplicates": counts[DUPLICATE],
+                "rejected": counts[REJECTED],
+            },
+            status=status.HTTP_200_OK,
+        )
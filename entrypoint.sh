@@ -3,6 +3,9 @@
 PIPENV_DONT_LOAD_ENV=1
 pipenv run python manage.py collectstatic -v 3 --clear --no-input --no-post-process
 pipenv run python manage.py migrate
-pipenv run gunicorn -c gunicorn.config.py saas_auth.wsgi --reload
+# Monthly partitions must exist before rows for their month arrive; also run
+# from cron (see create_partitions --help) for machines that stay up for months
+pipenv run python manage.py create_partitions
+pipenv run gunicorn -c gunicorn.config.py --reload
 
 # exec "$@"
@@ -1,12 +1,28 @@
 import multiprocessing
+import os
+import shutil
 from pathlib import Path
 
+# Workers write Prometheus samples here; /metrics merges them (utils.metrics).
+# Must be set before the application (and prometheus_client) is imported.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
 bind = '0.0.0.0:8000'
 backlog = 2048
 
-workers = multiprocessing.cpu_count() - 1
-threads = multiprocessing.cpu_count() - 1
-worker_class = 'sync'
+# ASGI=1 serves saas_auth.asgi with uvicorn workers, so async views run on an
+# event loop instead of holding a worker (or thread) for the whole request.
+asgi = os.getenv("ASGI", "").lower() in ("1", "true", "yes")
+wsgi_app = 'saas_auth.asgi:application' if asgi else 'saas_auth.wsgi:application'
+
+workers = int(os.getenv("GUNICORN_WORKERS", max(multiprocessing.cpu_count() - 1, 1)))
+threads = int(os.getenv("GUNICORN_THREADS", max(multiprocessing.cpu_count() - 1, 1)))
+worker_class = 'uvicorn_worker.UvicornWorker' if asgi else 'sync'
+
+# settings.py sizes the per-worker database pool from these
+os.environ["GUNICORN_WORKERS"] = str(workers)
+os.environ["GUNICORN_THREADS"] = str(threads)
+
 worker_connections = 1000
 timeout = 180
 keepalive = 2
@@ -31,6 +47,17 @@ access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"
 
 proc_name = None
 
+def on_starting(server):
+    # Samples left by a previous master would be merged into the new totals
+    metrics_dir = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
 def post_fork(server, worker):
     server.log.info("Worker spawned (pid: %s)", worker.pid)
 
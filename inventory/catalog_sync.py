@@ -0,0 +1,81 @@
+import heapq
+
+from django.db.models import Exists, OuterRef
+
+from .models.batch import Batch
+from .models.catalog_change import CatalogTombstone, change_horizon
+from .models.product import Medicine
+from .models.stockpile import Inventory
+from .serializers.medicine import MedicineSerializer
+from .serializers.sync import BatchChangeSerializer, InventoryChangeSerializer
+
+
+def catalog_changes(organization, since, limit):
+    """
+    Medicines, inventory and batches written or deleted after the ``since``
+    cursor, oldest change first and at most ``limit`` rows.
+
+    The returned ``cursor`` is the ``since`` of the next call; ``has_more``
+    says whether that call has something to fetch right away.
+    """
+    horizon = change_horizon(organization.id)
+    window = {"change_seq__gt": since, "change_seq__lte": horizon}
+
+    medicines = (
+        Medicine.objects.filter(**window)
+        .select_related("generic_name")
+        .annotate(
+            is_in_inventory=Exists(
+                Inventory.objects.filter(
+                    medicine=OuterRef("pk"), organization=organization
+                )
+            )
+        )
+        .order_by("change_seq")[: limit + 1]
+    )
+    inventories = (
+        Inventory.objects.for_organization(organization)
+        .filter(**window)
+        .order_by("change_seq")[: limit + 1]
+    )
+    batches = (
+        Batch.objects.for_organization(organization)
+        .filter(**window)
+        .order_by("change_seq")[: limit + 1]
+    )
+    tombstones = (
+        CatalogTombstone.objects.for_organization(organization)
+        .filter(**window)
+        .order_by("change_seq")[: limit + 1]
+    )
+
+    def tagged(kind, rows):
+        return [(row.change_seq, kind, row) for row in rows]
+
+    changes = list(
+        heapq.merge(
+            tagged("medicine", medicines),
+            tagged("inventory", inventories),
+            tagged("batch", batches),
+            tagged("deleted", tombstones),
+        )
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    rows = {"medicine": [], "inventory": [], "batch": []}
+    deleted = {model: [] for model in CatalogTombstone.MODELS}
+    for _, kind, row in changes:
+        if kind == "deleted":
+            deleted[row.model].append(row.object_id)
+        else:
+            rows[kind].append(row)
+
+    return {
+        "cursor": changes[-1][0] if has_more else max(horizon, since),
+        "has_more": has_more,
+        "medicines": MedicineSerializer(rows["medicine"], many=True).data,
+        "inventories": InventoryChangeSerializer(rows["inventory"], many=True).data,
+        "batches": BatchChangeSerializer(rows["batch"], many=True).data,
+        "deleted": deleted,
+    }
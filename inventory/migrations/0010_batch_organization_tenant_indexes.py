@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BACKFILL_BATCH_ORGANIZATION = """
+UPDATE inventory_batch b
+SET organization_id = i.organization_id
+FROM inventory_inventory i
+WHERE b.inventory_id = i.id AND b.organization_id IS NULL;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_remove_medicine_inventory_m_name_7f2fd2_idx_and_more'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batch',
+            name='organization',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='users.organization'),
+        ),
+        migrations.RunSQL(BACKFILL_BATCH_ORGANIZATION, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['organization', '-created_at'], name='batch_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['organization', 'expiry_date'], name='batch_org_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['organization', '-updated_at'], name='inventory_org_updated_idx'),
+        ),
+    ]
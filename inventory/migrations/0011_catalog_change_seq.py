@@ -0,0 +1,131 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+CATALOG_TABLES = {
+    "inventory_medicine": "medicine",
+    "inventory_inventory": "inventory",
+    "inventory_batch": "batch",
+}
+
+CREATE_CHANGE_TRACKING = """
+CREATE SEQUENCE inventory_catalog_change_seq;
+
+UPDATE inventory_medicine SET change_seq = nextval('inventory_catalog_change_seq');
+UPDATE inventory_inventory SET change_seq = nextval('inventory_catalog_change_seq');
+UPDATE inventory_batch SET change_seq = nextval('inventory_catalog_change_seq');
+
+-- Medicines are shared by every organization and use lock key 0
+CREATE FUNCTION inventory_catalog_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'inventory_medicine' THEN
+        PERFORM pg_advisory_xact_lock_shared(hashtext('catalog-changes'), 0);
+    ELSE
+        PERFORM pg_advisory_xact_lock_shared(
+            hashtext('catalog-changes'), COALESCE(NEW.organization_id, 0)::integer
+        );
+    END IF;
+    NEW.change_seq := nextval('inventory_catalog_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION inventory_catalog_delete() RETURNS trigger AS $$
+DECLARE
+    organization integer;
+BEGIN
+    IF TG_TABLE_NAME <> 'inventory_medicine' THEN
+        organization := OLD.organization_id;
+    END IF;
+    PERFORM pg_advisory_xact_lock_shared(
+        hashtext('catalog-changes'), COALESCE(organization, 0)
+    );
+    INSERT INTO inventory_catalogtombstone
+        (model, object_id, organization_id, change_seq, deleted_at)
+    VALUES
+        (TG_ARGV[0], OLD.id, organization,
+         nextval('inventory_catalog_change_seq'), now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+""" + "".join(
+    f"""
+CREATE TRIGGER {table}_change BEFORE INSERT OR UPDATE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION inventory_catalog_change();
+CREATE TRIGGER {table}_delete AFTER DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION inventory_catalog_delete('{model}');
+"""
+    for table, model in CATALOG_TABLES.items()
+)
+
+DROP_CHANGE_TRACKING = "".join(
+    f"""
+DROP TRIGGER {table}_change ON {table};
+DROP TRIGGER {table}_delete ON {table};
+"""
+    for table in CATALOG_TABLES
+) + """
+DROP FUNCTION inventory_catalog_change();
+DROP FUNCTION inventory_catalog_delete();
+DROP SEQUENCE inventory_catalog_change_seq;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_batch_organization_tenant_indexes'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='batch',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='inventory',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='medicine',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(CREATE_CHANGE_TRACKING, DROP_CHANGE_TRACKING),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['organization', 'change_seq'], name='batch_org_change_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['organization', 'change_seq'], name='inventory_org_change_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['change_seq'], name='medicine_change_seq_idx'),
+        ),
+        migrations.AddField(
+            model_name='catalogtombstone',
+            name='organization',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='users.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogtombstone',
+            index=models.Index(fields=['organization', 'change_seq'], name='tombstone_org_change_seq_idx'),
+        ),
+    ]
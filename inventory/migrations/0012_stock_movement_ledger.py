@@ -0,0 +1,112 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+from utils.partitions import ensure_partitions
+
+# Postgres cannot turn an existing table into a partitioned one, so the table
+# is created here rather than by CreateModel. The partition key has to be
+# part of the primary key.
+CREATE_LEDGER = """
+CREATE TABLE inventory_stockmovement (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    kind varchar(20) NOT NULL,
+    quantity integer NOT NULL,
+    reference_type varchar(30) NOT NULL,
+    reference_id bigint NULL,
+    note varchar(255) NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    batch_id bigint NULL,
+    inventory_id bigint NOT NULL,
+    organization_id bigint NULL,
+    user_id bigint NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE inventory_stockmovement_default
+    PARTITION OF inventory_stockmovement DEFAULT;
+
+CREATE INDEX movement_org_created_idx
+    ON inventory_stockmovement (organization_id, created_at);
+CREATE INDEX movement_inventory_created_idx
+    ON inventory_stockmovement (inventory_id, created_at);
+CREATE INDEX movement_batch_created_idx
+    ON inventory_stockmovement (batch_id, created_at);
+
+-- Partition maintenance (utils.partitions) sets partitions.maintenance to
+-- move rows out of the default partition
+CREATE FUNCTION inventory_stockmovement_append_only() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('partitions.maintenance', true) = 'on' THEN
+        RETURN CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END;
+    END IF;
+    RAISE EXCEPTION 'Stock movements are append-only';
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER inventory_stockmovement_append_only
+    BEFORE UPDATE OR DELETE ON inventory_stockmovement
+    FOR EACH ROW EXECUTE FUNCTION inventory_stockmovement_append_only();
+"""
+
+DROP_LEDGER = """
+DROP TABLE inventory_stockmovement;
+DROP FUNCTION inventory_stockmovement_append_only();
+"""
+
+# Start the ledger from the quantities on hand
+OPENING_BALANCES = """
+INSERT INTO inventory_stockmovement
+    (kind, quantity, reference_type, note, created_at,
+     batch_id, inventory_id, organization_id)
+SELECT 'adjustment', quantity, '', 'Opening balance', now(),
+       id, inventory_id, organization_id
+FROM inventory_batch
+WHERE quantity > 0;
+"""
+
+
+def create_partitions(apps, schema_editor):
+    ensure_partitions("inventory_stockmovement", "created_at")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_catalog_change_seq'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(CREATE_LEDGER, DROP_LEDGER)],
+            state_operations=[
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sale', 'Sale'), ('receipt', 'Receipt'), ('adjustment', 'Adjustment'), ('write_off', 'Write-off'), ('return', 'Return')], max_length=20)),
+                ('quantity', models.IntegerField()),
+                ('reference_type', models.CharField(blank=True, default='', max_length=30)),
+                ('reference_id', models.BigIntegerField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('batch', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='inventory.batch')),
+                ('inventory', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='inventory.inventory')),
+                ('organization', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='users.organization')),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['organization', 'created_at'], name='movement_org_created_idx'), models.Index(fields=['inventory', 'created_at'], name='movement_inventory_created_idx'), models.Index(fields=['batch', 'created_at'], name='movement_batch_created_idx')],
+            },
+        ),
+            ],
+        ),
+        migrations.RunPython(create_partitions, migrations.RunPython.noop),
+        migrations.RunSQL(OPENING_BALANCES, migrations.RunSQL.noop),
+    ]
@@ -1,4 +1,6 @@
 from .product import Medicine, Category, GenericName
 from .stockpile import Inventory
 from .unitmedicine import UnitPriceMedicine
-from .batch import Batch
\ No newline at end of file
+from .batch import Batch
+from .catalog_change import CatalogTombstone
+from .stock_movement import StockMovement, StockMovementKind
@@ -1,12 +1,45 @@
+from itertools import product
+from string import ascii_uppercase
+
 from django.db import models
 from django.contrib import admin
 from inventory.models.stockpile import Inventory
+from users.models.organization import Organization
+from utils.managers import TenantQuerySet
+
+
+def batch_suffixes():
+    """A, B, ..., Z, AA, AB, ... like spreadsheet columns"""
+    length = 1
+    while True:
+        for combination in product(ascii_uppercase, repeat=length):
+            yield "".join(combination)
+        length += 1
+
+
+def allocate_batch_numbers(taken, count, prefix="BATCH"):
+    """The first ``count`` numbers like BATCH-A that are not in ``taken``"""
+    numbers = []
+    for suffix in batch_suffixes():
+        if len(numbers) == count:
+            return numbers
+        number = f"{prefix}-{suffix}"
+        if number not in taken:
+            numbers.append(number)
 
 
 class Batch(models.Model):
     inventory = models.ForeignKey(
         Inventory, on_delete=models.CASCADE, related_name="batches"
     )
+    # Denormalized from inventory so tenant queries don't need the join
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="batches",
+        null=True,
+        editable=False,
+    )
     buying_price = models.DecimalField(max_digits=6, decimal_places=2, default=0)
     selling_price = models.DecimalField(max_digits=6, decimal_places=2, default=0)
     batch_number = models.CharField(max_length=100)
@@ -18,13 +51,33 @@ class Batch(models.Model):
     expiry_date = models.DateField(null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by a database trigger on every insert and update, see catalog_change
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = TenantQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "-created_at"], name="batch_org_created_idx"
+            ),
+            models.Index(
+                fields=["organization", "expiry_date"], name="batch_org_expiry_idx"
+            ),
+            models.Index(
+                fields=["organization", "change_seq"], name="batch_org_change_seq_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.batch_number
 
+    def save(self, *args, **kwargs):
+        if self.inventory_id and not self.organization_id:
+            self.organization_id = self.inventory.organization_id
+        super().save(*args, **kwargs)
+
 
 @admin.register(Batch)
 class BatchAdmin(admin.ModelAdmin):
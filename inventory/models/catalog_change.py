@@ -0,0 +1,81 @@
+from django.db import connection, models
+from django.contrib import admin
+from django.db.models import Q
+from users.models.organization import Organization
+from utils.managers import TenantQuerySet
+
+# Postgres sequence the catalog triggers (migration 0011) stamp every insert
+# and update of Medicine, Inventory and Batch with, into their change_seq
+CHANGE_SEQUENCE = "inventory_catalog_change_seq"
+
+# Advisory lock (key, organization id) writers hold in shared mode from the
+# moment they take a sequence number until they commit. The shared catalog
+# (Medicine) uses organization 0.
+CHANGE_LOCK = "catalog-changes"
+
+
+def change_horizon(organization_id):
+    """
+    The highest change sequence whose writes, for this organization and the
+    shared catalog, have all committed or rolled back.
+
+    Numbers are taken when a row is written but become visible at commit, so
+    a later number can be visible before an earlier one. Reading the sequence
+    first and then waiting for the writers holding the lock makes everything
+    up to the returned value safe to hand out as a cursor.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT last_value, is_called FROM {CHANGE_SEQUENCE}")
+        last_value, is_called = cursor.fetchone()
+        for key in (0, organization_id):
+            # Taken and released one at a time, so never held while waiting
+            cursor.execute(
+                "SELECT pg_advisory_lock(hashtext(%s), %s), "
+                "pg_advisory_unlock(hashtext(%s), %s)",
+                [CHANGE_LOCK, key, CHANGE_LOCK, key],
+            )
+    return last_value if is_called else 0
+
+
+class CatalogTombstoneQuerySet(TenantQuerySet):
+    def for_organization(self, organization):
+        # Medicines are shared, so their deletions are visible to everyone
+        return self.filter(Q(organization=organization) | Q(organization__isnull=True))
+
+
+class CatalogTombstone(models.Model):
+    """A deleted Medicine, Inventory or Batch row, written by a database trigger"""
+
+    MODELS = ("medicine", "inventory", "batch")
+
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    # No constraint: deleting an organization writes tombstones for its rows
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+    )
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    objects = CatalogTombstoneQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["organization", "change_seq"],
+                name="tombstone_org_change_seq_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
+
+
+@admin.register(CatalogTombstone)
+class CatalogTombstoneAdmin(admin.ModelAdmin):
+    list_display = ["model", "object_id", "organization", "deleted_at"]
+    list_filter = ["model"]
@@ -36,6 +36,8 @@ class Medicine(models.Model):
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by a database trigger on every insert and update, see catalog_change
+    change_seq = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Medicine"
@@ -44,6 +46,7 @@ class Medicine(models.Model):
         indexes = [
             GinIndex(fields=['name'], name='medicine_name_gin_trgm', opclasses=['gin_trgm_ops']),
             models.Index(fields=["generic_name"]),
+            models.Index(fields=["change_seq"], name="medicine_change_seq_idx"),
         ]
 
     def __str__(self):
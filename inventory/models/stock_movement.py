@@ -0,0 +1,165 @@
+from django.conf import settings
+from django.contrib import admin
+from django.db import models
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from inventory.models.batch import Batch
+from inventory.models.stockpile import Inventory
+from users.models.organization import Organization
+from utils.managers import TenantQuerySet
+
+
+class StockMovementKind(models.TextChoices):
+    SALE = "sale", "Sale"
+    RECEIPT = "receipt", "Receipt"
+    ADJUSTMENT = "adjustment", "Adjustment"
+    WRITE_OFF = "write_off", "Write-off"
+    RETURN = "return", "Return"
+
+
+class StockMovementQuerySet(TenantQuerySet):
+    def record(self, movements):
+        """Append the movements with one INSERT, skipping the ones that move nothing"""
+        return self.bulk_create(
+            [movement for movement in movements if movement.quantity], batch_size=1000
+        )
+
+    def between(self, start=None, end=None):
+        """Movements in [start, end), scanning only the partitions of that range"""
+        queryset = self
+        if start is not None:
+            queryset = queryset.filter(created_at__gte=start)
+        if end is not None:
+            queryset = queryset.filter(created_at__lt=end)
+        return queryset
+
+    def stock_at(self, moment):
+        """Quantity of each batch at ``moment``, as {batch_id: quantity}"""
+        return dict(
+            self.filter(created_at__lte=moment)
+            .values("batch_id")
+            .annotate(total=Sum("quantity"))
+            .values_list("batch_id", "total")
+        )
+
+    def unreconciled(self, batches):
+        """
+        The ``batches`` whose quantity differs from the sum of their movements
+        in this queryset, annotated with that sum as ``ledger_quantity``
+        """
+        ledger = (
+            self.order_by()
+            .filter(batch_id=OuterRef("pk"))
+            .values("batch_id")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return batches.annotate(ledger_quantity=Coalesce(Subquery(ledger), 0)).filter(
+            ~Q(quantity=F("ledger_quantity"))
+        )
+
+    def totals_by_kind(self):
+        return (
+            self.values("kind")
+            .annotate(quantity=Sum("quantity"), movements=Count("id"))
+            .order_by("kind")
+        )
+
+
+class StockMovement(models.Model):
+    """
+    One change to a batch's quantity; ``quantity`` is negative for stock
+    going out. Rows are only ever inserted (a database trigger rejects
+    updates and deletes), so summing a batch's movements gives its quantity
+    at any point in time.
+
+    The table is range-partitioned by month on ``created_at`` (migration
+    0012). References to other rows carry no constraint, so history survives
+    deleting the batch, inventory or organization it describes.
+    """
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        related_name="+",
+    )
+    inventory = models.ForeignKey(
+        Inventory,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+",
+    )
+    batch = models.ForeignKey(
+        Batch,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        related_name="+",
+    )
+    kind = models.CharField(max_length=20, choices=StockMovementKind.choices)
+    quantity = models.IntegerField()
+    # What caused the movement, like ("checkout", 42) or ("supplier_order", 7);
+    # ("archived_checkout", 42) once archive_partitions moved checkout 42 out
+    reference_type = models.CharField(max_length=30, blank=True, default="")
+    reference_id = models.BigIntegerField(null=True, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    note = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = StockMovementQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "created_at"], name="movement_org_created_idx"
+            ),
+            models.Index(
+                fields=["inventory", "created_at"],
+                name="movement_inventory_created_idx",
+            ),
+            models.Index(
+                fields=["batch", "created_at"], name="movement_batch_created_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.quantity:+d} of batch {self.batch_id}"
+
+    @classmethod
+    def of(cls, batch, kind, quantity, **fields):
+        """An unsaved movement of ``quantity`` pieces of ``batch``"""
+        return cls(
+            organization_id=batch.organization_id,
+            inventory_id=batch.inventory_id,
+            batch_id=batch.pk,
+            kind=kind,
+            quantity=quantity,
+            **fields,
+        )
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ["created_at", "kind", "quantity", "batch", "organization"]
+    list_filter = ["kind"]
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
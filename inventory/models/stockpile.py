@@ -1,7 +1,28 @@
 from django.db import models, transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from users.models.organization import Organization
 from .product import Medicine
 from django.contrib import admin
+from utils.managers import TenantQuerySet
+
+
+class InventoryQuerySet(TenantQuerySet):
+    def sync_quantities(self):
+        """Set each inventory's quantity to the sum of its batches, in one UPDATE"""
+        from .batch import Batch
+
+        batch_totals = (
+            Batch.objects.filter(inventory=OuterRef("pk"))
+            .order_by()
+            .values("inventory")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return self.update(
+            quantity=Coalesce(Subquery(batch_totals), 0), updated_at=timezone.now()
+        )
 
 
 class Inventory(models.Model):
@@ -10,10 +31,24 @@ class Inventory(models.Model):
     quantity = models.PositiveIntegerField(default=0)
     stock_alert_qty = models.PositiveIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by a database trigger on every insert and update, see catalog_change
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = InventoryQuerySet.as_manager()
 
     class Meta:
         unique_together = ("medicine", "organization")
         ordering = ["-updated_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "-updated_at"],
+                name="inventory_org_updated_idx",
+            ),
+            models.Index(
+                fields=["organization", "change_seq"],
+                name="inventory_org_change_seq_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.medicine.name} - {self.organization.name}"
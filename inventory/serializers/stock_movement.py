@@ -0,0 +1,32 @@
+from rest_framework import serializers
+from ..models.stock_movement import StockMovement, StockMovementKind
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockMovement
+        exclude = ["organization"]
+
+
+class StockMovementQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    inventory_id = serializers.IntegerField(required=False)
+    batch_id = serializers.IntegerField(required=False)
+    kind = serializers.ChoiceField(choices=StockMovementKind.choices, required=False)
+
+
+class StockAtQuerySerializer(serializers.Serializer):
+    at = serializers.DateTimeField()
+    inventory_id = serializers.IntegerField(required=False)
+
+
+class StockMovementTotalSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=StockMovementKind.choices)
+    quantity = serializers.IntegerField()
+    movements = serializers.IntegerField()
+
+
+class BatchStockSerializer(serializers.Serializer):
+    batch_id = serializers.IntegerField()
+    quantity = serializers.IntegerField()
@@ -0,0 +1,38 @@
+from rest_framework import serializers
+from ..models.batch import Batch
+from ..models.stockpile import Inventory
+from .medicine import MedicineSerializer
+
+
+class InventoryChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Inventory
+        fields = [
+            "id",
+            "medicine",
+            "quantity",
+            "stock_alert_qty",
+            "updated_at",
+            "change_seq",
+        ]
+
+
+class BatchChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Batch
+        exclude = ["organization"]
+
+
+class DeletedSerializer(serializers.Serializer):
+    medicine = serializers.ListField(child=serializers.IntegerField())
+    inventory = serializers.ListField(child=serializers.IntegerField())
+    batch = serializers.ListField(child=serializers.IntegerField())
+
+
+class CatalogChangesSerializer(serializers.Serializer):
+    cursor = serializers.IntegerField(help_text="Pass as ``since`` on the next request")
+    has_more = serializers.BooleanField()
+    medicines = MedicineSerializer(many=True)
+    inventories = InventoryChangeSerializer(many=True)
+    batches = BatchChangeSerializer(many=True)
+    deleted = DeletedSerializer()
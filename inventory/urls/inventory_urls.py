@@ -5,6 +5,11 @@ from inventory.views.stockpile import InventoryViewSet
 from inventory.views.unitprices import UnitPriceViewSet
 from inventory.views import CategoryViewSet, GenericNameViewSet
 from inventory.views.batch import MedicineAlertsView, AlertsSummaryView
+from inventory.views.stock_movement import (
+    StockAtView,
+    StockMovementListView,
+    StockMovementSummaryView,
+)
 from inventory import views
 
 router = DefaultRouter()
@@ -22,6 +27,13 @@ urlpatterns = [
     path("batch/update/<int:batch_id>/", views.BatchPartialUpdateAPI.as_view()),
     path("alerts/", MedicineAlertsView.as_view(), name="medicine-alerts"),
     path("alerts/summary/", AlertsSummaryView.as_view(), name="alerts-summary"),
+    path("movements/", StockMovementListView.as_view(), name="stock-movements"),
+    path(
+        "movements/summary/",
+        StockMovementSummaryView.as_view(),
+        name="stock-movements-summary",
+    ),
+    path("movements/stock-at/", StockAtView.as_view(), name="stock-at"),
     path(
         "quantity/<int:pk>/",
         views.InventoryQuantityView.as_view(),
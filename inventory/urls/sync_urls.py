@@ -0,0 +1,6 @@
+from django.urls import path
+from inventory.views.sync import CatalogChangesView
+
+urlpatterns = [
+    path("changes/", CatalogChangesView.as_view(), name="catalog-changes"),
+]
@@ -6,6 +6,8 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from users.permissions import IsOrganizationAdmin
 from inventory.models import Batch, Inventory
+from inventory.models.batch import allocate_batch_numbers
+from inventory.models.stock_movement import StockMovement, StockMovementKind
 from inventory.serializers.batch import BatchSerializer
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -17,19 +19,24 @@ from inventory.serializers.stockpile import InventoryAlertSerializer
 from rest_framework.generics import ListAPIView
 from datetime import timedelta
 from django.db.models import F, Q
+from utils.async_views import AsyncAPIView, run_concurrently
+from utils.conditional import CATALOG, conditional
+from utils.mixins import OrgScopedQuerySetMixin
+from utils.replica import reads_from_replica
 
 
-class BatchViewSet(viewsets.ModelViewSet):
+class BatchViewSet(OrgScopedQuerySetMixin, viewsets.ModelViewSet):
     queryset = Batch.objects.all()
     serializer_class = BatchSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = None
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         inventory_id = self.request.query_params.get("inventory_id")
         if inventory_id:
-            return self.queryset.filter(inventory_id=inventory_id)
-        return self.queryset
+            return queryset.filter(inventory_id=inventory_id)
+        return queryset
 
     @swagger_auto_schema(manual_parameters=[inventory_id])
     def list(self, request, *args, **kwargs):
@@ -45,8 +52,46 @@ class BatchViewSet(viewsets.ModelViewSet):
             inventory.quantity -= batch.quantity
             inventory.save()
 
+            StockMovement.objects.record(
+                [
+                    StockMovement.of(
+                        batch,
+                        StockMovementKind.WRITE_OFF,
+                        -batch.quantity,
+                        user_id=request.user.id,
+                        note="Batch deleted",
+                    )
+                ]
+            )
             return super().destroy(request, *args, **kwargs)
 
+    def perform_create(self, serializer):
+        batch = serializer.save()
+        StockMovement.objects.record(
+            [
+                StockMovement.of(
+                    batch,
+                    StockMovementKind.RECEIPT,
+                    batch.quantity,
+                    user_id=self.request.user.id,
+                )
+            ]
+        )
+
+    def perform_update(self, serializer):
+        previous_quantity = serializer.instance.quantity
+        batch = serializer.save()
+        StockMovement.objects.record(
+            [
+                StockMovement.of(
+                    batch,
+                    StockMovementKind.ADJUSTMENT,
+                    batch.quantity - previous_quantity,
+                    user_id=self.request.user.id,
+                )
+            ]
+        )
+
     def partial_update(self, request, *args, **kwargs):
         super().partial_update(request, *args, **kwargs)
         return Response(status=status.HTTP_200_OK)
@@ -83,14 +128,8 @@ class GenerateBatchNumberView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        base_prefix = "BATCH"
-
-        suffix = "A"
-        while True:
-            batch_number = f"{base_prefix}-{suffix}"
-            if not existing_batches.filter(batch_number=batch_number).exists():
-                break
-            suffix = chr(ord(suffix) + 1)
+        taken = set(existing_batches.values_list("batch_number", flat=True))
+        (batch_number,) = allocate_batch_numbers(taken, 1)
 
         return Response({"batch_number": batch_number}, status=status.HTTP_200_OK)
 
@@ -103,7 +142,11 @@ class BatchPartialUpdateAPI(APIView):
         try:
             with transaction.atomic():
                 # Lock both Batch and related Inventory rows
-                batch = Batch.objects.select_for_update().get(id=batch_id)
+                batch = (
+                    Batch.objects.for_organization(request.user.organization)
+                    .select_for_update()
+                    .get(id=batch_id)
+                )
                 inventory = Inventory.objects.select_for_update().get(
                     id=batch.inventory.id
                 )
@@ -114,7 +157,16 @@ class BatchPartialUpdateAPI(APIView):
                         serializer.errors, status=status.HTTP_400_BAD_REQUEST
                     )
 
+                previous_quantity = batch.quantity
                 updated_batch = serializer.save()
+                movements = [
+                    StockMovement.of(
+                        updated_batch,
+                        StockMovementKind.ADJUSTMENT,
+                        updated_batch.quantity - previous_quantity,
+                        user_id=request.user.id,
+                    )
+                ]
 
                 if "stock_alert_qty" in request.data:
                     inventory.stock_alert_qty += int(
@@ -131,6 +183,15 @@ class BatchPartialUpdateAPI(APIView):
 
                         inventory.quantity += quantity_increment
                         inventory.save()
+                        movements.append(
+                            StockMovement.of(
+                                updated_batch,
+                                StockMovementKind.RECEIPT,
+                                quantity_increment,
+                                user_id=request.user.id,
+                            )
+                        )
+                StockMovement.objects.record(movements)
 
                 return Response(BatchSerializer(updated_batch).data)
 
@@ -175,6 +236,8 @@ class MedicineAlertsView(ListAPIView):
             ),
         ]
     )
+    @reads_from_replica
+    @conditional(CATALOG)
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
@@ -203,7 +266,7 @@ class MedicineAlertsView(ListAPIView):
             threshold_date = today + timedelta(days=expiry_days)
 
             base_query = Q(
-                inventory__organization=organization,
+                organization=organization,
                 expiry_date__isnull=False,
                 expiry_date__lte=threshold_date,
             )
@@ -222,10 +285,12 @@ class MedicineAlertsView(ListAPIView):
         return Inventory.objects.none()
 
 
-class AlertsSummaryView(APIView):
+class AlertsSummaryView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
+    @reads_from_replica
+    @conditional(CATALOG)
+    async def get(self, request, *args, **kwargs):
         try:
             organization = request.user.organization
         except AttributeError:
@@ -236,20 +301,22 @@ class AlertsSummaryView(APIView):
 
         today = timezone.now().date()
 
-        low_stock_count = Inventory.objects.filter(
-            organization=organization, quantity__lte=F("stock_alert_qty")
-        ).count()
-
         ninety_days_from_now = today + timedelta(days=90)
-        expiring_soon_count = Batch.objects.filter(
-            inventory__organization=organization,
-            expiry_date__lte=ninety_days_from_now,
-        ).count()
-
-        critical_alert_count = Batch.objects.filter(
-            inventory__organization=organization,
-            expiry_date__lt=today,
-        ).count()
+        low_stock_count, expiring_soon_count, critical_alert_count = (
+            await run_concurrently(
+                Inventory.objects.filter(
+                    organization=organization, quantity__lte=F("stock_alert_qty")
+                ).count,
+                Batch.objects.filter(
+                    organization=organization,
+                    expiry_date__lte=ninety_days_from_now,
+                ).count,
+                Batch.objects.filter(
+                    organization=organization,
+                    expiry_date__lt=today,
+                ).count,
+            )
+        )
 
         data = {
             "low_stock_count": low_stock_count,
@@ -3,6 +3,7 @@ from ..serializers.category_generic_name import (
     GenericNameSerializer,
 )
 from rest_framework import viewsets
+from utils.conditional import CATALOG, conditional
 from ..models.product import Category, GenericName
 
 
@@ -11,6 +12,10 @@ class CategoryViewSet(viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     pagination_class = None
 
+    @conditional(CATALOG, shared_only=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class GeniricNameViewset(viewsets.ModelViewSet):
     queryset = GenericName.objects.all()
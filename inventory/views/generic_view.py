@@ -6,6 +6,7 @@ from drf_yasg import openapi
 from inventory.models.product import Category, GenericName
 from inventory.serializers.category_generic_name import CategorySerializer, GenericNameSerializer
 from rest_framework.permissions import IsAuthenticated
+from utils.conditional import CATALOG, conditional
 
 class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
@@ -30,6 +31,7 @@ class GenericNameViewSet(viewsets.ModelViewSet):
             ),
         ]
     )
+    @conditional(CATALOG, shared_only=True)
     def list(self, request, *args, **kwargs):
         query = request.query_params.get('q', '').strip()
         queryset = self.get_queryset()
@@ -0,0 +1,123 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from utils.replica import reads_from_replica
+from ..models.stock_movement import StockMovement, StockMovementKind
+from ..serializers.stock_movement import (
+    BatchStockSerializer,
+    StockAtQuerySerializer,
+    StockMovementQuerySerializer,
+    StockMovementSerializer,
+    StockMovementTotalSerializer,
+)
+
+range_params = [
+    openapi.Parameter(
+        "start",
+        openapi.IN_QUERY,
+        description="Movements at or after this time (ISO 8601)",
+        type=openapi.TYPE_STRING,
+        format="date-time",
+    ),
+    openapi.Parameter(
+        "end",
+        openapi.IN_QUERY,
+        description="Movements before this time (ISO 8601)",
+        type=openapi.TYPE_STRING,
+        format="date-time",
+    ),
+    openapi.Parameter("inventory_id", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+    openapi.Parameter("batch_id", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+    openapi.Parameter(
+        "kind",
+        openapi.IN_QUERY,
+        type=openapi.TYPE_STRING,
+        enum=StockMovementKind.values,
+    ),
+]
+
+
+def filtered_movements(request):
+    query = StockMovementQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    filters = dict(query.validated_data)
+    return (
+        StockMovement.objects.for_organization(request.user.organization)
+        .between(filters.pop("start", None), filters.pop("end", None))
+        .filter(**filters)
+    )
+
+
+class StockMovementListView(ListAPIView):
+    """The stock ledger of the organization, newest first"""
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = StockMovementSerializer
+
+    def get_queryset(self):
+        return filtered_movements(self.request)
+
+    @swagger_auto_schema(manual_parameters=range_params)
+    @reads_from_replica
+    def get(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+
+class StockMovementSummaryView(APIView):
+    """Pieces moved and number of movements per kind over a period"""
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=range_params,
+        responses={200: StockMovementTotalSerializer(many=True)},
+    )
+    @reads_from_replica
+    def get(self, request):
+        totals = filtered_movements(request).totals_by_kind()
+        return Response(StockMovementTotalSerializer(totals, many=True).data)
+
+
+class StockAtView(APIView):
+    """Quantity of each batch at a point in time, rebuilt from the ledger"""
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "at",
+                openapi.IN_QUERY,
+                required=True,
+                type=openapi.TYPE_STRING,
+                format="date-time",
+            ),
+            openapi.Parameter(
+                "inventory_id", openapi.IN_QUERY, type=openapi.TYPE_INTEGER
+            ),
+        ],
+        responses={200: BatchStockSerializer(many=True)},
+    )
+    @reads_from_replica
+    def get(self, request):
+        query = StockAtQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        movements = StockMovement.objects.for_organization(request.user.organization)
+        if "inventory_id" in query.validated_data:
+            movements = movements.filter(
+                inventory_id=query.validated_data["inventory_id"]
+            )
+        stock = movements.stock_at(query.validated_data["at"])
+        return Response(
+            BatchStockSerializer(
+                [
+                    {"batch_id": batch_id, "quantity": quantity}
+                    for batch_id, quantity in sorted(stock.items())
+                    if quantity
+                ],
+                many=True,
+            ).data
+        )
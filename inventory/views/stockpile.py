@@ -6,8 +6,10 @@ from rest_framework.permissions import IsAuthenticated
 from ..models.stockpile import Inventory
 from ..serializers.stockpile import InventorySerializer, InventoryCreateSerializer
 from users.permissions import InventoryPermission, IsCompanyAdmin
-from utils.mixins import OrgScopedQuerySetMixin
+from utils.async_views import AsyncAPIView
+from utils.conditional import CATALOG, conditional
 from utils.swagger_schema import search_param
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from inventory.models import Inventory
 from django.db.models import Q, F
@@ -71,14 +73,25 @@ class InventoryViewSet(viewsets.ModelViewSet):
         )
 
     @swagger_auto_schema(manual_parameters=[search_param])
+    @conditional(CATALOG)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @conditional(CATALOG)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
-class InventoryQuantityView(generics.RetrieveAPIView):
+
+class InventoryQuantityView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    queryset = Inventory.objects.all()
 
-    def get(self, request, *args, **kwargs):
-        inventory = self.get_object()
-        return Response({"quantity": inventory.quantity})
+    async def get(self, request, pk, *args, **kwargs):
+        quantity = await (
+            Inventory.objects.for_organization(request.user.organization)
+            .filter(pk=pk)
+            .values_list("quantity", flat=True)
+            .afirst()
+        )
+        if quantity is None:
+            raise NotFound()
+        return Response({"quantity": quantity})
@@ -0,0 +1,38 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import serializers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from utils.swagger_schema import limit_param, since_param
+from ..catalog_sync import catalog_changes
+from ..serializers.sync import CatalogChangesSerializer
+
+
+class CatalogChangesQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=5000, default=1000)
+
+
+class CatalogChangesView(APIView):
+    """
+    Medicines, inventory and batches changed since the client's cursor, for
+    POS clients that keep the catalog offline. Start with ``since=0`` and
+    pass the returned ``cursor`` back; deleted rows are listed by id.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[since_param, limit_param],
+        responses={200: CatalogChangesSerializer},
+    )
+    def get(self, request):
+        query = CatalogChangesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(
+            catalog_changes(
+                request.user.organization,
+                query.validated_data["since"],
+                query.validated_data["limit"],
+            )
+        )
@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from corsheaders.defaults import default_headers
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -26,8 +27,12 @@ CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_HEADERS = list(default_headers) + [
     "X-CSRFToken",
     "authentication-token",
+    "Idempotency-Key",
+    "If-None-Match",
 ]
 
+CORS_EXPOSE_HEADERS = ["ETag"]
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -49,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "utils.middleware.QueryCountMiddleware",
+    "utils.middleware.ReplicaPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -78,6 +85,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "saas_auth.wsgi.application"
+ASGI_APPLICATION = "saas_auth.asgi.application"
+
+# Set when gunicorn serves saas_auth.asgi with uvicorn workers (gunicorn.config.py)
+ASGI = os.getenv("ASGI", "").lower() in ("1", "true", "yes")
 
 
 # Database
@@ -90,10 +101,35 @@ ELASTICSEARCH_DSL = {
 }
 
 
+# gunicorn.config.py exports its worker and thread counts so the connection
+# pool below is sized for the threads that can hold a connection at once.
+GUNICORN_WORKERS = int(os.getenv("GUNICORN_WORKERS", 1))
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", 1))
+
+# How database connections are reused:
+#   persistent - one connection per thread, kept for DB_CONN_MAX_AGE seconds
+#   psycopg    - a psycopg 3 connection pool in every worker process
+#   pgbouncer  - connections to PgBouncer running in transaction pooling mode
+DB_POOL = os.getenv("DB_POOL", "persistent")
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 600))
+# Connections all workers together may open; the default leaves headroom
+# under Postgres' max_connections=100 for migrations, cron jobs and psql.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 90))
+# A pool holds one connection per thread plus a few for run_concurrently()
+# and ASGI requests, capped at this worker's share of DB_MAX_CONNECTIONS.
+DB_POOL_MAX_SIZE = int(
+    os.getenv(
+        "DB_POOL_MAX_SIZE",
+        max(1, min(GUNICORN_THREADS + 4, DB_MAX_CONNECTIONS // GUNICORN_WORKERS)),
+    )
+)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", min(2, DB_POOL_MAX_SIZE)))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+
 if DEBUG:
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.postgresql_psycopg2",
+            "ENGINE": "django.db.backends.postgresql",
             "NAME": os.getenv("POSTGRES_DB"),
             "USER": os.getenv("POSTGRES_USER"),
             "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
@@ -101,11 +137,83 @@ if DEBUG:
         }
     }
 else:
-    DATABASES = {
-        "default": dj_database_url.config(
-            conn_max_age=600,
-        )
+    DATABASES = {"default": dj_database_url.config()}
+
+DATABASES["default"].update(
+    CONN_MAX_AGE=DB_CONN_MAX_AGE,
+    # Reused connections are checked at the start of each request, so one
+    # dropped by a failover or idle timeout is replaced instead of failing
+    # the request.
+    CONN_HEALTH_CHECKS=True,
+)
+if DB_POOL == "psycopg":
+    # Closed connections go back to the pool instead of staying on the thread
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": DB_POOL_MIN_SIZE,
+        "max_size": DB_POOL_MAX_SIZE,
+        "timeout": DB_POOL_TIMEOUT,
     }
+elif DB_POOL == "pgbouncer":
+    # Consecutive transactions may run on different server connections, so
+    # named cursors (used by QuerySet.iterator()) cannot survive between them.
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+elif DB_POOL != "persistent":
+    raise ImproperlyConfigured(
+        "DB_POOL must be one of 'persistent', 'psycopg' or 'pgbouncer'."
+    )
+
+if ASGI:
+    # Every ASGI request runs its sync code in a new thread, so persistent
+    # connections would pile up instead of being reused.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# Dashboards, alerts and reports read from a replica when REPLICA_DATABASE_URL
+# is set (utils.replica). Point it at DATABASE_URL to try the routing locally.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+# An organization reads from the primary for this long after it writes. The
+# pin lives in the cache, so it only spans workers with a shared cache.
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 10))
+# Reads fall back to the primary while the replica lags more than this
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", 30))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", 5))
+
+if REPLICA_DATABASE_URL:
+    replica = dj_database_url.parse(REPLICA_DATABASE_URL)
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        **{key: replica[key] for key in ("NAME", "USER", "PASSWORD", "HOST", "PORT")},
+        "OPTIONS": {**DATABASES["default"].get("OPTIONS", {})},
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["utils.replica.ReplicaRouter"]
+
+# Seconds a checkout or payment response is kept for Idempotency-Key replays
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+
+# Offline sales accepted per /checkout/sync/ request, and applied per transaction
+CHECKOUT_SYNC_MAX_SALES = int(os.getenv("CHECKOUT_SYNC_MAX_SALES", 1000))
+CHECKOUT_SYNC_CHUNK_SIZE = int(os.getenv("CHECKOUT_SYNC_CHUNK_SIZE", 100))
+
+# Months ahead create_partitions (run on deploy and from cron) keeps ready,
+# so a missed run does not send new rows to the default partition
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 12))
+
+# Months of checkout history archive_partitions keeps in the database, and
+# where it writes the months it takes out
+PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", 36))
+PARTITION_ARCHIVE_DIR = os.getenv("PARTITION_ARCHIVE_DIR", BASE_DIR / "archive")
+
+# Exports spanning more days than EXPORT_MAX_SYNC_DAYS are written in the
+# background by run_export_jobs to EXPORT_DIR and kept for EXPORT_JOB_TTL
+# seconds. Rows are fetched from the server-side cursor EXPORT_CHUNK_SIZE at a
+# time; with DB_POOL=pgbouncer there is no server-side cursor, so keep
+# EXPORT_MAX_SYNC_DAYS small there.
+EXPORT_MAX_SYNC_DAYS = int(os.getenv("EXPORT_MAX_SYNC_DAYS", 92))
+EXPORT_DIR = os.getenv("EXPORT_DIR", BASE_DIR / "exports")
+EXPORT_JOB_TTL = int(os.getenv("EXPORT_JOB_TTL", 7 * 24 * 60 * 60))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
 
 
 # Password validation
@@ -159,7 +267,7 @@ SWAGGER_SETTINGS = {
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
@@ -167,6 +275,31 @@ REST_FRAMEWORK = {
 
 from datetime import timedelta
 
+# Seconds an authenticated user (with organization) stays cached per process
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", "60"))
+
+# Per-request SQL queries above this count log a query_budget_exceeded warning
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "50"))
+# Number of recent requests per view kept for rolling latency percentiles
+REQUEST_STATS_WINDOW = int(os.getenv("REQUEST_STATS_WINDOW", "500"))
+# Bearer token required by /metrics; leave empty to expose it unauthenticated
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "utils.performance": {
+            "handlers": ["console"],
+            "level": os.getenv("PERFORMANCE_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -4,6 +4,7 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from base.views import metrics_view
 
 
 schema_view = get_schema_view(
@@ -27,7 +28,10 @@ urlpatterns = [
     path("inventory/", include("inventory.urls.inventory_urls")),
     path("products/", include("inventory.urls.product_urls")),
     path("checkout/", include("checkout.urls")),
+    path("sync/", include("inventory.urls.sync_urls")),
     path("supplier/", include("supplier.urls")),
+    path("exports/", include("base.urls")),
+    path("metrics", metrics_view, name="metrics"),
     path(
         "swagger/",
         schema_view.with_ui("swagger", cache_timeout=0),
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('supplier', '0004_alter_supplier_options_alter_supplierorder_options'),
+        ('users', '0008_organization_is_active_organization_is_printable'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(fields=['organization', '-created_at'], name='supplier_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierorder',
+            index=models.Index(fields=['organization', '-order_date'], name='supplierorder_org_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierpaymentrecord',
+            index=models.Index(fields=['organization', '-payment_date'], name='supplierpay_org_date_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_catalog_change_seq'),
+        ('supplier', '0005_tenant_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supplierorder',
+            name='received_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='supplierorder',
+            name='status',
+            field=models.CharField(choices=[('ordered', 'Ordered'), ('received', 'Received')], default='ordered', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='SupplierOrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_number', models.CharField(blank=True, default='', max_length=100)),
+                ('quantity', models.PositiveIntegerField(help_text='Pieces ordered')),
+                ('buying_price', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('selling_price', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('expiry_date', models.DateField(blank=True, null=True)),
+                ('received_quantity', models.PositiveIntegerField(default=0)),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='supplier_order_items', to='inventory.batch')),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='supplier_order_items', to='inventory.inventory')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='supplier.supplierorder')),
+            ],
+        ),
+    ]
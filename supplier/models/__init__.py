@@ -1,3 +1,4 @@
 from .supplier import Supplier
 from .supplier_order import SupplierOrder
 from .supplier_payment import *
+from .supplier_order_item import SupplierOrderItem
@@ -1,7 +1,25 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib import admin
+from django.utils import timezone
 from users.models import Organization
 from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from utils.managers import TenantQuerySet
+from decimal import Decimal
+
+
+class SupplierQuerySet(TenantQuerySet):
+    def with_totals(self):
+        """Annotate order, payment and due totals in one grouped query"""
+        return self.annotate(
+            orders_total=Coalesce(
+                Sum("supplier_orders__total_amount"), Decimal("0.00")
+            ),
+            payments_total=Coalesce(
+                Sum("supplier_orders__paid_amount"), Decimal("0.00")
+            ),
+            due_total=Coalesce(Sum("supplier_orders__due_amount"), Decimal("0.00")),
+        )
 
 
 class Supplier(models.Model):
@@ -37,8 +55,16 @@ class Supplier(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SupplierQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "-created_at"],
+                name="supplier_org_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -46,16 +72,22 @@ class Supplier(models.Model):
     @property
     def total_orders(self):
         """Calculate total amount of all orders from this supplier"""
+        if hasattr(self, "orders_total"):
+            return self.orders_total
         return self.supplier_orders.aggregate(total=Sum("total_amount"))["total"] or 0
 
     @property
     def total_payments(self):
         """Calculate total payments made to this supplier"""
+        if hasattr(self, "payments_total"):
+            return self.payments_total
         return self.supplier_orders.aggregate(total=Sum("paid_amount"))["total"] or 0
 
     @property
     def total_due(self):
         """Calculate total due amount for this supplier"""
+        if hasattr(self, "due_total"):
+            return self.due_total
         return self.supplier_orders.aggregate(total=Sum("due_amount"))["total"] or 0
 
     def get_orders_with_due(self):
@@ -68,56 +100,77 @@ class Supplier(models.Model):
         """Get all orders from this supplier, ordered by date (oldest first)"""
         return self.supplier_orders.all().order_by("order_date", "created_at")
 
-    def pay_due(self, payment_amount):
+    def pay_due(self, payment_amount, organization=None, notes=""):
         """
-        Pay due amount for this supplier, starting from oldest orders
+        Pay due amount for this supplier, starting from oldest orders.
+
+        The due orders are locked once, the allocation is computed in memory
+        and the touched orders are written back with a single bulk_update in
+        the same transaction as the SupplierPaymentRecord.
         Returns dict with payment details
         """
         if payment_amount <= 0:
             raise ValueError("Payment amount must be greater than 0")
 
-        total_due = self.total_due
-        if payment_amount > total_due:
-            raise ValueError(
-                f"Payment amount ({payment_amount}) cannot exceed total due ({total_due})"
-            )
+        with transaction.atomic():
+            # Get orders with due amount, ordered by date (oldest first)
+            orders_with_due = list(self.get_orders_with_due().select_for_update())
 
-        remaining_payment = payment_amount
-        payment_details = []
-
-        # Get orders with due amount, ordered by date (oldest first)
-        orders_with_due = self.get_orders_with_due()
-
-        for order in orders_with_due:
-            if remaining_payment <= 0:
-                break
-
-            # Calculate how much to pay for this order
-            order_due = order.due_amount
-            payment_for_order = min(remaining_payment, order_due)
-
-            # Update the order
-            order.paid_amount += payment_for_order
-            order.due_amount -= payment_for_order
-            order.save()
-
-            # Track payment details
-            payment_details.append(
-                {
-                    "order_id": order.id,
-                    "order_date": order.order_date,
-                    "payment_amount": payment_for_order,
-                    "remaining_due": order.due_amount,
-                }
+            total_due = sum(
+                (order.due_amount for order in orders_with_due), Decimal("0.00")
+            )
+            if total_due <= 0:
+                raise ValueError("This supplier has no due amount to pay")
+            if payment_amount > total_due:
+                raise ValueError(
+                    f"Payment amount ({payment_amount}) cannot exceed total due ({total_due})"
+                )
+
+            remaining_payment = payment_amount
+            payment_details = []
+            paid_orders = []
+            now = timezone.now()
+
+            for order in orders_with_due:
+                if remaining_payment <= 0:
+                    break
+
+                # Calculate how much to pay for this order
+                payment_for_order = min(remaining_payment, order.due_amount)
+
+                order.paid_amount += payment_for_order
+                order.due_amount -= payment_for_order
+                order.updated_at = now
+                paid_orders.append(order)
+
+                # Track payment details
+                payment_details.append(
+                    {
+                        "order_id": order.id,
+                        "order_date": order.order_date,
+                        "payment_amount": payment_for_order,
+                        "remaining_due": order.due_amount,
+                    }
+                )
+
+                remaining_payment -= payment_for_order
+
+            self.supplier_orders.bulk_update(
+                paid_orders, ["paid_amount", "due_amount", "updated_at"]
             )
 
-            remaining_payment -= payment_for_order
+            payment_record = self.payment_records.create(
+                organization=organization or self.organization,
+                amount=payment_amount,
+                notes=notes,
+            )
 
         return {
             "total_payment": payment_amount,
             "remaining_payment": remaining_payment,
             "payment_details": payment_details,
-            "new_total_due": self.total_due,
+            "new_total_due": total_due - payment_amount,
+            "payment_record_id": payment_record.id,
         }
 
 
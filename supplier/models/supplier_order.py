@@ -1,8 +1,19 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
 from ..models.supplier import Supplier
+from inventory.models.batch import Batch, allocate_batch_numbers
+from inventory.models.stock_movement import StockMovement, StockMovementKind
+from inventory.models.stockpile import Inventory
 from users.models.organization import Organization
 from django.utils import timezone
 from django.contrib import admin
+from utils.conditional import CATALOG, bump_version
+from utils.managers import TenantQuerySet
+
+
+class SupplierOrderStatus(models.TextChoices):
+    ORDERED = "ordered", "Ordered"
+    RECEIVED = "received", "Received"
 
 
 class SupplierOrder(models.Model):
@@ -18,15 +29,152 @@ class SupplierOrder(models.Model):
 
     order_date = models.DateField(default=timezone.now)
     notes = models.TextField(blank=True, null=True)
+    status = models.CharField(
+        max_length=20,
+        choices=SupplierOrderStatus.choices,
+        default=SupplierOrderStatus.ORDERED,
+    )
+    received_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TenantQuerySet.as_manager()
+
     def __str__(self):
         return self.supplier.name
 
+    def receive(self, user=None):
+        """
+        Put the order's items into stock in one transaction.
+
+        Each item adds its quantity to the inventory's batch with the same
+        number, or to a new batch; items without a number get the next free
+        BATCH-<letter> numbers, allocated per inventory in one pass. Batches
+        are written with one bulk_create and one bulk_update, and inventory
+        quantities are recomputed with a single UPDATE. Every item is
+        recorded as a receipt in the stock ledger, attributed to ``user``.
+        Returns dict with receipt details
+        """
+        with transaction.atomic():
+            status = (
+                SupplierOrder.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("status", flat=True)
+                .get()
+            )
+            if status == SupplierOrderStatus.RECEIVED:
+                raise ValueError("This order has already been received")
+
+            items = list(self.items.all())
+            if not items:
+                raise ValueError("This order has no items to receive")
+            inventory_ids = {item.inventory_id for item in items}
+
+            # Batches before inventories, the order every stock write locks in
+            batches = {
+                (batch.inventory_id, batch.batch_number): batch
+                for batch in Batch.objects.filter(inventory_id__in=inventory_ids)
+                .select_for_update()
+                .order_by("id")
+            }
+            own_inventories = set(
+                Inventory.objects.for_organization(self.organization_id)
+                .filter(id__in=inventory_ids)
+                .select_for_update()
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            if own_inventories != inventory_ids:
+                raise ValueError("Some items are not in this organization's inventory")
+
+            unnumbered = defaultdict(list)
+            for item in items:
+                if not item.batch_number:
+                    unnumbered[item.inventory_id].append(item)
+            for inventory_id, inventory_items in unnumbered.items():
+                taken = {number for inv, number in batches if inv == inventory_id}
+                numbers = allocate_batch_numbers(taken, len(inventory_items))
+                for item, number in zip(inventory_items, numbers):
+                    item.batch_number = number
+
+            now = timezone.now()
+            created, updated = [], {}
+            for item in items:
+                key = (item.inventory_id, item.batch_number)
+                batch = batches.get(key)
+                if batch is None:
+                    batch = batches[key] = Batch(
+                        inventory_id=item.inventory_id,
+                        organization_id=self.organization_id,
+                        batch_number=item.batch_number,
+                        quantity=0,
+                    )
+                    created.append(batch)
+                elif batch.pk:
+                    updated[batch.pk] = batch
+                batch.quantity += item.quantity
+                if item.buying_price:
+                    batch.buying_price = item.buying_price
+                if item.selling_price:
+                    batch.selling_price = item.selling_price
+                if item.expiry_date:
+                    batch.expiry_date = item.expiry_date
+                batch.updated_at = now
+                item.received_quantity = item.quantity
+
+            Batch.objects.bulk_create(created)
+            Batch.objects.bulk_update(
+                list(updated.values()),
+                [
+                    "quantity",
+                    "buying_price",
+                    "selling_price",
+                    "expiry_date",
+                    "updated_at",
+                ],
+            )
+            movements = []
+            for item in items:
+                batch = batches[(item.inventory_id, item.batch_number)]
+                item.batch_id = batch.pk
+                movements.append(
+                    StockMovement.of(
+                        batch,
+                        StockMovementKind.RECEIPT,
+                        item.quantity,
+                        reference_type="supplier_order",
+                        reference_id=self.pk,
+                        user_id=user.id if user else None,
+                        created_at=now,
+                    )
+                )
+            self.items.bulk_update(
+                items, ["batch_number", "batch", "received_quantity"]
+            )
+            StockMovement.objects.record(movements)
+            Inventory.objects.filter(id__in=inventory_ids).sync_quantities()
+
+            self.status = SupplierOrderStatus.RECEIVED
+            self.received_at = now
+            self.save(update_fields=["status", "received_at", "updated_at"])
+            # The batch and inventory writes above skip the model signals
+            bump_version(CATALOG, self.organization_id)
+
+        return {
+            "items_received": len(items),
+            "batches_created": len(created),
+            "batches_updated": len(updated),
+        }
+
     class Meta:
         ordering = ["-order_date"]
+        indexes = [
+            models.Index(
+                fields=["organization", "-order_date"],
+                name="supplierorder_org_date_idx",
+            ),
+        ]
 
 
 @admin.register(SupplierOrder)
@@ -38,4 +186,5 @@ class SupplierOrderAdmin(admin.ModelAdmin):
         "paid_amount",
         "due_amount",
         "order_date",
+        "status",
     )
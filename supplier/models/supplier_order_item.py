@@ -0,0 +1,45 @@
+from django.db import models
+from django.contrib import admin
+from inventory.models.batch import Batch
+from inventory.models.stockpile import Inventory
+from .supplier_order import SupplierOrder
+from utils.managers import TenantQuerySet
+
+
+class SupplierOrderItem(models.Model):
+    """A medicine line of a supplier order, turned into stock on receipt"""
+
+    order = models.ForeignKey(
+        SupplierOrder, on_delete=models.CASCADE, related_name="items"
+    )
+    inventory = models.ForeignKey(
+        Inventory, on_delete=models.CASCADE, related_name="supplier_order_items"
+    )
+    # Blank to allocate the next free BATCH-<letter> number on receipt
+    batch_number = models.CharField(max_length=100, blank=True, default="")
+    quantity = models.PositiveIntegerField(help_text="Pieces ordered")
+    buying_price = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    selling_price = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    expiry_date = models.DateField(null=True, blank=True)
+
+    # Filled in when the order is received
+    batch = models.ForeignKey(
+        Batch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="supplier_order_items",
+    )
+    received_quantity = models.PositiveIntegerField(default=0)
+
+    tenant_field = "order__organization"
+
+    objects = TenantQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.quantity} x {self.inventory_id} ({self.order_id})"
+
+
+@admin.register(SupplierOrderItem)
+class SupplierOrderItemAdmin(admin.ModelAdmin):
+    list_display = ("order", "inventory", "batch_number", "quantity", "batch")
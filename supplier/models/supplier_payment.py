@@ -3,6 +3,7 @@ from django.utils import timezone
 from .supplier import Supplier
 from users.models.organization import Organization
 from django.contrib import admin
+from utils.managers import TenantQuerySet
 
 
 class SupplierPaymentRecord(models.Model):
@@ -30,8 +31,16 @@ class SupplierPaymentRecord(models.Model):
         help_text="Optional notes for the payment (e.g., transaction ID, payment method).",
     )
 
+    objects = TenantQuerySet.as_manager()
+
     class Meta:
         ordering = ["-payment_date"]
+        indexes = [
+            models.Index(
+                fields=["organization", "-payment_date"],
+                name="supplierpay_org_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Payment of {self.amount} to {self.supplier.name} on {self.payment_date.date()}"
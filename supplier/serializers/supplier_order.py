@@ -1,19 +1,93 @@
-from ..models.supplier_order import SupplierOrder
+from django.db import transaction
+from ..models.supplier_order import SupplierOrder, SupplierOrderStatus
+from ..models.supplier_order_item import SupplierOrderItem
 from ..models.supplier import Supplier
 from ..serializers.supplier import SupplierSerializer
+from inventory.models.stockpile import Inventory
 from rest_framework import serializers
 
 
+class SupplierOrderItemSerializer(serializers.ModelSerializer):
+    # A plain id, checked against the organization for all items at once
+    inventory = serializers.IntegerField(source="inventory_id")
+    medicine_name = serializers.CharField(
+        source="inventory.medicine.name", read_only=True
+    )
+
+    class Meta:
+        model = SupplierOrderItem
+        fields = [
+            "id",
+            "inventory",
+            "medicine_name",
+            "batch_number",
+            "quantity",
+            "buying_price",
+            "selling_price",
+            "expiry_date",
+            "batch",
+            "received_quantity",
+        ]
+        read_only_fields = ["batch", "received_quantity"]
+
+
 class SupplierOrderSerializer(serializers.ModelSerializer):
     supplier = SupplierSerializer(read_only=True)
     supplier_id = serializers.PrimaryKeyRelatedField(
         queryset=Supplier.objects.all(), source="supplier", write_only=True
     )
+    items = SupplierOrderItemSerializer(many=True, required=False)
 
     class Meta:
         model = SupplierOrder
         fields = "__all__"
-        read_only_fields = ["organization"]
+        read_only_fields = ["organization", "status", "received_at"]
+
+    def validate_items(self, items):
+        organization = self.context["request"].user.organization
+        inventory_ids = {item["inventory_id"] for item in items}
+        found = set(
+            Inventory.objects.for_organization(organization)
+            .filter(id__in=inventory_ids)
+            .values_list("id", flat=True)
+        )
+        missing = inventory_ids - found
+        if missing:
+            raise serializers.ValidationError(
+                f"Inventory not found: {', '.join(map(str, sorted(missing)))}"
+            )
+        return items
+
+    def save_items(self, order, items):
+        SupplierOrderItem.objects.bulk_create(
+            [SupplierOrderItem(order=order, **item) for item in items]
+        )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        items = validated_data.pop("items", [])
+        order = super().create(validated_data)
+        self.save_items(order, items)
+        return order
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        items = validated_data.pop("items", None)
+        if items is not None:
+            if instance.status == SupplierOrderStatus.RECEIVED:
+                raise serializers.ValidationError(
+                    {"items": "Items of a received order cannot be changed."}
+                )
+            instance.items.all().delete()
+            self.save_items(instance, items)
+        return super().update(instance, validated_data)
+
+
+class SupplierOrderReceiptSerializer(serializers.Serializer):
+    items_received = serializers.IntegerField()
+    batches_created = serializers.IntegerField()
+    batches_updated = serializers.IntegerField()
+    order = SupplierOrderSerializer()
 
 
 class SupplierPaymentSerializer(serializers.Serializer):
@@ -1,5 +1,10 @@
 from django.urls import path
-from .views import SupplierOrderListCreateView, SupplierOrderDetailView, SupplierViewSet
+from .views import (
+    SupplierOrderListCreateView,
+    SupplierOrderDetailView,
+    SupplierOrderReceiveView,
+    SupplierViewSet,
+)
 from rest_framework.routers import DefaultRouter
 from django.urls import include
 
@@ -18,5 +23,10 @@ urlpatterns = [
         SupplierOrderDetailView.as_view(),
         name="supplier-order-detail",
     ),
+    path(
+        "supplier-orders/<int:pk>/receive/",
+        SupplierOrderReceiveView.as_view(),
+        name="supplier-order-receive",
+    ),
     path("", include(router.urls)),
 ]
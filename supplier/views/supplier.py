@@ -1,5 +1,4 @@
 from ..models.supplier import Supplier
-from ..models.supplier_payment import SupplierPaymentRecord
 from ..serializers.supplier_payment import SupplierPaymentRecordSerializer
 from rest_framework.viewsets import ModelViewSet
 from ..serializers.supplier import SupplierSerializer
@@ -20,7 +19,11 @@ class SupplierViewSet(ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Supplier.objects.filter(organization=user.organization)
+        queryset = (
+            Supplier.objects.filter(organization=user.organization)
+            .with_totals()
+            .order_by("-created_at")
+        )
         return queryset
 
     def perform_create(self, serializer):
@@ -41,22 +44,13 @@ class SupplierViewSet(ModelViewSet):
             payment_amount = serializer.validated_data["payment_amount"]
             notes = serializer.validated_data.get("notes", "")
 
-            # Check if supplier has any due amount
-            if supplier.total_due <= 0:
-                return Response(
-                    {"error": "This supplier has no due amount to pay"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
             try:
 
-                # Process payment
-                payment_result = supplier.pay_due(payment_amount)
-
-                SupplierPaymentRecord.objects.create(
-                    supplier=supplier,
+                # Lock due orders, allocate oldest-first and record the payment
+                # in a single transaction
+                payment_result = supplier.pay_due(
+                    payment_amount,
                     organization=request.user.organization,
-                    amount=payment_amount,
                     notes=notes,
                 )
 
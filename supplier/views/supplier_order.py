@@ -1,7 +1,28 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_yasg.utils import swagger_auto_schema
+from ..models.supplier import Supplier
 from ..models.supplier_order import SupplierOrder
-from ..serializers.supplier_order import SupplierOrderSerializer
-from django.db.models import Q
+from ..models.supplier_order_item import SupplierOrderItem
+from ..serializers.supplier_order import (
+    SupplierOrderReceiptSerializer,
+    SupplierOrderSerializer,
+)
+from django.db.models import Q, Prefetch
+from django.shortcuts import get_object_or_404
+
+
+def supplier_with_totals():
+    """Prefetch each order's supplier with its totals annotated in one query"""
+    return Prefetch("supplier", queryset=Supplier.objects.with_totals())
+
+
+def items_with_medicine():
+    return Prefetch(
+        "items",
+        queryset=SupplierOrderItem.objects.select_related("inventory__medicine"),
+    )
 
 
 class SupplierOrderListCreateView(generics.ListCreateAPIView):
@@ -10,7 +31,9 @@ class SupplierOrderListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        queryset = SupplierOrder.objects.filter(organization=user.organization)
+        queryset = SupplierOrder.objects.filter(
+            organization=user.organization
+        ).prefetch_related(supplier_with_totals(), items_with_medicine())
 
         search_term = self.request.query_params.get("q", None)
 
@@ -32,4 +55,32 @@ class SupplierOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return SupplierOrder.objects.filter(organization=user.organization)
+        return SupplierOrder.objects.filter(
+            organization=user.organization
+        ).prefetch_related(supplier_with_totals(), items_with_medicine())
+
+
+class SupplierOrderReceiveView(APIView):
+    """Receive a supplier order: create or top up a batch for each of its items"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=None, responses={200: SupplierOrderReceiptSerializer}
+    )
+    def post(self, request, pk):
+        order = get_object_or_404(
+            SupplierOrder.objects.for_organization(request.user.organization), pk=pk
+        )
+        try:
+            receipt = order.receive(user=request.user)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        order = SupplierOrder.objects.prefetch_related(
+            supplier_with_totals(), items_with_medicine()
+        ).get(pk=order.pk)
+        receipt["order"] = SupplierOrderSerializer(
+            order, context={"request": request}
+        ).data
+        return Response(receipt, status=status.HTTP_200_OK)
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_users
+from .models import Organization, User
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def invalidate_cached_organization_users(sender, instance, **kwargs):
+    invalidate_users(
+        User.objects.filter(organization_id=instance.pk).values_list("id", flat=True)
+    )
@@ -0,0 +1,86 @@
+import asyncio
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers may be ``async def``.
+
+    Authentication, permission and throttle checks run synchronously in the
+    request's thread, the handler itself runs on the event loop and can use
+    the async ORM (``acount``, ``aaggregate``, ``async for``) or
+    ``run_concurrently``. Under WSGI Django runs the view in an event loop of
+    its own, so the same code serves both deployments.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def _isolated(call):
+    def run():
+        try:
+            return call()
+        finally:
+            # The thread is thrown away with the request's executor, so its
+            # connections are closed (or returned to the pool) right away
+            # rather than left open until it is garbage collected
+            connections.close_all()
+
+    return run
+
+
+def fans_out():
+    """
+    Whether run_concurrently gives each call a thread of its own.
+
+    Only with connections that are cheap to get: under ASGI, or with the
+    psycopg pool. With persistent connections under WSGI every call would
+    open a new connection, which costs more than the aggregates it runs.
+    """
+    return settings.ASGI or settings.DB_POOL == "psycopg"
+
+
+async def run_concurrently(*calls):
+    """
+    Run independent blocking ORM calls and return their results in order.
+
+    When ``fans_out()``, each call gets a thread, and therefore a database
+    connection, of its own, so only pass read-only calls that do not need
+    the request's transaction. Otherwise they run one after another on the
+    request's thread and connection.
+    """
+    if not fans_out():
+        return await sync_to_async(lambda: [call() for call in calls])()
+    return await asyncio.gather(
+        *(sync_to_async(_isolated(call), thread_sensitive=False)() for call in calls)
+    )
@@ -0,0 +1,132 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from base.models import DataVersion
+
+# Groups of tables a read endpoint can depend on
+CATALOG = "catalog"
+SALES = "sales"
+SUPPLIERS = "suppliers"
+
+# Organization of tables shared by every organization, like Medicine
+SHARED = "shared"
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def version_key(scope, organization_id=None):
+    return f"{scope}:{organization_id or SHARED}"
+
+
+def bump_version(scope, organization_id=None):
+    """
+    Mark the scope as changed for the organization (or for everyone when
+    ``organization_id`` is None) once the current transaction commits.
+
+    Bumps are collected per connection and written together, so a checkout
+    that saves many rows still costs a single statement after commit.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    pending = connection.__dict__.setdefault("pending_version_bumps", set())
+    pending.add(version_key(scope, organization_id))
+
+    def flush():
+        if pending:
+            keys = set(pending)
+            pending.clear()
+            DataVersion.objects.bump(keys)
+
+    transaction.on_commit(flush, robust=True)
+
+
+def compute_etag(request, scopes, shared_only=False):
+    keys = [version_key(scope) for scope in scopes]
+    if not shared_only:
+        organization_id = request.user.organization_id
+        keys += [version_key(scope, organization_id) for scope in scopes]
+    versions = DataVersion.objects.current(keys)
+    # The response also depends on who asks, how, and on today's date for
+    # relative filters like "today" or "expiring within 90 days"
+    source = "|".join(
+        str(part)
+        for part in [
+            request.get_full_path(),
+            request.user.pk,
+            getattr(request, "accepted_media_type", ""),
+            timezone.localdate(),
+            *versions,
+        ]
+    )
+    return f'W/"{hashlib.sha1(source.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    weak = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == weak for tag in header.split(","))
+
+
+def not_modified(etag):
+    return Response(
+        status=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def tag(response, etag):
+    if response.status_code == status.HTTP_200_OK:
+        response["ETag"] = etag
+        response["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def conditional(*scopes, shared_only=False):
+    """
+    Answer ``If-None-Match`` on a read handler (sync or async) with 304 when
+    none of the scopes changed for the user's organization, before the
+    handler runs any query. ``shared_only`` is for handlers that only read
+    tables shared by every organization.
+
+    The ETag comes from the scopes' DataVersion counters, which are read
+    before the handler's queries, so a write that lands in between yields
+    a new ETag on the next request rather than a stale 304. Put it inside
+    ``reads_from_replica`` so the counters come from the same database as
+    the data.
+    """
+
+    def decorator(handler):
+        if iscoroutinefunction(handler):
+
+            @wraps(handler)
+            async def wrapper(self, request, *args, **kwargs):
+                if not getattr(request.user, "organization_id", None):
+                    return await handler(self, request, *args, **kwargs)
+                etag = await sync_to_async(compute_etag)(request, scopes, shared_only)
+                if etag_matches(request, etag):
+                    return not_modified(etag)
+                return tag(await handler(self, request, *args, **kwargs), etag)
+
+        else:
+
+            @wraps(handler)
+            def wrapper(self, request, *args, **kwargs):
+                if not getattr(request.user, "organization_id", None):
+                    return handler(self, request, *args, **kwargs)
+                etag = compute_etag(request, scopes, shared_only)
+                if etag_matches(request, etag):
+                    return not_modified(etag)
+                return tag(handler(self, request, *args, **kwargs), etag)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,73 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from base.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+
+
+def request_fingerprint(request):
+    data = request.data
+    if hasattr(data, "lists"):
+        data = dict(data.lists())
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f"{request.method} {request.path}\n{payload}".encode()
+    ).hexdigest()
+
+
+def replay(stored, fingerprint):
+    if stored.fingerprint != fingerprint:
+        return Response(
+            {"detail": f"This {HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(
+        stored.response_body,
+        status=stored.response_status,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def idempotent(handler):
+    """
+    Make a write handler safe to retry with an ``Idempotency-Key`` header.
+
+    The first successful response for an organization's key is stored for
+    IDEMPOTENCY_KEY_TTL seconds and replayed to retries without running the
+    handler again. Concurrent requests with the same key wait on a lock, so
+    only one of them executes. Failed requests are not stored and can be
+    retried with the same key.
+    """
+
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        organization_id = getattr(request.user, "organization_id", None)
+        if not key or not organization_id:
+            return handler(self, request, *args, **kwargs)
+        if len(key) > 255:
+            raise ValidationError({HEADER: "Must be at most 255 characters."})
+
+        fingerprint = request_fingerprint(request)
+        stored = IdempotencyKey.objects.lookup(organization_id, key)
+        if stored is None:
+            with transaction.atomic():
+                IdempotencyKey.objects.lock(organization_id, key)
+                stored = IdempotencyKey.objects.lookup(organization_id, key)
+                if stored is None:
+                    response = handler(self, request, *args, **kwargs)
+                    if status.is_success(response.status_code):
+                        IdempotencyKey.objects.store(
+                            organization_id, key, fingerprint, request.path, response
+                        )
+                    return response
+        return replay(stored, fingerprint)
+
+    return wrapper
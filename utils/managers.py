@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class TenantQuerySet(models.QuerySet):
+    """
+    QuerySet for tables owned by an Organization.
+
+    Models name the lookup to their owning organization with a
+    ``tenant_field`` class attribute (default ``"organization"``), so callers
+    scope any tenant table the same way regardless of the column name.
+
+    Scoping is explicit: ``objects.all()`` still spans every organization,
+    as management commands, migrations and the admin need. Request code
+    scopes through ``for_organization`` or ``OrgScopedQuerySetMixin``.
+    """
+
+    def for_organization(self, organization):
+        # Fail closed: no organization sees nothing, rather than the rows
+        # whose organization is NULL
+        if organization is None:
+            return self.none()
+        tenant_field = getattr(self.model, "tenant_field", "organization")
+        return self.filter(**{tenant_field: organization})
@@ -0,0 +1,163 @@
+import os
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+# (see gunicorn.config.py) and /metrics merges them at scrape time.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests by route and response status",
+    ["method", "view", "status"],
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Wall time spent handling a request",
+    ["method", "view"],
+    buckets=LATENCY_BUCKETS,
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request",
+    "SQL queries executed while handling a request",
+    ["view"],
+    buckets=QUERY_BUCKETS,
+)
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds",
+    "Total database time spent per request",
+    ["view"],
+    buckets=LATENCY_BUCKETS,
+)
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss)",
+    ["cache", "result"],
+)
+checkout_orders_total = Counter(
+    "checkout_orders_total",
+    "Checkout orders created",
+    ["status"],
+)
+checkout_items_total = Counter(
+    "checkout_items_total",
+    "Order lines sold through checkout",
+)
+db_connections_opened_total = Counter(
+    "db_connections_opened_total",
+    "Database connections opened, or taken from the pool, by Django",
+    ["alias"],
+)
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Connections held by the psycopg pools of live workers",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+db_pool_available_connections = Gauge(
+    "db_pool_available_connections",
+    "Idle connections in the psycopg pools of live workers",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+db_pool_requests_waiting = Gauge(
+    "db_pool_requests_waiting",
+    "Threads waiting for a pooled connection",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+db_pool_wait_seconds_total = Counter(
+    "db_pool_wait_seconds_total",
+    "Time spent waiting for a pooled connection",
+    ["alias"],
+)
+db_pool_errors_total = Counter(
+    "db_pool_errors_total",
+    "Pool timeouts and connections lost or failing to open",
+    ["alias", "error"],
+)
+worker_resident_memory_bytes = Gauge(
+    "worker_resident_memory_bytes",
+    "Resident memory of the worker process",
+    multiprocess_mode="liveall",
+)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def resident_memory():
+    """Current RSS of this process in bytes (0 where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def observe_request(method, view, status, duration, query_count, db_duration):
+    http_requests_total.labels(method, view, status).inc()
+    http_request_duration_seconds.labels(method, view).observe(duration)
+    db_queries_per_request.labels(view).observe(query_count)
+    db_query_duration_seconds.labels(view).observe(db_duration)
+    worker_resident_memory_bytes.set(resident_memory())
+
+
+def observe_cache(name, hit):
+    cache_requests_total.labels(name, "hit" if hit else "miss").inc()
+
+
+@receiver(connection_created)
+def observe_connection(sender, connection, **kwargs):
+    db_connections_opened_total.labels(connection.alias).inc()
+
+
+# psycopg_pool statistic -> error label of db_pool_errors_total
+POOL_ERRORS = {
+    "requests_errors": "timeout",
+    "connections_errors": "connect",
+    "connections_lost": "lost",
+}
+
+
+def observe_pools():
+    """Copy the statistics of this worker's psycopg pools (DB_POOL=psycopg)"""
+    for connection in connections.all(initialized_only=True):
+        pool = getattr(connection, "pool", None)
+        if pool is None:
+            continue
+        alias = connection.alias
+        stats = pool.pop_stats()
+        db_pool_connections.labels(alias).set(stats.get("pool_size", 0))
+        db_pool_available_connections.labels(alias).set(stats.get("pool_available", 0))
+        db_pool_requests_waiting.labels(alias).set(stats.get("requests_waiting", 0))
+        db_pool_wait_seconds_total.labels(alias).inc(
+            stats.get("requests_wait_ms", 0) / 1000
+        )
+        for key, error in POOL_ERRORS.items():
+            if stats.get(key):
+                db_pool_errors_total.labels(alias, error).inc(stats[key])
+
+
+def render():
+    """Return (payload, content_type) for the Prometheus text exposition"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from utils import metrics
+from utils.replica import pin_to_primary, replica_configured
+
+logger = logging.getLogger("utils.performance")
+
+_whitespace = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Short stable id for a parametrized SQL statement"""
+    normalized = _whitespace.sub(" ", sql).strip()
+    return hashlib.md5(normalized.encode()).hexdigest()[:12]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0
+    index = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+class RequestStats:
+    """Rolling window of wall time and query counts per view, kept in process"""
+
+    def __init__(self, window):
+        self.window = window
+        self.lock = threading.Lock()
+        self.durations = defaultdict(lambda: deque(maxlen=self.window))
+        self.queries = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, view, duration_ms, query_count):
+        with self.lock:
+            self.durations[view].append(duration_ms)
+            self.queries[view].append(query_count)
+
+    def summary(self, view):
+        with self.lock:
+            durations = sorted(self.durations[view])
+            queries = sorted(self.queries[view])
+        return {
+            "count": len(durations),
+            "p50_ms": round(percentile(durations, 50), 1),
+            "p95_ms": round(percentile(durations, 95), 1),
+            "p99_ms": round(percentile(durations, 99), 1),
+            "p95_queries": percentile(queries, 95),
+        }
+
+    def snapshot(self):
+        with self.lock:
+            views = list(self.durations)
+        return {view: self.summary(view) for view in views}
+
+
+request_stats = RequestStats(getattr(settings, "REQUEST_STATS_WINDOW", 500))
+
+
+class QueryRecorder:
+    """Counts, times and fingerprints the queries of one request"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.statements = {}
+
+    def record(self, sql, elapsed):
+        key = fingerprint(sql)
+        with self.lock:
+            self.duration += elapsed
+            self.count += 1
+            self.fingerprints[key] += 1
+            self.statements.setdefault(key, sql)
+
+    def duplicates(self):
+        return {key: n for key, n in self.fingerprints.items() if n > 1}
+
+
+# The recorders follow the request's context into sync_to_async threads, so
+# queries issued from async views and worker threads are counted as well, on
+# every database alias. Recorders nest: a benchmark can record the queries
+# of a request while this middleware records them too.
+current_recorders = ContextVar("query_recorders", default=())
+
+
+def record_query(execute, sql, params, many, context):
+    recorders = current_recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        for recorder in recorders:
+            recorder.record(sql, elapsed)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def start_recording(recorder):
+    """Record queries into ``recorder`` until ``current_recorders.reset(token)``"""
+    # Connections opened before this module was loaded missed the signal
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(None, connection)
+    return current_recorders.set((*current_recorders.get(), recorder))
+
+
+@contextmanager
+def recording_queries():
+    """Record the queries run inside the block, on any alias or thread"""
+    recorder = QueryRecorder()
+    token = start_recording(recorder)
+    try:
+        yield recorder
+    finally:
+        current_recorders.reset(token)
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route or "unmatched"
+
+
+class QueryCountMiddleware:
+    """
+    Record SQL query count, DB time, duplicate queries and wall time per request.
+
+    Results are sent back as a Server-Timing header, logged as one JSON line on
+    the ``utils.performance`` logger and folded into ``request_stats`` and the
+    Prometheus metrics in ``utils.metrics``. A warning is logged when a view
+    runs more queries than ``QUERY_BUDGET``. Works under WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budget = getattr(settings, "QUERY_BUDGET", 50)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorders.reset(token)
+        return self.finish(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        recorder, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorders.reset(token)
+        return self.finish(request, response, recorder, start)
+
+    def start(self):
+        recorder = QueryRecorder()
+        return recorder, start_recording(recorder), time.perf_counter()
+
+    def finish(self, request, response, recorder, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = recorder.duration * 1000
+
+        view = view_name(request)
+        request_stats.record(view, total_ms, recorder.count)
+        metrics.observe_request(
+            request.method,
+            view,
+            response.status_code,
+            total_ms / 1000,
+            recorder.count,
+            recorder.duration,
+        )
+        metrics.observe_pools()
+        duplicates = recorder.duplicates()
+
+        response["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+            f"app;dur={total_ms - db_ms:.1f}, "
+            f"total;dur={total_ms:.1f}"
+        )
+
+        logger.info(
+            json.dumps(
+                {
+                    "event": "request",
+                    "method": request.method,
+                    "path": request.path,
+                    "view": view,
+                    "status": response.status_code,
+                    "queries": recorder.count,
+                    "db_ms": round(db_ms, 1),
+                    "total_ms": round(total_ms, 1),
+                    "duplicate_queries": sum(duplicates.values()) - len(duplicates),
+                    "rolling": request_stats.summary(view),
+                }
+            )
+        )
+
+        if recorder.count > self.budget:
+            logger.warning(
+                json.dumps(
+                    {
+                        "event": "query_budget_exceeded",
+                        "view": view,
+                        "queries": recorder.count,
+                        "budget": self.budget,
+                        "duplicates": [
+                            {"count": n, "sql": recorder.statements[key][:300]}
+                            for key, n in sorted(
+                                duplicates.items(), key=lambda item: -item[1]
+                            )[:5]
+                        ],
+                    }
+                )
+            )
+
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """
+    After an organization writes something, keep its reads on the primary for
+    REPLICA_STICKY_SECONDS so it always sees its own writes (utils.replica).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if organization_id := self.wrote(request, response):
+            pin_to_primary(organization_id)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if organization_id := self.wrote(request, response):
+            await sync_to_async(pin_to_primary)(organization_id)
+        return response
+
+    def wrote(self, request, response):
+        """The writing organization's id, if the request changed anything"""
+        if request.method in ("GET", "HEAD", "OPTIONS") or response.status_code >= 400:
+            return None
+        return getattr(getattr(request, "user", None), "organization_id", None)
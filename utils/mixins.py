@@ -1,7 +1,26 @@
+from django.core.exceptions import ImproperlyConfigured
+
+from utils.managers import TenantQuerySet
+
+
 class OrgScopedQuerySetMixin:
+    """
+    Restrict a view's queryset to the requesting user's organization.
+
+    Fails closed: a user without an organization gets an empty queryset, and
+    a view whose queryset cannot be scoped is a configuration error rather
+    than a silently unscoped list.
+    """
+
     def get_queryset(self):
-        return (
-            super().get_queryset().filter(organization=self.request.user.organization)
+        queryset = super().get_queryset()
+        if not isinstance(queryset, TenantQuerySet):
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} needs a TenantQuerySet to scope "
+                f"{queryset.model.__name__} by organization."
+            )
+        return queryset.for_organization(
+            getattr(self.request.user, "organization_id", None)
         )
 
 
@@ -0,0 +1,340 @@
+import gzip
+from datetime import datetime
+from pathlib import Path
+
+from django.db import DatabaseError, connection, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils import timezone
+
+# Tables range-partitioned by month, with the timestamp column they are
+# partitioned on. ``manage.py create_partitions`` keeps them ahead of time.
+PARTITIONED_TABLES = {
+    "inventory_stockmovement": "created_at",
+    "checkout_checkoutorder": "created_at",
+    "checkout_order": "created_at",
+}
+
+# Partitioned tables whose old months ``manage.py archive_partitions`` takes
+# out of the database. The stock ledger is kept whole, since stock at a point
+# in time is the sum of every movement before it.
+ARCHIVED_TABLES = ["checkout_checkoutorder", "checkout_order"]
+
+# Plain tables holding rows of an archived month's checkouts, with the column
+# pointing at the checkout; archived and deleted along with the month
+ARCHIVED_DEPENDENTS = {
+    "checkout_payment": "checkout_order_id",
+    "checkout_orderdetails": "checkout_id",
+}
+
+# Movements of an archived checkout keep its id under this reference type,
+# since the ledger stays whole
+ARCHIVED_REFERENCES = {"checkout": "archived_checkout"}
+
+# Transaction setting under which append-only triggers let partition
+# maintenance move rows between partitions
+MAINTENANCE_SETTING = "partitions.maintenance"
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def month_bounds(month):
+    """The [start, end) timestamps of a month in the project time zone"""
+    tz = timezone.get_default_timezone()
+    return (
+        timezone.make_aware(month_start(month), tz),
+        timezone.make_aware(add_months(month_start(month), 1), tz),
+    )
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(table, name):
+    """The month a partition named by ``partition_name`` holds"""
+    return datetime.strptime(name.removeprefix(f"{table}_p"), "%Y%m")
+
+
+def default_partition(table):
+    return f"{table}_default"
+
+
+def partitions(table):
+    """Names of the monthly partitions of ``table``, oldest first"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s ORDER BY child.relname",
+            [table],
+        )
+        return [
+            name for (name,) in cursor.fetchall() if name != default_partition(table)
+        ]
+
+
+def create_partition(table, column, month):
+    """
+    Create the partition of ``table`` holding ``month``, if it is missing.
+    Returns whether it was created.
+
+    Rows written before the partition existed went to the default partition;
+    they are moved into the new one so the default stays (nearly) empty.
+    """
+    quote = connection.ops.quote_name
+    name = partition_name(table, month)
+    start, end = (f"'{bound.isoformat()}'" for bound in month_bounds(month))
+    bounds = f"FOR VALUES FROM ({start}) TO ({end})"
+    in_month = f"{quote(column)} >= {start} AND {quote(column)} < {end}"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+        if cursor.fetchone()[0]:
+            return False
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {quote(default_partition(table))} "
+            f"WHERE {in_month})"
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(
+                f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} {bounds}"
+            )
+            return True
+
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} "
+            f"(LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute("SELECT set_config(%s, 'on', true)", [MAINTENANCE_SETTING])
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {quote(default_partition(table))} "
+            f"WHERE {in_month} RETURNING *) "
+            f"INSERT INTO {quote(name)} SELECT * FROM moved"
+        )
+        cursor.execute("SELECT set_config(%s, 'off', true)", [MAINTENANCE_SETTING])
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} {bounds}"
+        )
+    return True
+
+
+def ensure_partitions(table, column, months_ahead=3, since=None):
+    """
+    Create the monthly partitions of ``table`` from the month of ``since``
+    (default: this month) through ``months_ahead`` months from now. Returns
+    the names of the partitions created.
+    """
+    month = month_start(since or timezone.localdate())
+    last = add_months(month_start(timezone.localdate()), months_ahead)
+    created = []
+    while month <= last:
+        if create_partition(table, column, month):
+            created.append(partition_name(table, month))
+        month = add_months(month, 1)
+    return created
+
+
+def restart_identity(cursor, table, column):
+    """
+    Continue the identity ``column`` of a rebuilt table after its highest
+    value, under the sequence name the old table used
+    """
+    quote = connection.ops.quote_name
+    cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [table, column])
+    (sequence,) = cursor.fetchone()
+    if not sequence:
+        return
+    cursor.execute(
+        f"SELECT setval(%s, COALESCE(max({quote(column)}), 0) + 1, false) "
+        f"FROM {quote(table)}",
+        [sequence],
+    )
+    name = f"{table}_{column}_seq"
+    if sequence.split(".")[-1].strip('"') != name:
+        cursor.execute(f"ALTER SEQUENCE {sequence} RENAME TO {quote(name)}")
+
+
+def _rebuild(table, column, partitioned, months_ahead=3):
+    """
+    Recreate ``table`` with the same columns, rows, indexes and constraints,
+    either range-partitioned by month on ``column`` or as a plain table.
+    The primary key gains ``column`` when partitioned, since Postgres wants
+    the partition key in every unique constraint, and loses it otherwise.
+    """
+    quote = connection.ops.quote_name
+    old = f"{table}_rebuild"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname "
+            "NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+            [table, table],
+        )
+        indexes = [definition for (definition,) in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid), ARRAY("
+            "  SELECT attname FROM unnest(conkey) WITH ORDINALITY AS key(num, pos)"
+            "  JOIN pg_attribute ON attrelid = conrelid AND attnum = key.num"
+            "  ORDER BY key.pos"
+            ") FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')",
+            [table],
+        )
+        constraints = cursor.fetchall()
+
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS "
+            "INCLUDING IDENTITY INCLUDING CONSTRAINTS INCLUDING GENERATED "
+            "INCLUDING STORAGE)"
+            + (f" PARTITION BY RANGE ({quote(column)})" if partitioned else "")
+        )
+        if partitioned:
+            cursor.execute(
+                f"CREATE TABLE {quote(default_partition(table))} "
+                f"PARTITION OF {quote(table)} DEFAULT"
+            )
+            cursor.execute(f"SELECT min({quote(column)}) FROM {quote(old)}")
+            (first,) = cursor.fetchone()
+            ensure_partitions(
+                table,
+                column,
+                months_ahead=months_ahead,
+                since=first and timezone.localtime(first),
+            )
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+        # Fails, rather than cascading, if a foreign key still points here
+        cursor.execute(f"DROP TABLE {quote(old)}")
+
+        for name, kind, definition, columns in constraints:
+            if kind == "p":
+                key = [name for name in columns if name != column]
+                restart_identity(cursor, table, key[0])
+                if partitioned:
+                    key.append(column)
+                definition = f"PRIMARY KEY ({', '.join(map(quote, key))})"
+            elif kind == "u" and partitioned and column not in columns:
+                raise ValueError(
+                    f"Unique constraint {name} on {table} must include {column}"
+                )
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}"
+            )
+        for definition in indexes:
+            cursor.execute(definition)
+
+
+def partition_by_month(table, column, months_ahead=3):
+    """
+    Migration helper turning an existing table into one range-partitioned by
+    month on ``column``, with a partition for every month it has rows for.
+
+    The table is rebuilt in one transaction that locks it throughout, so run
+    the migration in a maintenance window. Foreign keys pointing at the
+    table have to be dropped (``db_constraint=False``) first: a partitioned
+    table can only be referenced through a key that includes ``column``.
+    """
+    _rebuild(table, column, partitioned=True, months_ahead=months_ahead)
+
+
+def unpartition(table, column):
+    """Undo ``partition_by_month``, for migrations going backwards"""
+    _rebuild(table, column, partitioned=False)
+
+
+def _copy_to_archive(cursor, sql, path):
+    """
+    Write the output of the COPY ``sql`` to the gzipped file ``path``.
+    Returns the number of rows written, one line each since the text format
+    escapes newlines.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wb") as archive:
+        if is_psycopg3:
+            with cursor.cursor.copy(sql) as copy:
+                for data in copy:
+                    archive.write(data)
+        else:
+            cursor.cursor.copy_expert(sql, archive)
+    with gzip.open(path, "rb") as archive:
+        return sum(1 for _ in archive)
+
+
+def archive_partition(table, name, directory):
+    """
+    Write the partition ``name`` of ``table`` to ``<directory>/<name>.copy.gz``
+    in COPY text format, then detach and drop it. Returns the number of rows.
+
+    Writes to the partition wait for the archive to finish. Restore with
+    ``COPY <partition> FROM`` into a partition created for the same month.
+    """
+    quote = connection.ops.quote_name
+    path = Path(directory) / f"{name}.copy.gz"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {quote(name)} IN SHARE MODE")
+        cursor.execute(f"SELECT count(*) FROM {quote(name)}")
+        (count,) = cursor.fetchone()
+        try:
+            written = _copy_to_archive(cursor, f"COPY {quote(name)} TO STDOUT", path)
+            if written != count:
+                raise DatabaseError(f"Archived {written} of {count} rows of {name}")
+        except Exception:
+            path.unlink(missing_ok=True)
+            raise
+        cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+        cursor.execute(f"DROP TABLE {quote(name)}")
+    return count
+
+
+def archive_dependents(table, column, parent, directory):
+    """
+    Move the rows of ``table`` whose ``column`` holds the id of a row in the
+    partition ``parent`` to ``<directory>/<parent>.<table>.copy.gz``, in COPY
+    text format. Returns the number of rows.
+
+    The rows are deleted by the statement that writes them out, so none can
+    be lost in between; restore them with ``COPY <table> FROM``.
+    """
+    quote = connection.ops.quote_name
+    path = Path(directory) / f"{parent}.{table}.copy.gz"
+    sql = (
+        f"COPY (DELETE FROM {quote(table)} WHERE {quote(column)} IN "
+        f"(SELECT id FROM {quote(parent)}) RETURNING *) TO STDOUT"
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        try:
+            return _copy_to_archive(cursor, sql, path)
+        except Exception:
+            path.unlink(missing_ok=True)
+            raise
+
+
+def archive_references(reference_type, parent, since):
+    """
+    Relabel the stock movements referencing a row of the partition ``parent``
+    as ``reference_type`` with its ARCHIVED_REFERENCES type, so their ids are
+    no longer looked up among live rows. Only movements from ``since`` on are
+    searched, as a movement is never older than what caused it. Returns the
+    number of movements relabeled.
+    """
+    quote = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT set_config(%s, 'on', true)", [MAINTENANCE_SETTING])
+        cursor.execute(
+            "UPDATE inventory_stockmovement SET reference_type = %s "
+            "WHERE reference_type = %s AND created_at >= %s AND reference_id IN "
+            f"(SELECT id FROM {quote(parent)})",
+            [ARCHIVED_REFERENCES[reference_type], reference_type, since],
+        )
+        count = cursor.rowcount
+        cursor.execute("SELECT set_config(%s, 'off', true)", [MAINTENANCE_SETTING])
+    return count
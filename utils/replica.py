@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA = "replica"
+PRIMARY = "default"
+
+# True while the current request (or report) may read from the replica
+replica_reads_enabled = ContextVar("replica_reads_enabled", default=False)
+
+# Seconds behind the primary the replica is, 0 when it has caught up (or is
+# the primary itself, as when testing locally against the same database)
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+
+class ReplicaHealth:
+    """
+    Whether the replica is reachable and caught up, re-checked at most every
+    REPLICA_CHECK_INTERVAL seconds per process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = None
+        self.healthy = False
+
+    def check(self):
+        try:
+            with connections[REPLICA].cursor() as cursor:
+                cursor.execute(REPLICA_LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        except DatabaseError as e:
+            logger.warning("Replica unavailable, reading from primary: %s", e)
+            return False
+        if lag > settings.REPLICA_MAX_LAG:
+            logger.warning("Replica is %.1fs behind, reading from primary", lag)
+            return False
+        return True
+
+    def __call__(self):
+        now = time.monotonic()
+        with self.lock:
+            if (
+                self.checked_at is not None
+                and now - self.checked_at < settings.REPLICA_CHECK_INTERVAL
+            ):
+                return self.healthy
+            self.checked_at = now
+        self.healthy = self.check()
+        return self.healthy
+
+
+replica_healthy = ReplicaHealth()
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def pin_key(organization_id):
+    return f"replica:pin:{organization_id}"
+
+
+def pin_to_primary(organization_id):
+    """Keep the organization's reads on the primary until the replica catches up"""
+    if organization_id and replica_configured():
+        cache.set(pin_key(organization_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def pinned_to_primary(organization_id):
+    return bool(organization_id) and cache.get(pin_key(organization_id), False)
+
+
+def replica_usable(organization_id=None):
+    """
+    Whether reads may go to the replica: there is one, it is healthy, and the
+    organization has not written something moments ago.
+    """
+    return (
+        replica_configured()
+        and not pinned_to_primary(organization_id)
+        and replica_healthy()
+    )
+
+
+@contextmanager
+def reading_from_replica(enabled):
+    token = replica_reads_enabled.set(enabled)
+    try:
+        yield enabled
+    finally:
+        replica_reads_enabled.reset(token)
+
+
+def replica_reads(organization_id=None):
+    """Route the reads made inside the block to the replica when usable"""
+    return reading_from_replica(replica_usable(organization_id))
+
+
+def reads_from_replica(handler):
+    """Serve a read-only view handler (sync or async) from the replica"""
+
+    def organization_id(request):
+        return getattr(request.user, "organization_id", None)
+
+    if iscoroutinefunction(handler):
+
+        @wraps(handler)
+        async def wrapper(self, request, *args, **kwargs):
+            enabled = await sync_to_async(replica_usable)(organization_id(request))
+            with reading_from_replica(enabled):
+                return await handler(self, request, *args, **kwargs)
+
+    else:
+
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            with replica_reads(organization_id(request)):
+                return handler(self, request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Send reads inside ``replica_reads`` to the replica and everything else,
+    including writes of objects loaded from the replica, to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if replica_reads_enabled.get():
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {PRIMARY, REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica follows the primary's schema through replication
+        return db != REPLICA
@@ -12,4 +12,24 @@ inventory_id = openapi.Parameter(
     openapi.IN_QUERY,
     description="Filter batches by inventory ID",
     type=openapi.TYPE_INTEGER
-)
\ No newline at end of file
+)
+
+idempotency_key = openapi.Parameter(
+    'Idempotency-Key',
+    openapi.IN_HEADER,
+    description="Unique key per checkout or payment attempt; retries with the same key replay the first response",
+    type=openapi.TYPE_STRING
+)
+since_param = openapi.Parameter(
+    'since',
+    openapi.IN_QUERY,
+    description="Cursor returned by the previous sync, 0 for a full download",
+    type=openapi.TYPE_INTEGER
+)
+
+limit_param = openapi.Parameter(
+    'limit',
+    openapi.IN_QUERY,
+    description="Maximum number of changed rows to return",
+    type=openapi.TYPE_INTEGER
+)